@@ -7,21 +7,51 @@ import matplotlib.pyplot as plt
 import pandas as pd
 
 from Framework.SNRModel import SNRModel
-import gc
+from Framework.CollisionIndex import CollisionIndex
+from Framework.MemoryPolicy import MemoryPolicy
+from Framework.EventTrace import tracer
+from Framework.Geometry import Geometry
+from Framework.PathLossCache import PathLossCache
+from Framework.NodePopulation import NodePopulation
+from Framework.PacketLog import PacketLog
+from Framework.Tracking import TrackingPolicy
 
 
 class AirInterface:
-    def __init__(self, gateway: Gateway, prop_model: PropagationModel, snr_model: SNRModel, env):
+    def __init__(self, gateway: Gateway, prop_model: PropagationModel, snr_model: SNRModel, env,
+                 memory_policy: MemoryPolicy = None, tracking: TrackingPolicy = None, packet_log: PacketLog = None,
+                 geometry: Geometry = None, gateway_column=0):
 
         self.prop_measurements = {}
         self.num_of_packets_collided = 0
         self.num_of_packets_send = 0
         self.gateway = gateway
-        self.packages_in_air = list()
+        self.packages_in_air = CollisionIndex()
         self.color_per_node = dict()
         self.prop_model = prop_model
+        # node-gateway distances, the gateway is column gateway_column of a geometry shared with other air interfaces
+        if geometry is None:
+            geometry = Geometry([gateway.location])
+        self.geometry = geometry
+        self.path_loss_cache = PathLossCache(prop_model, geometry, gateway_column)
         self.snr_model = snr_model
         self.env = env
+        # state of the nodes sending over this air interface (if no other population is given to the nodes)
+        self.population = NodePopulation()
+        # RSS and SNR per node (and the time series of the nodes) are kept according to the tracking policy
+        if tracking is None:
+            tracking = TrackingPolicy()
+        self.tracking = tracking
+        # the nodes record every transmission in the packet log, if there is one
+        if packet_log is None and PACKET_LOG_DIR is not None:
+            packet_log = PacketLog()
+        self.packet_log = packet_log
+
+        # garbage collection is no longer forced per packet, the policy from the GlobalConfig is used instead
+        if memory_policy is None:
+            memory_policy = MemoryPolicy()
+        self.memory_policy = memory_policy
+        self.memory_policy.apply(env)
 
     @staticmethod
     def frequency_collision(p1: UplinkMessage, p2: UplinkMessage):
@@ -37,22 +67,18 @@ class AirInterface:
         p1_bw = p1.lora_param.bw
         p2_bw = p2.lora_param.bw
 
+        collided_bw = None
         if abs(p1_freq - p2_freq) <= 120 and (p1_bw == 500 or p2_bw == 500):
-            if PRINT_ENABLED:
-                print("frequency coll 500")
-            return True
+            collided_bw = 500
         elif abs(p1_freq - p2_freq) <= 60 and (p1_bw == 250 or p2_bw == 250):
-            if PRINT_ENABLED:
-                print("frequency coll 250")
-            return True
+            collided_bw = 250
         elif abs(p1_freq - p2_freq) <= 30 and (p1_bw == 125 or p2_bw == 125):
-            if PRINT_ENABLED:
-                print("frequency coll 125")
-            return True
+            collided_bw = 125
 
-        if PRINT_ENABLED:
-            print("no frequency coll")
-        return False
+        if tracer.enabled and tracer.accepts('frequency_collision', p1.node.id, p1.node.env.now):
+            tracer.emit('frequency_collision', p1.node.id, p1.node.env.now, other=p2.node.id,
+                        collided=collided_bw is not None, bw=collided_bw)
+        return collided_bw is not None
 
     @staticmethod
     def sf_collision(p1: UplinkMessage, p2: UplinkMessage):
@@ -61,13 +87,10 @@ class AirInterface:
         #
         #       sf1 == sf2
         #
-        if p1.lora_param.sf == p2.lora_param.sf:
-            if PRINT_ENABLED:
-                print("collision sf node {} and node {}".format(p1.node.id, p2.node.id))
-            return True
-        if PRINT_ENABLED:
-            print("no sf collision")
-        return False
+        collided = p1.lora_param.sf == p2.lora_param.sf
+        if tracer.enabled and tracer.accepts('sf_collision', p1.node.id, p1.node.env.now):
+            tracer.emit('sf_collision', p1.node.id, p1.node.env.now, other=p2.node.id, collided=collided)
+        return collided
 
     @staticmethod
     def timing_collision(me: UplinkMessage, other: UplinkMessage):
@@ -78,8 +101,9 @@ class AirInterface:
         critical_section_start = me.start_on_air + sym_duration * (num_preamble - 5)
         critical_section_end = me.start_on_air + me.my_time_on_air()
 
-        if PRINT_ENABLED:
-            print('P1 has a critical section in [{} - {}]'.format(critical_section_start, critical_section_end))
+        if tracer.enabled and tracer.accepts('critical_section', me.node.id, me.node.env.now):
+            tracer.emit('critical_section', me.node.id, me.node.env.now, start=critical_section_start,
+                        end=critical_section_end)
 
         other_end = other.start_on_air + other.my_time_on_air()
 
@@ -95,8 +119,9 @@ class AirInterface:
         critical_section_start = other.start_on_air + sym_duration * (num_preamble - 5)
         critical_section_end = other.start_on_air + other.my_time_on_air()
 
-        if PRINT_ENABLED:
-            print('P2 has a critical section in [{} - {}]'.format(critical_section_start, critical_section_end))
+        if tracer.enabled and tracer.accepts('critical_section', other.node.id, me.node.env.now):
+            tracer.emit('critical_section', other.node.id, me.node.env.now, start=critical_section_start,
+                        end=critical_section_end)
 
         me_end = me.start_on_air + me.my_time_on_air()
 
@@ -120,17 +145,12 @@ class AirInterface:
     @staticmethod
     def power_collision(me: UplinkMessage, other: UplinkMessage, time_collided_nodes):
         power_threshold = 6  # dB
-        if PRINT_ENABLED:
-            print(
-                "pwr: node {0.node.id} {0.rss:3.2f} dBm node {1.node.id} {1.rss:3.2f} dBm; diff {2:3.2f} dBm".format(me,
-                                                                                                                     other,
-                                                                                                                     round(
-                                                                                                                         me.rss - other.rss,
-                                                                                                                         2)))
+        if tracer.enabled and tracer.accepts('power_collision', me.node.id, me.node.env.now):
+            tracer.emit('power_collision', me.node.id, me.node.env.now, other=other.node.id, rss=me.rss,
+                        other_rss=other.rss, me_time_collided=me in time_collided_nodes,
+                        other_time_collided=other in time_collided_nodes)
         if abs(me.rss - other.rss) < power_threshold:
-            if PRINT_ENABLED:
-                print("collision pwr both node {} and node {} (too close to each other)".format(me.node.id,
-                                                                                                other.node.id))
+            # too close to each other
             if me in time_collided_nodes:
                 me.collided = True
             if other in time_collided_nodes:
@@ -141,29 +161,29 @@ class AirInterface:
             # me will collided if also time_collided
 
             if me in time_collided_nodes:
-                if PRINT_ENABLED:
-                    print("collision pwr both node {} has collided by node {}".format(me.node.id, other.node.id))
                 me.collided = True
         else:
             # other was overpowered by me
             if other in time_collided_nodes:
-                if PRINT_ENABLED:
-                    print("collision pwr both node {} has collided by node {}".format(other.node.id, me.node.id))
                 other.collided = True
 
     def collision(self, packet) -> bool:
-        if PRINT_ENABLED:
-            print("CHECK node {} (sf:{} bw:{} freq:{:.6e}) #others: {}".format(
-                packet.node.id, packet.lora_param.sf, packet.lora_param.bw, packet.lora_param.freq,
-                len(self.packages_in_air)))
+        return AirInterface.collision_in(self.packages_in_air, packet, self.env.now)
+
+    @staticmethod
+    def collision_in(packages_in_air: CollisionIndex, packet, now) -> bool:
+        # collision of the packet with the packets in the air, flags both packets when collided
+        if tracer.enabled and tracer.accepts('collision_check', packet.node.id, now):
+            tracer.emit('collision_check', packet.node.id, now, sf=packet.lora_param.sf,
+                        bw=packet.lora_param.bw, freq=packet.lora_param.freq, in_air=len(packages_in_air))
         if packet.collided:
             return True
-        for other in self.packages_in_air:
+        # only packets on an interfering channel with the same SF and overlapping in time are returned
+        for other in packages_in_air.candidates(packet):
             if other.node.id != packet.node.id:
-                if PRINT_ENABLED:
-                    print(">> node {} (sf:{} bw:{} freq:{:.6e})".format(
-                        other.node.id, other.lora_param.sf, other.lora_param.bw,
-                        other.lora_param.freq))
+                if tracer.enabled and tracer.accepts('collision_candidate', packet.node.id, now):
+                    tracer.emit('collision_candidate', packet.node.id, now, other=other.node.id,
+                                sf=other.lora_param.sf, bw=other.lora_param.bw, freq=other.lora_param.freq)
                 if AirInterface.frequency_collision(packet, other):
                     if AirInterface.sf_collision(packet, other):
                         time_collided_nodes = AirInterface.timing_collision(packet, other)
@@ -184,21 +204,16 @@ class AirInterface:
 
         from_node = packet.node
         node_id = from_node.id
-        rss = self.prop_model.tp_to_rss(from_node.location.indoor, packet.lora_param.tp,
-                                        Location.distance(self.gateway.location, packet.node.location),
-                                        from_node.location.alt)
+        rss = self.path_loss_cache.tp_to_rss(node_id, from_node.location, packet.lora_param.tp)
         if node_id not in self.prop_measurements:
-            self.prop_measurements[node_id] = {'rss': [], 'snr': [], 'time': []}
+            self.prop_measurements[node_id] = self.tracking.series('prop', ('rss', 'snr'), node_id)
         packet.rss = rss
         snr = self.snr_model.rss_to_snr(rss)
         packet.snr = snr
 
-        self.prop_measurements[node_id]['time'].append(self.env.now)
-        self.prop_measurements[node_id]['rss'].append(rss)
-        self.prop_measurements[node_id]['snr'].append(snr)
+        self.prop_measurements[node_id].append(self.env.now, rss, snr)
 
-        self.packages_in_air.append(packet)
-        gc.collect()
+        self.packages_in_air.add(packet)
 
     def packet_received(self, packet: UplinkMessage) -> bool:
         """Packet has fully received by the gateway
@@ -211,7 +226,6 @@ class AirInterface:
             self.num_of_packets_collided += 1
             # print('Our packet has collided')
         self.packages_in_air.remove(packet)
-        gc.collect()
         return collided
 
     def plot_packets_in_air(self):
@@ -226,10 +240,15 @@ class AirInterface:
                        linewidth=2.0)
         plt.show()
 
+    def register_node(self, node):
+        # the path loss of all registered nodes is predicted in one batch before the first packet
+        self.path_loss_cache.register(node.id, node.location)
+
     def log(self):
         print('Total number of packets in the air {}'.format(self.num_of_packets_send))
         print('Total number of packets collided {} {:2.2f}%'.format(self.num_of_packets_collided,
                                                                     self.num_of_packets_collided * 100 / self.num_of_packets_send))
+        print('Path loss cache hit rate {:2.2f}%'.format(self.path_loss_cache.hit_rate() * 100))
 
     def get_prop_measurements(self, node_id):
         return self.prop_measurements[node_id]
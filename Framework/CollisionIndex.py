@@ -0,0 +1,72 @@
+from bisect import bisect_left, bisect_right
+
+
+class CollisionIndex:
+    """Packets in the air indexed per (frequency channel, SF).
+
+    Each bucket keeps its packets sorted on start_on_air, together with the longest time on air seen in that bucket.
+    A packet [start, end] can only overlap with packets that started in [start - longest time on air, end],
+    hence only that slice of the bucket needs to be checked by the collision chain in the AirInterface.
+    """
+
+    # widest frequency separation that still results in a frequency collision (see AirInterface.frequency_collision)
+    MAX_FREQ_DIFF = 120
+    # margin (ms) on the interval lookup so rounding errors never drop a packet that just touches another one
+    TIME_MARGIN = 1
+
+    def __init__(self):
+        self.buckets = dict()
+        self.num_of_packets = 0
+
+    @staticmethod
+    def key(packet):
+        return packet.lora_param.freq, packet.lora_param.sf
+
+    @staticmethod
+    def interval(packet):
+        return packet.start_on_air, packet.start_on_air + packet.my_time_on_air()
+
+    def add(self, packet):
+        key = CollisionIndex.key(packet)
+        if key not in self.buckets:
+            # [sorted start times, packets in the same order, longest time on air]
+            self.buckets[key] = [[], [], 0]
+        bucket = self.buckets[key]
+        start, end = CollisionIndex.interval(packet)
+        idx = bisect_right(bucket[0], start)
+        bucket[0].insert(idx, start)
+        bucket[1].insert(idx, packet)
+        if end - start > bucket[2]:
+            bucket[2] = end - start
+        self.num_of_packets += 1
+        # the key is stored as the lora parameters are shared with the node and can change after removal
+        packet.air_key = key
+
+    def remove(self, packet):
+        bucket = self.buckets[packet.air_key]
+        start = packet.start_on_air
+        idx = bisect_left(bucket[0], start)
+        while bucket[1][idx] is not packet:
+            idx += 1
+        del bucket[0][idx]
+        del bucket[1][idx]
+        self.num_of_packets -= 1
+
+    def candidates(self, packet):
+        """Packets with a frequency and SF that can collide with `packet` and that overlap in time with it."""
+        freq, sf = CollisionIndex.key(packet)
+        start, end = CollisionIndex.interval(packet)
+        for (other_freq, other_sf), (starts, packets, longest) in self.buckets.items():
+            if other_sf != sf or abs(other_freq - freq) > CollisionIndex.MAX_FREQ_DIFF:
+                continue
+            lo = bisect_left(starts, start - longest - CollisionIndex.TIME_MARGIN)
+            hi = bisect_right(starts, end)
+            for idx in range(lo, hi):
+                yield packets[idx]
+
+    def __len__(self):
+        return self.num_of_packets
+
+    def __iter__(self):
+        for starts, packets, longest in self.buckets.values():
+            yield from packets
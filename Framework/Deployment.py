@@ -0,0 +1,143 @@
+import pickle
+from collections.abc import Sequence
+
+import numpy as np
+
+from Framework.Location import Location
+
+
+class Locations(Sequence):
+    """Read-only view on the rows (x, y, alt, indoor) of the nodes of one replicate of a Deployment.
+
+    A Location is only built when its node is accessed, e.g. locations[node_id] when the node is created.
+    """
+
+    def __init__(self, array):
+        self.array = array
+
+    def __len__(self):
+        return self.array.shape[0]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return Locations(self.array[index])
+        x, y, alt, indoor = self.array[index].tolist()
+        return Location(x=x, y=y, alt=None if np.isnan(alt) else alt, indoor=bool(indoor))
+
+
+class Deployment:
+    """Locations of the nodes of every replicate (Monte-Carlo run) as one float64 array of shape (replicates, nodes, 4).
+
+    The columns are x, y, alt (NaN if None) and indoor, the encoding of the location columns of NodePopulation.
+    A deployment is generated in a few vectorized numpy calls for all replicates at once:
+    uniform_square: uniform in [0, cell_size]^2 on integer coordinates (as the former Location(min, max) lists)
+    uniform_disc:   uniform in a disc of `radius` around `center`
+    thomas:         Thomas cluster process, normal offsets with std `sigma` around `num_clusters` uniform parents
+    matern:         Matern cluster process, uniform offsets in a disc of `radius` around `num_clusters` uniform parents
+    grid:           centres of the cells of a regular grid over the square, the same for all replicates
+    The cluster processes are conditioned on num_nodes nodes (every node picks a parent uniformly), nodes falling
+    outside of the square are clipped to its border. The altitudes are drawn uniformly from the integers
+    [alt_min, alt_max] if given, a fraction indoor_fraction of the nodes (on average) is indoor.
+    It is saved as a .npy file, Deployment.load maps the file in memory and deployment[replicate] is a lazy view
+    (Locations) on that replicate, building the Location of a node when it is accessed.
+    """
+
+    COLUMNS = ['x', 'y', 'alt', 'indoor']
+
+    def __init__(self, array):
+        self.array = array
+
+    def __len__(self):
+        return self.array.shape[0]
+
+    @property
+    def num_nodes(self) -> int:
+        return self.array.shape[1]
+
+    def __getitem__(self, replicate) -> Locations:
+        return Locations(self.array[replicate])
+
+    @staticmethod
+    def from_locations(locations_per_simulation) -> 'Deployment':
+        # from a list (per replicate) of lists of Locations
+        return Deployment(np.array([[(location.x, location.y, np.nan if location.alt is None else location.alt,
+                                      location.indoor) for location in locations]
+                                    for locations in locations_per_simulation], dtype=np.float64))
+
+    def save(self, file):
+        np.save(file, self.array)
+
+    @staticmethod
+    def load(file) -> 'Deployment':
+        # pickled lists of Locations (former locations files) are converted
+        if file.endswith('.pkl'):
+            with open(file, 'rb') as f:
+                return Deployment.from_locations(pickle.load(f))
+        return Deployment(np.load(file, mmap_mode='r'))
+
+    @staticmethod
+    def build(rng, xy, alt_min, alt_max, indoor_fraction) -> 'Deployment':
+        shape = xy.shape[:2]
+        array = np.empty(shape + (len(Deployment.COLUMNS),))
+        array[:, :, :2] = xy
+        if alt_min is None or alt_max is None:
+            array[:, :, 2] = np.nan
+        else:
+            array[:, :, 2] = rng.integers(alt_min, alt_max, size=shape, endpoint=True)
+        array[:, :, 3] = rng.random(shape) < indoor_fraction
+        return Deployment(array)
+
+    @staticmethod
+    def disc_offsets(rng, radius, shape) -> np.ndarray:
+        # uniform in a disc of `radius` around the origin
+        r = radius * np.sqrt(rng.random(shape))
+        theta = rng.uniform(0, 2 * np.pi, shape)
+        return np.stack([r * np.cos(theta), r * np.sin(theta)], axis=-1)
+
+    @staticmethod
+    def clustered(rng, replicates, num_nodes, cell_size, num_clusters, offsets) -> np.ndarray:
+        parents = rng.uniform(0, cell_size, (replicates, num_clusters, 2))
+        parent = rng.integers(0, num_clusters, (replicates, num_nodes))
+        xy = np.take_along_axis(parents, parent[:, :, np.newaxis], axis=1) + offsets
+        return np.clip(xy, 0, cell_size)
+
+    @staticmethod
+    def uniform_square(replicates, num_nodes, cell_size, alt_min=None, alt_max=None, indoor_fraction=0, seed=None):
+        rng = np.random.default_rng(seed)
+        xy = rng.integers(0, cell_size, size=(replicates, num_nodes, 2), endpoint=True).astype(np.float64)
+        return Deployment.build(rng, xy, alt_min, alt_max, indoor_fraction)
+
+    @staticmethod
+    def uniform_disc(replicates, num_nodes, radius, center=None, alt_min=None, alt_max=None, indoor_fraction=0,
+                     seed=None):
+        rng = np.random.default_rng(seed)
+        if center is None:
+            center = (radius, radius)
+        xy = np.asarray(center, dtype=np.float64) + Deployment.disc_offsets(rng, radius, (replicates, num_nodes))
+        return Deployment.build(rng, xy, alt_min, alt_max, indoor_fraction)
+
+    @staticmethod
+    def thomas(replicates, num_nodes, cell_size, num_clusters, sigma, alt_min=None, alt_max=None, indoor_fraction=0,
+               seed=None):
+        rng = np.random.default_rng(seed)
+        offsets = rng.normal(0, sigma, (replicates, num_nodes, 2))
+        xy = Deployment.clustered(rng, replicates, num_nodes, cell_size, num_clusters, offsets)
+        return Deployment.build(rng, xy, alt_min, alt_max, indoor_fraction)
+
+    @staticmethod
+    def matern(replicates, num_nodes, cell_size, num_clusters, radius, alt_min=None, alt_max=None, indoor_fraction=0,
+               seed=None):
+        rng = np.random.default_rng(seed)
+        offsets = Deployment.disc_offsets(rng, radius, (replicates, num_nodes))
+        xy = Deployment.clustered(rng, replicates, num_nodes, cell_size, num_clusters, offsets)
+        return Deployment.build(rng, xy, alt_min, alt_max, indoor_fraction)
+
+    @staticmethod
+    def grid(replicates, num_nodes, cell_size, alt_min=None, alt_max=None, indoor_fraction=0, seed=None):
+        rng = np.random.default_rng(seed)
+        per_row = int(np.ceil(np.sqrt(num_nodes)))
+        spacing = cell_size / per_row
+        idx = np.arange(num_nodes)
+        xy = np.stack([(idx % per_row + 0.5) * spacing, (idx // per_row + 0.5) * spacing], axis=-1)
+        xy = np.broadcast_to(xy, (replicates, num_nodes, 2))
+        return Deployment.build(rng, xy, alt_min, alt_max, indoor_fraction)
@@ -0,0 +1,85 @@
+import atexit
+import json
+import os
+
+from Simulations.GlobalConfig import *
+
+
+class EventTracer:
+    """Structured, level-based tracing of simulation events
+
+    Events are buffered as records {'time', 'node', 'event', ...} and written as JSON lines to `path`.
+    Call sites guard on `tracer.enabled` and `tracer.accepts(...)` before building a record,
+    hence a disabled tracer, or a filtered out node, event type or time, costs no formatting at all.
+    `path` may contain {pid} to write one file per (pool) process. Pool workers end with os._exit, the buffered
+    events of a simulation are written when it ends (see run_resumable), atexit only covers the main process.
+    """
+
+    DEBUG = 10
+    INFO = 20
+
+    EVENT_LEVELS = {
+        'collision_check': DEBUG,
+        'collision_candidate': DEBUG,
+        'frequency_collision': DEBUG,
+        'sf_collision': DEBUG,
+        'critical_section': DEBUG,
+        'power_collision': DEBUG,
+    }
+
+    def __init__(self, path=None, level=INFO, node_ids=None, events=None, window=None, buffer_size=10000):
+        self.enabled = path is not None
+        self.path = path
+        self.level = level
+        self.node_ids = None if node_ids is None else set(node_ids)
+        self.events = None if events is None else set(events)
+        self.window = window
+        self.buffer_size = buffer_size
+        self.buffer = []
+        self.num_of_events = 0
+
+    def accepts(self, event, node_id, now) -> bool:
+        if EventTracer.EVENT_LEVELS.get(event, EventTracer.INFO) < self.level:
+            return False
+        if self.events is not None and event not in self.events:
+            return False
+        if self.node_ids is not None and node_id not in self.node_ids:
+            return False
+        if self.window is not None and not (self.window[0] <= now <= self.window[1]):
+            return False
+        return True
+
+    def emit(self, event, node_id, now, **fields):
+        record = {'time': now, 'node': node_id, 'event': event}
+        record.update(fields)
+        self.buffer.append(record)
+        self.num_of_events += 1
+        if len(self.buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        if len(self.buffer) == 0:
+            return
+        lines = [json.dumps(record, default=EventTracer.to_json) for record in self.buffer]
+        with open(self.path.format(pid=os.getpid()), 'a') as f:
+            f.write('\n'.join(lines) + '\n')
+        self.buffer = []
+
+    def close(self):
+        if self.enabled:
+            self.flush()
+
+    @staticmethod
+    def to_json(value):
+        # numpy scalars and enums (e.g. NodeState)
+        if hasattr(value, 'item'):
+            return value.item()
+        if hasattr(value, 'name'):
+            return value.name
+        return str(value)
+
+
+tracer = EventTracer(TRACE_FILE, level=getattr(EventTracer, TRACE_LEVEL), node_ids=TRACE_NODE_IDS,
+                     events=TRACE_EVENTS, window=TRACE_WINDOW_MS)
+# events traced outside of run_resumable (e.g. by the benchmarks) in the main process
+atexit.register(tracer.close)
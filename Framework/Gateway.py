@@ -2,8 +2,9 @@ from collections import deque  # circular buffer for storing SNR history for the
 
 import pandas as pd
 
-from Framework.LoRaPacket import UplinkMessage, DownlinkMetaMessage, DownlinkMessage
+from Framework.LoRaPacket import UplinkMessage, DownlinkMetaMessage, DownlinkMessage, airtime
 from Framework.LoRaParameters import LoRaParameters
+from Framework.EventTrace import tracer
 from Simulations.GlobalConfig import *
 
 
@@ -27,9 +28,32 @@ def required_snr(dr):
     return req_snr
 
 
+def downlink_airtime(payload_size, sf, freq) -> (float, float):
+    # airtime and off time (ms) of a downlink
+    # a downlink is sent with BW 125, CR 5, CRC and implicit header, DE only for SF11 and SF12
+    de = 1 if sf in [11, 12] else 0
+    time_on_air = airtime(payload_size, sf, 125, 5, 1, 1, de)
+    # https://github.com/things4u/things4u.github.io/blob/master/DeveloperGuide/LoRa%20documents/LoRaWAN%20Specification%201R0.pdf
+    time_off = time_on_air / LoRaParameters.CHANNEL_DUTY_CYCLE[freq] - time_on_air
+    return time_on_air, time_off
+
+
+def downlink_tables(payload_size):
+    # airtime and off time (ms) of a downlink per (SF, channel)
+    time_on_air = dict()
+    time_off = dict()
+    for sf in LoRaParameters.SPREADING_FACTORS:
+        for freq in LoRaParameters.CHANNELS:
+            time_on_air[sf, freq], time_off[sf, freq] = downlink_airtime(payload_size, sf, freq)
+    return time_on_air, time_off
+
+
 class Gateway:
     SENSITIVITY = {6: -121, 7: -126.5, 8: -129, 9: -131.5, 10: -134, 11: -136.5, 12: -139.5}
 
+    DL_PAYLOAD_SIZE = 12
+    DL_TIME_ON_AIR, DL_TIME_OFF = downlink_tables(DL_PAYLOAD_SIZE)
+
     def __init__(self, env, location, fast_adr_on=False, max_snr_adr=True, min_snr_adr=False, avg_snr_adr=False,
                  adr_margin_db=10):
         self.bytes_received = 0
@@ -43,7 +67,8 @@ class Gateway:
         for channel in LoRaParameters.CHANNELS:
             self.time_off[channel] = 0
         self.dl_not_schedulable = 0
-        self.uplink_packet_weak = []
+        # only counted, the weak packets themselves are not kept
+        self.num_of_weak_packets = 0
         self.num_of_packet_received = 0
         self.env = env
 
@@ -58,8 +83,8 @@ class Gateway:
 
     def packet_received(self, from_node, packet: UplinkMessage, now):
 
-        downlink_meta_msg = DownlinkMetaMessage()
-        downlink_msg = DownlinkMessage(dmm=downlink_meta_msg)
+        downlink_msg = DownlinkMessage.acquire()
+        downlink_meta_msg = downlink_msg.meta
 
         """
         The packet is received at the gateway.
@@ -69,16 +94,27 @@ class Gateway:
         In addition, the gateway determines the best suitable DL Rx window.
         """
 
+        if not self.uplink_received(from_node, packet):
+            # the packet received is to weak
+            downlink_meta_msg.weak_packet = True
+            return downlink_msg
+
+        if from_node.adr:
+            downlink_msg.adr_param = self.adr(packet)
+
+        self.schedule_downlink(from_node, packet, downlink_msg, now)
+        return downlink_msg
+
+    def uplink_received(self, from_node, packet: UplinkMessage) -> bool:
+        # the uplink is decoded if it is strong enough
         if from_node.id not in self.packet_history:
             self.packet_history[from_node.id] = deque(maxlen=20)
             self.packet_num_received_from[from_node.id] = 0
             self.distinct_bytes_received_from[from_node.id] = 0
 
         if packet.rss < self.SENSITIVITY[packet.lora_param.sf] or packet.snr < required_snr(packet.lora_param.dr):
-            # the packet received is to weak
-            downlink_meta_msg.weak_packet = True
-            self.uplink_packet_weak.append(packet)
-            return downlink_msg
+            self.num_of_weak_packets += 1
+            return False
 
         self.bytes_received += packet.payload_size
         self.num_of_packet_received += 1
@@ -92,15 +128,23 @@ class Gateway:
         self.last_distinct_packets_received_from[from_node.id] = packet.id
 
         self.packet_history[from_node.id].append(packet.snr)
-
-        if from_node.adr:
-            downlink_msg.adr_param = self.adr(packet)
-
+        return True
+
+    def downlink_possible(self, packet: UplinkMessage, now) -> bool:
+        # the duty cycle allows a downlink in RX1 or RX2
+        possible_rx1, _, _ = self.check_duty_cycle(Gateway.DL_PAYLOAD_SIZE, packet.lora_param.sf,
+                                                   packet.lora_param.freq, now)
+        possible_rx2, _, _ = self.check_duty_cycle(Gateway.DL_PAYLOAD_SIZE, LoRaParameters.RX_2_DEFAULT_SF,
+                                                   LoRaParameters.RX_2_DEFAULT_FREQ, now)
+        return possible_rx1 or possible_rx2
+
+    def schedule_downlink(self, from_node, packet: UplinkMessage, downlink_msg: DownlinkMessage, now):
+        downlink_meta_msg = downlink_msg.meta
         # first compute if DC can be done for RX1 and RX2
-        possible_rx1, time_on_air_rx1, off_time_till_rx1 = self.check_duty_cycle(12, packet.lora_param.sf,
+        possible_rx1, time_on_air_rx1, off_time_till_rx1 = self.check_duty_cycle(Gateway.DL_PAYLOAD_SIZE, packet.lora_param.sf,
                                                                                  packet.lora_param.freq,
                                                                                  now)
-        possible_rx2, time_on_air_rx2, off_time_till_rx2 = self.check_duty_cycle(12, LoRaParameters.RX_2_DEFAULT_SF,
+        possible_rx2, time_on_air_rx2, off_time_till_rx2 = self.check_duty_cycle(Gateway.DL_PAYLOAD_SIZE, LoRaParameters.RX_2_DEFAULT_SF,
                                                                                  LoRaParameters.RX_2_DEFAULT_FREQ,
                                                                                  now)
 
@@ -147,18 +191,18 @@ class Gateway:
                 self.time_off[time_off_for_channel] = time_off_till
         else:
             downlink_meta_msg.dc_limit_reached = True
-        return downlink_msg
 
     def check_duty_cycle(self, payload_size, sf, freq, now) -> (bool, float, float):
-        from Framework import LoRaPacket
-        time_on_air = LoRaPacket.time_on_air(payload_size, lora_param=LoRaParameters(freq=freq, sf=sf, bw=125, cr=5, crc_enabled=1, de_enabled=0, header_implicit_mode=1))
+        if payload_size == Gateway.DL_PAYLOAD_SIZE:
+            time_on_air = Gateway.DL_TIME_ON_AIR[sf, freq]
+            time_off = Gateway.DL_TIME_OFF[sf, freq]
+        else:
+            time_on_air, time_off = downlink_airtime(payload_size, sf, freq)
         # it is not possible to schedule a message now on this channel for this message
         if self.time_off[freq] > self.env.now:
             return False, time_on_air, -1
 
         # update time_off time
-        # https://github.com/things4u/things4u.github.io/blob/master/DeveloperGuide/LoRa%20documents/LoRaWAN%20Specification%201R0.pdf
-        time_off = time_on_air / LoRaParameters.CHANNEL_DUTY_CYCLE[freq] - time_on_air
         off_time_till = self.env.now + time_off
         return True, time_on_air, off_time_till
 
@@ -225,8 +269,8 @@ class Gateway:
                 # TX power is increased by 3dBm per step, until TXmax is reached (=14 dBm for EU868).
                 num_steps = - num_steps  # invert so we do not need to work with negative numbers
                 new_tx_power = np.amin([current_tx_power + (num_steps * 3), 14])
-            if PRINT_ENABLED:
-                print(str({'dr': new_dr, 'tp': new_tx_power}))
+            if tracer.enabled and tracer.accepts('adr', packet.node.id, self.env.now):
+                tracer.emit('adr', packet.node.id, self.env.now, dr=new_dr, tp=new_tx_power)
 
             return {'dr': new_dr, 'tp': new_tx_power}
         else:
@@ -236,8 +280,8 @@ class Gateway:
         print('\n\t\t GATEWAY')
         print('Received {} packets'.format(self.num_of_packet_received))
         print('Lost {} downlink packets'.format(self.dl_not_schedulable))
-        if len(self.uplink_packet_weak) != 0 and self.num_of_packet_received != 0:
-            weak_ratio = len(self.uplink_packet_weak) / self.num_of_packet_received
+        if self.num_of_weak_packets != 0 and self.num_of_packet_received != 0:
+            weak_ratio = self.num_of_weak_packets / self.num_of_packet_received
             print('Ratio Weak/Received is {0:.2f}%'.format(weak_ratio * 100))
 
         print('Bytes received at gateway {0:.2f}'.format(self.bytes_received))
@@ -245,6 +289,7 @@ class Gateway:
     def get_der(self, nodes):
         packets_sent = 0
         for node in nodes:
+            node.settle()
             packets_sent += node.packets_sent
 
         return self.num_of_packet_received / packets_sent
@@ -253,7 +298,7 @@ class Gateway:
         series = pd.Series({
             'BytesReceived': self.bytes_received,
             'DLPacketsLost': self.dl_not_schedulable,
-            'ULWeakPackets': len(self.uplink_packet_weak),
+            'ULWeakPackets': self.num_of_weak_packets,
             'PacketsReceived': self.num_of_packet_received,
             'UniquePacketsReceived': self.distinct_packets_received
         })
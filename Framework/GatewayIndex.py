@@ -0,0 +1,36 @@
+import numpy as np
+
+from Framework.Location import Location
+
+
+class GatewayIndex:
+    """Grid over the gateway locations with cells of max_range by max_range.
+
+    The gateways within max_range of a location can only be in the 3x3 cells around that location,
+    hence a lookup only depends on the local gateway density and not on the number of gateways.
+    """
+
+    def __init__(self, gateways: list, max_range=None):
+        self.gateways = gateways
+        self.max_range = max_range
+        self.cells = dict()
+        if max_range is not None:
+            for idx, gateway in enumerate(gateways):
+                self.cells.setdefault(self.cell(gateway.location), []).append(idx)
+
+    def cell(self, location: Location):
+        return int(np.floor(location.x / self.max_range)), int(np.floor(location.y / self.max_range))
+
+    def within(self, location: Location) -> list:
+        """Indices (ascending) of the gateways within max_range of `location`, all gateways if there is no max_range."""
+        if self.max_range is None:
+            return list(range(len(self.gateways)))
+        cell_x, cell_y = self.cell(location)
+        found = []
+        for delta_x in [-1, 0, 1]:
+            for delta_y in [-1, 0, 1]:
+                for idx in self.cells.get((cell_x + delta_x, cell_y + delta_y), []):
+                    if Location.distance(location, self.gateways[idx].location) <= self.max_range:
+                        found.append(idx)
+        found.sort()
+        return found
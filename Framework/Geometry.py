@@ -0,0 +1,94 @@
+import numpy as np
+
+from Framework.Location import Location
+
+
+class Geometry:
+    """Distances between the nodes and the gateways, kept as (nodes, gateways) matrices.
+
+    distance_2d is the distance in the plane (as Location.distance, the distance the propagation models take),
+    distance_3d includes the difference in altitude (a missing altitude counts as 0).
+    The rows of all nodes registered before the first lookup are computed in one vectorized call. A node that moved is
+    registered again, only its row is recomputed. Several air interfaces (one per gateway, see
+    MultiGatewayAirInterface) share one Geometry, each reads the column of its gateway.
+    """
+
+    def __init__(self, gateway_locations: list):
+        self.gateways = Geometry.coordinates(gateway_locations)
+        # row of the matrices per node id
+        self.row_of = dict()
+        self.num_rows = 0
+        self.nodes = np.empty((0, 3))
+        self._distance_2d = np.empty((0, len(self.gateways)))
+        self._distance_3d = np.empty((0, len(self.gateways)))
+        self.pending = dict()
+
+    @staticmethod
+    def coordinates(locations) -> np.ndarray:
+        # (x, y, alt) per location
+        return np.array([(location.x, location.y, 0 if location.alt is None else location.alt)
+                         for location in locations], dtype=float).reshape(-1, 3)
+
+    @staticmethod
+    def of(node_locations: list, gateway_locations: list) -> 'Geometry':
+        # geometry of a deployment, the node ids are the positions in node_locations
+        geometry = Geometry(gateway_locations)
+        for node_id, location in enumerate(node_locations):
+            geometry.register(node_id, location)
+        geometry.fill()
+        return geometry
+
+    def register(self, node_id, location: Location):
+        self.pending[node_id] = location
+
+    def grow(self, num_rows):
+        # at least doubles the capacity, the rows in use are copied
+        capacity = max(num_rows, 2 * len(self.nodes))
+        for name in ['nodes', '_distance_2d', '_distance_3d']:
+            old = getattr(self, name)
+            new = np.empty((capacity, old.shape[1]))
+            new[:self.num_rows] = old[:self.num_rows]
+            setattr(self, name, new)
+
+    def fill(self):
+        if len(self.pending) == 0:
+            return
+        new_ids = [node_id for node_id in self.pending if node_id not in self.row_of]
+        if self.num_rows + len(new_ids) > len(self.nodes):
+            self.grow(self.num_rows + len(new_ids))
+        for node_id in new_ids:
+            self.row_of[node_id] = self.num_rows
+            self.num_rows += 1
+        rows = np.array([self.row_of[node_id] for node_id in self.pending], dtype=np.int64)
+        nodes = Geometry.coordinates(self.pending.values())
+        delta = nodes[:, np.newaxis, :] - self.gateways[np.newaxis, :, :]
+        squared_2d = delta[:, :, 0] ** 2 + delta[:, :, 1] ** 2
+        self.nodes[rows] = nodes
+        self._distance_2d[rows] = np.sqrt(squared_2d)
+        self._distance_3d[rows] = np.sqrt(squared_2d + delta[:, :, 2] ** 2)
+        self.pending = dict()
+
+    def move(self, node_id, location: Location):
+        self.register(node_id, location)
+        self.fill()
+
+    @property
+    def distance_2d(self) -> np.ndarray:
+        self.fill()
+        return self._distance_2d[:self.num_rows]
+
+    @property
+    def distance_3d(self) -> np.ndarray:
+        self.fill()
+        return self._distance_3d[:self.num_rows]
+
+    def rows(self, node_ids) -> np.ndarray:
+        return np.array([self.row_of[node_id] for node_id in node_ids], dtype=np.int64)
+
+    def distances(self, node_ids, gateway=0, three_d=False) -> np.ndarray:
+        matrix = self.distance_3d if three_d else self.distance_2d
+        return matrix[self.rows(node_ids), gateway]
+
+    def distance(self, node_id, gateway=0, three_d=False) -> float:
+        matrix = self.distance_3d if three_d else self.distance_2d
+        return matrix.item(self.row_of[node_id], gateway)
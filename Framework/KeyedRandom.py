@@ -0,0 +1,68 @@
+import math
+
+import numpy as np
+
+MASK = 2 ** 64 - 1
+GOLDEN = 0x9e3779b97f4a7c15
+MIX_1 = 0xbf58476d1ce4e5b9
+MIX_2 = 0x94d049bb133111eb
+
+
+def mix(x: int) -> int:
+    # splitmix64 finalizer on a python int
+    x = (x + GOLDEN) & MASK
+    x = ((x ^ (x >> 30)) * MIX_1) & MASK
+    x = ((x ^ (x >> 27)) * MIX_2) & MASK
+    return x ^ (x >> 31)
+
+
+def mix_array(x: np.ndarray) -> np.ndarray:
+    # splitmix64 finalizer on uint64 arrays (wraps around like the python int version)
+    x = x + np.uint64(GOLDEN)
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(MIX_1)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(MIX_2)
+    return x ^ (x >> np.uint64(31))
+
+
+def uniform_of(seed: int, key: int, stream: int) -> float:
+    """Uniform [0, 1) draw that only depends on (seed, key, stream)"""
+    return (mix(mix(mix(seed) ^ key) ^ stream) >> 11) * 2.0 ** -53
+
+
+class KeyedRandom:
+    """Counter-based random numbers for a batch of keys (e.g. one key per packet).
+
+    Element i of a draw only depends on (seed, keys[i], stream), the stream is advanced by every draw.
+    Results do not depend on how the keys are batched or on which process draws them, as long as the same draws
+    are done per key. Implements the subset of the np.random interface used by the propagation models.
+    """
+
+    def __init__(self, seed, keys, stream=0):
+        self.seed = seed
+        self.keys = np.asarray(keys, dtype=np.uint64)
+        self.stream = stream
+
+    def random(self, size=None) -> np.ndarray:
+        shape = self.keys.shape if size is None else size
+        if int(np.prod(shape)) != self.keys.size:
+            raise ValueError('A keyed draw needs one key per element ({} keys for shape {})'.format(self.keys.size,
+                                                                                                   shape))
+        h = mix_array(mix_array(np.uint64(mix(self.seed)) ^ self.keys) ^ np.uint64(self.stream))
+        self.stream += 1
+        return ((h >> np.uint64(11)) * 2.0 ** -53).reshape(shape)
+
+    def uniform(self, low=0.0, high=1.0, size=None) -> np.ndarray:
+        return low + (high - low) * self.random(size)
+
+    def normal(self, loc=0.0, scale=1.0, size=None) -> np.ndarray:
+        # Box-Muller
+        u_1 = self.random(size)
+        u_2 = self.random(size)
+        return loc + scale * np.sqrt(-2 * np.log1p(-u_1)) * np.cos(2 * math.pi * u_2)
+
+    def choice(self, a, size=None) -> np.ndarray:
+        a = np.asarray(a)
+        return a[(self.random(size) * len(a)).astype(int)]
+
+    def randint(self, low, high, size=None) -> np.ndarray:
+        return low + (self.random(size) * (high - low)).astype(int)
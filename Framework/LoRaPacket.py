@@ -1,34 +1,64 @@
 import math
+from functools import lru_cache
+
 import numpy as np
 from Framework.LoRaParameters import LoRaParameters
+from Simulations.GlobalConfig import MESSAGE_POOL_SIZE
 
 
 # this function computes the airtime for a specific set of parameters
 # for a packet with `payloadSize` in bytes
 # according to LoraDesignGuide_STD.pdf
 # return the airtime of a packet in ms
-def time_on_air(payload_size: int, lora_param: LoRaParameters):
+# the parameters only take a few values, hence the results are memoized process-wide
+@lru_cache(maxsize=None)
+def airtime(payload_size: int, sf: int, bw: int, cr: int, crc: int, h: int, de: int) -> float:
     n_pream = 8  # https://www.google.com/patents/EP2763321A1?cl=en
-    t_sym = (2.0 ** lora_param.sf) / lora_param.bw
+    t_sym = (2.0 ** sf) / bw
     t_pream = (n_pream + 4.25) * t_sym
     payload_symb_n_b = 8 + max(
         math.ceil(
             (
-                8.0 * payload_size - 4.0 * lora_param.sf + 28 + 16 * lora_param.crc - 20 * lora_param.h) / (
-                4.0 * (lora_param.sf - 2 * lora_param.de)))
-        * (lora_param.cr + 4), 0)
+                8.0 * payload_size - 4.0 * sf + 28 + 16 * crc - 20 * h) / (
+                4.0 * (sf - 2 * de)))
+        * (cr + 4), 0)
+    t_payload = payload_symb_n_b * t_sym
+    return t_pream + t_payload
+
+
+def time_on_air(payload_size: int, lora_param: LoRaParameters):
+    return airtime(payload_size, lora_param.sf, lora_param.bw, lora_param.cr, lora_param.crc, lora_param.h,
+                   lora_param.de)
+
+
+def time_on_air_batch(payload_size, sf, bw, cr, crc, h, de) -> np.ndarray:
+    """Airtime (ms) for arrays of parameters (broadcast against each other), equal to airtime per element"""
+    payload_size, sf, bw, cr, crc, h, de = np.broadcast_arrays(payload_size, sf, bw, cr, crc, h, de)
+    n_pream = 8
+    t_sym = (2.0 ** sf) / bw
+    t_pream = (n_pream + 4.25) * t_sym
+    payload_symb_n_b = 8 + np.maximum(
+        np.ceil((8.0 * payload_size - 4.0 * sf + 28 + 16 * crc - 20 * h) / (4.0 * (sf - 2 * de))) * (cr + 4), 0)
     t_payload = payload_symb_n_b * t_sym
     return t_pream + t_payload
 
 
 class UplinkMessage:
+    # receptions and air_key are set by the (multi-gateway) air interface
+    __slots__ = ['is_confirmed_message', 'node', 'start_on_air', 'lora_param', 'payload_size', 'collided', 'received',
+                 'rss', 'snr', 'on_air', '_time_on_air', 'ack_retries_cnt', 'unique', 'downlink_message', 'id',
+                 'receptions', 'air_key']
+
+    # released messages, reused by acquire
+    pool = []
+
     def __init__(self, node, start_on_air, payload_size,  id, collided=False,
                  confirmed_message=True, unique_msg = True):
         self. is_confirmed_message=confirmed_message
         self.node = node
         self.start_on_air = start_on_air
+        # the channel is chosen by the node when it sends the packet (see Node.best_channel)
         self.lora_param = node.lora_param
-        self.lora_param.freq = np.random.choice(LoRaParameters.DEFAULT_CHANNELS)
         self.payload_size = payload_size
         self.collided = collided
         self.received = False
@@ -38,10 +68,33 @@ class UplinkMessage:
         self._time_on_air = None
         self.ack_retries_cnt = 0
         self.unique = unique_msg
-        if self.is_confirmed_message:
-            self.downlink_message = None
+        # always reset, a pooled message may carry the downlink of its previous use
+        self.downlink_message = None
         self.id = id
 
+    @staticmethod
+    def acquire(node, start_on_air, payload_size, id, confirmed_message=True):
+        if UplinkMessage.pool:
+            packet = UplinkMessage.pool.pop()
+            packet.__init__(node, start_on_air, payload_size, id, confirmed_message=confirmed_message)
+            return packet
+        return UplinkMessage(node, start_on_air, payload_size, id, confirmed_message=confirmed_message)
+
+    def release(self):
+        # the message is no longer used, the references to the node (and its receptions) are dropped
+        self.node = None
+        self.lora_param = None
+        self.receptions = None
+        if len(UplinkMessage.pool) < MESSAGE_POOL_SIZE:
+            UplinkMessage.pool.append(self)
+
+    def __copy__(self):
+        copy = UplinkMessage.__new__(UplinkMessage)
+        for name in UplinkMessage.__slots__:
+            if hasattr(self, name):
+                setattr(copy, name, getattr(self, name))
+        return copy
+
     # this function computes the airtime of a packet
     # for a packet with `payloadSize` in bytes
     # according to LoraDesignGuide_STD.pdf
@@ -49,23 +102,12 @@ class UplinkMessage:
     def my_time_on_air(self):
 
         if self._time_on_air is None:
-            n_pream = 8  # https://www.google.com/patents/EP2763321A1?cl=en
-
-            t_sym = (2.0 ** self.lora_param.sf) / self.lora_param.bw
-            t_pream = (n_pream + 4.25) * t_sym
-            payload_symb_n_b = 8 + max(
-                math.ceil(
-                    (
-                            8.0 * self.payload_size - 4.0 * self.lora_param.sf + 28 + 16 * self.lora_param.crc - 20 * self.lora_param.h) / (
-                            4.0 * (self.lora_param.sf - 2 * self.lora_param.de)))
-                * (self.lora_param.cr + 4), 0)
-            t_payload = payload_symb_n_b * t_sym
-            self._time_on_air = t_pream + t_payload
+            self._time_on_air = time_on_air(self.payload_size, self.lora_param)
 
         return self._time_on_air
 
     def set_random_freq(self):
-        self.lora_param.freq = np.random.choice(LoRaParameters.DEFAULT_CHANNELS)
+        self.lora_param.freq = self.node.rng.choice(LoRaParameters.DEFAULT_CHANNELS)
 
     @property
     def sf(self):
@@ -78,6 +120,8 @@ class UplinkMessage:
 
 
 class DownlinkMetaMessage:
+    __slots__ = ['scheduled_receive_slot', 'dc_limit_reached', 'weak_packet']
+
     RX_SLOT_1 = 1
     RX_SLOT_2 = 2
 
@@ -91,7 +135,27 @@ class DownlinkMetaMessage:
 
 
 class DownlinkMessage:
+    __slots__ = ['payload', 'adr_param', 'meta']
+
+    # released messages (with their meta message), reused by acquire
+    pool = []
+
     def __init__(self, payload=None, adr_param=None, dmm: DownlinkMetaMessage=None):
         self.payload = payload
         self.adr_param = adr_param
         self.meta = dmm
+
+    @staticmethod
+    def acquire():
+        # a downlink message with a new (or reset) meta message
+        if DownlinkMessage.pool:
+            downlink_msg = DownlinkMessage.pool.pop()
+            downlink_msg.meta.__init__()
+            return downlink_msg
+        return DownlinkMessage(dmm=DownlinkMetaMessage())
+
+    def release(self):
+        self.payload = None
+        self.adr_param = None
+        if self.meta is not None and len(DownlinkMessage.pool) < MESSAGE_POOL_SIZE:
+            DownlinkMessage.pool.append(self)
@@ -1,25 +1,37 @@
+import math
 import random
-import numpy as np
 
 
 class Location:
 
-    def __init__(self, x=None, y=None, min=None, max=None, alt=None, alt_min=None, alt_max=None, indoor=False):
+    def __init__(self, x=None, y=None, min=None, max=None, alt=None, alt_min=None, alt_max=None, indoor=False,
+                 rng=None):
         self.x = x
         self.y = y
         self.alt = alt
 
         if x is None or y is None:
             if min is not None and max is not None:
-                self.x = random.randint(min, max)
-                self.y = random.randint(min, max)
-                self.alt = random.randint(alt_min, alt_max)
+                # rng is a random stream (see RandomStreams), by default the stdlib random is used (bounds inclusive)
+                # the altitude is only drawn if its bounds are given
+                if rng is None:
+                    self.x = random.randint(min, max)
+                    self.y = random.randint(min, max)
+                    if alt_min is not None and alt_max is not None:
+                        self.alt = random.randint(alt_min, alt_max)
+                else:
+                    self.x = rng.randint(min, max + 1)
+                    self.y = rng.randint(min, max + 1)
+                    if alt_min is not None and alt_max is not None:
+                        self.alt = rng.randint(alt_min, alt_max + 1)
             else:
                 raise ValueError('Define min and max or give x and y coordinates')
         self.indoor = indoor
 
     @staticmethod
     def distance(loc_1, loc_2):
-        delta_x = loc_1.x - loc_2.x
-        delta_y = loc_1.y - loc_2.y
-        return np.sqrt(np.power(delta_x, 2) + np.power(delta_y, 2))
+        # on Python floats, the same result as np.sqrt(np.power(delta_x, 2) + ...) without the numpy scalar overhead
+        # the distances of many nodes are computed at once by Geometry
+        delta_x = float(loc_1.x - loc_2.x)
+        delta_y = float(loc_1.y - loc_2.y)
+        return math.sqrt(delta_x * delta_x + delta_y * delta_y)
@@ -0,0 +1,48 @@
+# Process-wide registry of the trained propagation models.
+# Every artifact is loaded lazily, once per process, and shared read-only afterwards. Load them (preload) before
+# creating a multiprocessing pool, the forked workers then inherit the loaded models instead of loading them again.
+# If ML_MODEL_MMAP_DIR is set, the artifacts are stored there uncompressed on first use and loaded with
+# memory-mapped arrays, so also spawned workers share the arrays through the page cache.
+import os
+import zipfile
+
+import joblib
+
+from Simulations.GlobalConfig import ML_MODEL_MMAP_DIR
+
+MODEL_DIR = os.path.dirname(os.path.abspath(__file__))
+SCALER = 'mclab_scaler'
+
+_loaded = dict()
+
+
+def _load_from_disk(name):
+    sav_file = os.path.join(MODEL_DIR, name + '.sav')
+    if os.path.isfile(sav_file):
+        return joblib.load(sav_file)
+    with zipfile.ZipFile(os.path.join(MODEL_DIR, name + '.zip')) as zf:
+        with zf.open(name + '.sav') as f:
+            return joblib.load(f)
+
+
+def load(name):
+    if name not in _loaded:
+        if ML_MODEL_MMAP_DIR is None:
+            _loaded[name] = _load_from_disk(name)
+        else:
+            mmap_file = os.path.join(ML_MODEL_MMAP_DIR, name + '.joblib')
+            if not os.path.isfile(mmap_file):
+                os.makedirs(ML_MODEL_MMAP_DIR, exist_ok=True)
+                joblib.dump(_load_from_disk(name), mmap_file + '.tmp')
+                os.replace(mmap_file + '.tmp', mmap_file)
+            _loaded[name] = joblib.load(mmap_file, mmap_mode='r')
+    return _loaded[name]
+
+
+def preload(*names):
+    for name in (SCALER,) + names:
+        load(name)
+
+
+def is_loaded(name) -> bool:
+    return name in _loaded
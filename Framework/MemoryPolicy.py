@@ -0,0 +1,43 @@
+import gc
+
+from Simulations.GlobalConfig import *
+
+
+class MemoryPolicy:
+    """How the garbage collector runs during a simulation
+
+    off:            the cyclic garbage collector is disabled, objects are only freed by reference counting
+    generational:   the default generational collector of python with the given thresholds
+    periodic:       the automatic collector is disabled and a full collection is done every period_min simulated minutes
+    """
+
+    MODES = ['off', 'generational', 'periodic']
+
+    def __init__(self, mode=GC_MODE, thresholds=GC_THRESHOLDS, period_min=GC_PERIOD_MIN):
+        if mode not in MemoryPolicy.MODES:
+            raise ValueError('GC mode {} not supported, use one of {}'.format(mode, MemoryPolicy.MODES))
+        self.mode = mode
+        self.thresholds = thresholds
+        self.period_min = period_min
+        self.num_of_collections = 0
+        self.env = None
+
+    def apply(self, env):
+        if self.env is env:
+            # already applied, e.g. a policy shared by the air interfaces of several gateways
+            return
+        self.env = env
+        if self.mode == 'off':
+            gc.disable()
+        elif self.mode == 'generational':
+            gc.set_threshold(*self.thresholds)
+            gc.enable()
+        elif self.mode == 'periodic':
+            gc.disable()
+            env.process(self.collect_periodically(env))
+
+    def collect_periodically(self, env):
+        while True:
+            yield env.timeout(self.period_min * 60 * 1000)
+            gc.collect()
+            self.num_of_collections += 1
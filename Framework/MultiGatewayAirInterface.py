@@ -0,0 +1,90 @@
+import copy
+
+import pandas as pd
+
+from Simulations.GlobalConfig import *
+from Framework import PropagationModel
+from Framework.AirInterface import AirInterface
+from Framework.GatewayIndex import GatewayIndex
+from Framework.Geometry import Geometry
+from Framework.LoRaPacket import UplinkMessage
+from Framework.MemoryPolicy import MemoryPolicy
+from Framework.NodePopulation import NodePopulation
+from Framework.PacketLog import PacketLog
+from Framework.SNRModel import SNRModel
+from Framework.Tracking import TrackingPolicy
+
+
+class MultiGatewayAirInterface:
+    """Air interface of a network with several gateways.
+
+    Every gateway has its own AirInterface (path loss, RSS/SNR and collisions as seen by that gateway).
+    A packet is put in the air of the gateways within max_range of its node as a shallow copy (a reception),
+    it is only collided if it collided at all of them. The receptions are combined by the NetworkServer.
+    """
+
+    def __init__(self, gateways: list, prop_model: PropagationModel, snr_model: SNRModel, env,
+                 max_range=MAX_GATEWAY_RANGE_M, memory_policy: MemoryPolicy = None, tracking: TrackingPolicy = None,
+                 packet_log: PacketLog = None):
+        if memory_policy is None:
+            memory_policy = MemoryPolicy()
+        if tracking is None:
+            tracking = TrackingPolicy()
+        self.gateways = gateways
+        self.env = env
+        self.population = NodePopulation()
+        self.tracking = tracking
+        if packet_log is None and PACKET_LOG_DIR is not None:
+            packet_log = PacketLog()
+        self.packet_log = packet_log
+        # one distance matrix for all gateways
+        self.geometry = Geometry([gateway.location for gateway in gateways])
+        self.air_interfaces = [AirInterface(gateway, prop_model, snr_model, env, memory_policy=memory_policy,
+                                            tracking=tracking, packet_log=packet_log, geometry=self.geometry,
+                                            gateway_column=idx) for idx, gateway in enumerate(gateways)]
+        self.gateway_index = GatewayIndex(gateways, max_range)
+        # indices of the gateways in range per node
+        self.gateways_of = dict()
+        self.num_of_packets_collided = 0
+        self.num_of_packets_send = 0
+
+    def register_node(self, node):
+        self.gateways_of[node.id] = self.gateway_index.within(node.location)
+        for idx in self.gateways_of[node.id]:
+            self.air_interfaces[idx].register_node(node)
+
+    def packet_in_air(self, packet: UplinkMessage):
+        self.num_of_packets_send += 1
+        # computed before copying, so all receptions share it
+        packet.my_time_on_air()
+        receptions = []
+        for idx in self.gateways_of[packet.node.id]:
+            reception = copy.copy(packet)
+            self.air_interfaces[idx].packet_in_air(reception)
+            receptions.append((self.air_interfaces[idx], reception))
+        packet.receptions = receptions
+        if len(receptions) > 0:
+            strongest = max(receptions, key=lambda r: r[1].rss)[1]
+            packet.rss = strongest.rss
+            packet.snr = strongest.snr
+
+    def packet_received(self, packet: UplinkMessage) -> bool:
+        """The packet is removed from the air of every gateway in range
+            :return bool (True if collided at every gateway in range)"""
+        collided = [air_interface.packet_received(reception) for air_interface, reception in packet.receptions]
+        # a packet without gateway in range is not collided, it is too weak for the network server
+        packet.collided = len(collided) > 0 and all(collided)
+        if packet.collided:
+            self.num_of_packets_collided += 1
+        return packet.collided
+
+    def log(self):
+        print('Total number of packets in the air {}'.format(self.num_of_packets_send))
+        print('Total number of packets collided at all gateways {} {:2.2f}%'.format(
+            self.num_of_packets_collided, self.num_of_packets_collided * 100 / self.num_of_packets_send))
+
+    def get_simulation_data(self, name) -> pd.Series:
+        series = pd.Series([self.num_of_packets_collided, self.num_of_packets_send],
+                           index=['NumberOfPacketsCollided', 'NumberOfPacketsOnAir'])
+        series.name = name
+        return series.transpose()
@@ -0,0 +1,90 @@
+import pandas as pd
+
+from Framework.LoRaPacket import UplinkMessage, DownlinkMessage
+
+
+class NetworkServer:
+    """Combines the receptions of a packet by several gateways (see MultiGatewayAirInterface).
+
+    A packet is received if at least one gateway decoded it, duplicates are dropped.
+    The downlink (and ADR) is done by the gateway with the best SNR that can still send within its duty cycle.
+    Nodes use the network server as their base station.
+    """
+
+    # a network server has no location of its own
+    location = None
+
+    def __init__(self, gateways: list):
+        self.gateways = gateways
+        self.bytes_received = 0
+        self.num_of_packet_received = 0
+        self.num_of_duplicates = 0
+        self.num_of_weak_packets = 0
+        self.distinct_packets_received = 0
+        self.last_distinct_packets_received_from = dict()
+        self.dl_not_schedulable = 0
+
+    def packet_received(self, from_node, packet: UplinkMessage, now) -> DownlinkMessage:
+        downlink_msg = DownlinkMessage.acquire()
+        downlink_meta_msg = downlink_msg.meta
+
+        decoded = []
+        for air_interface, reception in packet.receptions:
+            if not reception.collided and air_interface.gateway.uplink_received(from_node, reception):
+                decoded.append((air_interface.gateway, reception))
+
+        if len(decoded) == 0:
+            # not decoded by any gateway
+            downlink_meta_msg.weak_packet = True
+            self.num_of_weak_packets += 1
+            return downlink_msg
+
+        self.bytes_received += packet.payload_size
+        self.num_of_packet_received += 1
+        self.num_of_duplicates += len(decoded) - 1
+
+        if from_node.id not in self.last_distinct_packets_received_from or \
+                self.last_distinct_packets_received_from[from_node.id] != packet.id:
+            self.distinct_packets_received += 1
+        self.last_distinct_packets_received_from[from_node.id] = packet.id
+
+        decoded.sort(key=lambda d: d[1].snr, reverse=True)
+        gateway, reception = decoded[0]
+        for candidate_gateway, candidate_reception in decoded:
+            if candidate_gateway.downlink_possible(candidate_reception, now):
+                gateway, reception = candidate_gateway, candidate_reception
+                break
+
+        if from_node.adr:
+            downlink_msg.adr_param = gateway.adr(reception)
+
+        gateway.schedule_downlink(from_node, reception, downlink_msg, now)
+        if downlink_meta_msg.dc_limit_reached:
+            self.dl_not_schedulable += 1
+        return downlink_msg
+
+    def log(self):
+        print('\n\t\t NETWORK SERVER')
+        print('Received {} packets ({} duplicates)'.format(self.num_of_packet_received, self.num_of_duplicates))
+        print('Lost {} downlink packets'.format(self.dl_not_schedulable))
+        print('Bytes received {0:.2f}'.format(self.bytes_received))
+
+    def get_der(self, nodes):
+        packets_sent = 0
+        for node in nodes:
+            node.settle()
+            packets_sent += node.packets_sent
+
+        return self.num_of_packet_received / packets_sent
+
+    def get_simulation_data(self, name) -> pd.Series:
+        series = pd.Series({
+            'BytesReceived': self.bytes_received,
+            'DLPacketsLost': self.dl_not_schedulable,
+            'ULWeakPackets': self.num_of_weak_packets,
+            'PacketsReceived': self.num_of_packet_received,
+            'UniquePacketsReceived': self.distinct_packets_received,
+            'DuplicatePackets': self.num_of_duplicates
+        })
+        series.name = name
+        return series.transpose()
@@ -1,3 +1,4 @@
+from collections import deque
 from copy import deepcopy
 from enum import Enum, auto
 
@@ -5,12 +6,17 @@ import matplotlib.pyplot as plt
 import pandas as pd
 
 from Framework.EnergyProfile import EnergyProfile
+from Framework.EventTrace import tracer
 from Framework.Gateway import Gateway
 from Framework.LoRaPacket import DownlinkMessage
 from Framework.LoRaPacket import DownlinkMetaMessage
 from Framework.LoRaPacket import UplinkMessage
 from Framework.LoRaParameters import LoRaParameters
 from Framework.Location import Location
+from Framework.NodePopulation import NodePopulation, NodeLoRaParameters, Column, RowView, location_of
+from Framework.NodeStatistics import NodeStatistics
+from Framework.RandomStreams import resolve
+from Framework.Tracking import TrackingPolicy
 from Simulations.GlobalConfig import *
 
 
@@ -28,9 +34,43 @@ class NodeState(Enum):
 
 
 class Node:
+    # the state of a node is stored in a row of a NodePopulation (by default the one of the air interface),
+    # the Node object itself only holds references
+    __slots__ = ['population', 'index', 'id', 'energy_profile', 'base_station', 'env', 'stop_state_time',
+                 'start_state_time', 'current_state', 'lora_param', 'air_interface', 'change_lora_param',
+                 'lost_packages_time', 'power_tracking', 'energy_measurements', 'state_changes', 'packet_to_sent',
+                 'tracking', 'pending', 'rng']
+
+    power_gain = Column('power_gain')
+    num_tx_state_changes = Column('num_tx_state_changes')
+    total_wait_time_because_dc = Column('total_wait_time_because_dc')
+    num_no_downlink = Column('num_no_downlink')
+    num_unique_packets_sent = Column('num_unique_packets_sent')
+    start_device_active = Column('start_device_active')
+    num_collided = Column('num_collided')
+    num_retransmission = Column('num_retransmission')
+    packets_sent = Column('packets_sent')
+    adr = Column('adr')
+    process_time = Column('process_time')
+    payload_size = Column('payload_size')
+    prev_power_mW = Column('prev_power_mW')
+    sleep_time = Column('sleep_time')
+    energy_value = Column('energy_value')
+    bytes_sent = Column('bytes_sent')
+    confirmed_messages = Column('confirmed_messages')
+    unique_packet_id = Column('unique_packet_id')
+    sleep_start_time = Column('sleep_start_time')
+
     def __init__(self, node_id, energy_profile: EnergyProfile, lora_parameters, sleep_time, process_time, adr, location,
                  base_station: Gateway, env, payload_size, air_interface, confirmed_messages=True,
-                 massive_mimo_gain=False, number_of_antennas=1):
+                 massive_mimo_gain=False, number_of_antennas=1, population: NodePopulation = None,
+                 tracking: TrackingPolicy = None, rng=None):
+        if population is None:
+            population = air_interface.population
+        self.population = population
+        self.index = population.allocate()
+        population.columns['node_id'][self.index] = node_id
+
         self.power_gain = 1
         if massive_mimo_gain:
             self.power_gain = 1/np.sqrt(number_of_antennas)
@@ -52,7 +92,7 @@ class Node:
         self.stop_state_time = self.env.now
         self.start_state_time = self.env.now
         self.current_state = NodeState.OFFLINE
-        self.lora_param = lora_parameters
+        self.lora_param = NodeLoRaParameters(population, self.index, lora_parameters)
         self.payload_size = payload_size
 
         self.prev_power_mW = 0
@@ -60,32 +100,62 @@ class Node:
         self.air_interface = air_interface
 
         self.location = location
+        self.air_interface.register_node(self)
 
         self.sleep_time = sleep_time
 
         self.change_lora_param = dict()
         self.energy_value = 0
 
-        self.lost_packages_time = []
+        # random stream of the node (see RandomStreams), by default the global np.random
+        self.rng = resolve(rng)
 
-        self.power_tracking = {'val': [], 'time': []}
-        self.energy_measurements = {'val': [], 'time': []}
-        self.state_changes = {'val': [], 'time': []}
-        self.energy_tracking = {NodeState(NodeState.SLEEP).name: 0.0, NodeState(NodeState.PROCESS).name: 0.0,
-                                NodeState(NodeState.RX).name: 0.0, NodeState(NodeState.TX).name: 0.0}
+        # time series for plotting, kept according to the tracking policy (by default the one of the air interface)
+        if tracking is None:
+            tracking = air_interface.tracking
+        self.tracking = tracking
+        self.lost_packages_time = tracking.series('lost_packets', (), node_id)
+        self.power_tracking = tracking.series('power', ('val',), node_id)
+        self.energy_measurements = tracking.series('energy', ('val',), node_id)
+        self.state_changes = tracking.series('state', ('val',), node_id)
 
         self.bytes_sent = 0
 
         self.packet_to_sent = None
 
-        self.time_off = dict()
-        for ch in LoRaParameters.CHANNELS:
-            self.time_off[ch] = 0
-
         self.confirmed_messages = confirmed_messages
 
         self.unique_packet_id = 0
 
+        # energy and counters computed ahead by the fast-forward engine, booked when their time is reached
+        self.pending = deque()
+
+    @property
+    def location(self) -> Location:
+        return location_of(self.population, self.index)
+
+    @location.setter
+    def location(self, location: Location):
+        columns = self.population.columns
+        columns['x'][self.index] = location.x
+        columns['y'][self.index] = location.y
+        columns['alt'][self.index] = np.nan if location.alt is None else location.alt
+        columns['indoor'][self.index] = location.indoor
+
+    @property
+    def energy_tracking(self) -> RowView:
+        # energy per state (mJ)
+        return RowView(self.population.energy, self.index, NodePopulation.ENERGY_STATE_INDEX)
+
+    @property
+    def time_off(self) -> RowView:
+        # time (ms) till the duty cycle allows to send again per channel
+        return RowView(self.population.time_off, self.index, NodePopulation.CHANNEL_INDEX)
+
+    def best_channel(self) -> int:
+        # channel with the lowest time off (the first one of LoRaParameters.CHANNELS on ties)
+        return LoRaParameters.CHANNELS[self.population.time_off[self.index].argmin()]
+
     def plot(self, prop_measurements):
         plt.figure()
         # plt.scatter(self.sleep_energy_time, self.sleep_energy_value, label='Sleep Power (mW)')
@@ -123,19 +193,21 @@ class Node:
         plt.show()
 
     def run(self):
-        random_wait = np.random.uniform(0,  MAX_DELAY_START_PER_NODE_MS)
+        random_wait = self.rng.uniform(0,  MAX_DELAY_START_PER_NODE_MS)
         yield self.env.timeout(random_wait)
         self.start_device_active = self.env.now
-        if  PRINT_ENABLED:
-            print('{} ms delayed prior to joining'.format(random_wait))
-            print('{} joining the network'.format(self.id))
-            # TODO ERROR!!!!! self.process
-            self.join(self.env)
-        if  PRINT_ENABLED:
-            print('{}: joined the network'.format(self.id))
+        if tracer.enabled:
+            self.trace('join', delay=random_wait)
+        # TODO ERROR!!!!! self.process
+        self.join(self.env)
+        if tracer.enabled:
+            self.trace('joined')
+        if FAST_FORWARD and self.fast_forward_possible():
+            yield from self.run_fast_forward()
+            return
         while True:
             # added also a random wait to accommodate for any timing issues on the node itself
-            random_wait = np.random.randint(0,  MAX_DELAY_BEFORE_SLEEP_MS)
+            random_wait = self.rng.randint(0,  MAX_DELAY_BEFORE_SLEEP_MS)
             yield self.env.timeout(random_wait)
 
             yield self.env.process(self.sleep())
@@ -145,8 +217,8 @@ class Node:
             self.track_power(self.energy_profile.sleep_power_mW)
 
             # ------------SENDING------------ #
-            if  PRINT_ENABLED:
-                print('{}: SENDING packet'.format(self.id))
+            if tracer.enabled:
+                self.trace('send')
 
             self.unique_packet_id += 1
 
@@ -154,17 +226,20 @@ class Node:
             if MAC_IMPROVEMENT and self.packets_sent < 20:
                 payload_size = 5
 
-            packet = UplinkMessage(node=self, start_on_air=self.env.now, payload_size=payload_size,
-                                   confirmed_message=self.confirmed_messages, id=self.unique_packet_id)
+            packet = UplinkMessage.acquire(node=self, start_on_air=self.env.now, payload_size=payload_size,
+                                           confirmed_message=self.confirmed_messages, id=self.unique_packet_id)
             downlink_message = yield self.env.process(self.send(packet))
             if downlink_message is None:
                 # message is collided and not received at the BS
                 yield self.env.process(self.dl_message_lost())
             else:
                 yield self.env.process(self.process_downlink_message(downlink_message, packet))
+                downlink_message.release()
+            self.packet_to_sent = None
+            packet.release()
 
-            if  PRINT_ENABLED:
-                print('{}: DONE sending'.format(self.id))
+            if tracer.enabled:
+                self.trace('send_done')
 
             self.num_unique_packets_sent += 1  # at the end to be sure that this packet was tx
 
@@ -182,8 +257,8 @@ class Node:
 
     def join_tx(self):
 
-        if  PRINT_ENABLED:
-            print('{}: \t JOIN TX'.format(self.id))
+        if tracer.enabled:
+            self.trace('join_tx')
         energy = LoRaParameters.JOIN_TX_ENERGY_MJ
 
         power = (LoRaParameters.JOIN_TX_ENERGY_MJ / LoRaParameters.JOIN_TX_TIME_MS) * 1000
@@ -193,8 +268,8 @@ class Node:
         self.track_energy('tx', energy)
 
     def join_wait(self):
-        if  PRINT_ENABLED:
-            print('{}: \t JOIN WAIT'.format(self.id))
+        if tracer.enabled:
+            self.trace('join_wait')
         self.track_power(self.energy_profile.sleep_power_mW)
         yield self.env.timeout(LoRaParameters.JOIN_ACCEPT_DELAY1)
         energy = LoRaParameters.JOIN_ACCEPT_DELAY1 * self.energy_profile.sleep_power_mW
@@ -204,8 +279,8 @@ class Node:
 
     def join_rx(self):
         # TODO RX1 and RX2
-        if  PRINT_ENABLED:
-            print('{}: \t JOIN RX'.format(self.id))
+        if tracer.enabled:
+            self.trace('join_rx')
         power = (LoRaParameters.JOIN_RX_ENERGY_MJ / LoRaParameters.JOIN_RX_TIME_MS) * 1000
         self.track_power(power)
         yield self.env.timeout(LoRaParameters.JOIN_RX_TIME_MS)
@@ -220,7 +295,7 @@ class Node:
         airtime = packet.my_time_on_air()
 
         # check channel with lowest wait time
-        channel = min(self.time_off, key=self.time_off.get)
+        channel = self.best_channel()
         # update to best_channel
         packet.lora_param.freq = channel
 
@@ -244,13 +319,14 @@ class Node:
         #      Received at BS      #
 
         if not collided:
-            if  PRINT_ENABLED:
-                print('{}: \t REC at BS'.format(self.id))
-                print('{}: \t RSS: {}'.format(self.id,packet.rss))
+            if tracer.enabled:
+                self.trace('received_at_bs', rss=packet.rss, snr=packet.snr)
             downlink_message = self.base_station.packet_received(self, packet, self.env.now)
         else:
             self.num_collided += 1
             downlink_message = None
+        if self.air_interface.packet_log is not None:
+            self.record_packet(packet, collided, downlink_message)
 
         yield self.env.process(self.send_rx(self.env, packet, downlink_message))
 
@@ -268,14 +344,14 @@ class Node:
 
         if downlink_message.adr_param is not None and self.adr:
             if int(self.lora_param.dr) != int(downlink_message.adr_param['dr']):
-                if  PRINT_ENABLED:
-                    print('\t\t Change DR {} to {}'.format(self.lora_param.dr, downlink_message.adr_param['dr']))
+                if tracer.enabled:
+                    self.trace('change_dr', old=self.lora_param.dr, new=downlink_message.adr_param['dr'])
                 self.lora_param.change_dr_to(downlink_message.adr_param['dr'])
                 changed = True
             # change tp based on downlink_message['tp']
             if int(self.lora_param.tp) != int(downlink_message.adr_param['tp']):
-                if  PRINT_ENABLED:
-                    print('\t\t Change TP {} to {}'.format(self.lora_param.tp, downlink_message.adr_param['tp']))
+                if tracer.enabled:
+                    self.trace('change_tp', old=self.lora_param.tp, new=downlink_message.adr_param['tp'])
                 self.lora_param.change_tp_to(downlink_message.adr_param['tp'])
                 changed = True
 
@@ -286,10 +362,12 @@ class Node:
             self.change_lora_param[lora_param_str].append(self.env.now)
 
     def log(self):
+        self.settle()
         if  LOG_ENABLED:
             print('---------- LOG from Node {} ----------'.format(self.id))
             print('\t Location {},{}'.format(self.location.x, self.location.y))
-            print('\t Distance from gateway {}'.format(Location.distance(self.location, self.base_station.location)))
+            if self.base_station.location is not None:
+                print('\t Distance from gateway {}'.format(Location.distance(self.location, self.base_station.location)))
             print('\t LoRa Param {}'.format(self.lora_param))
             print('\t ADR {}'.format(self.adr))
             print('\t Payload size {}'.format(self.payload_size))
@@ -314,8 +392,8 @@ class Node:
 
         self.energy_value += packet.lora_param.tp + (5 - packet.lora_param.dr)
 
-        if  PRINT_ENABLED:
-            print('{}: \t TX'.format(self.id))
+        if tracer.enabled:
+            self.trace('tx', sf=packet.lora_param.sf, tp=packet.lora_param.tp, freq=packet.lora_param.freq)
 
         self.change_state(NodeState.RADIO_TX_PREP_TIME_MS)
         yield self.env.timeout(LoRaParameters.RADIO_TX_PREP_TIME_MS)
@@ -328,6 +406,16 @@ class Node:
         collided = self.air_interface.packet_received(packet)
         return collided
 
+    def record_packet(self, packet: UplinkMessage, collided: bool, downlink_message: DownlinkMessage):
+        # a row of the packet log of the air interface
+        lora_param = packet.lora_param
+        energy = LoRaParameters.RADIO_TX_PREP_ENERGY_MJ + self.energy_profile.tx_power_mW[lora_param.tp] * \
+            self.power_gain * (packet.my_time_on_air() / 1000)
+        weak = downlink_message is not None and downlink_message.meta.weak_packet
+        dl_slot = None if downlink_message is None else downlink_message.meta.scheduled_receive_slot
+        self.air_interface.packet_log.record(self.id, packet.on_air, lora_param.sf, lora_param.tp, lora_param.freq,
+                                             packet.rss, packet.snr, collided, weak, dl_slot, energy)
+
     def send_rx(self, env, packet: UplinkMessage, downlink_message: DownlinkMessage):
 
         if downlink_message is None:
@@ -338,15 +426,15 @@ class Node:
             rx_on_rx2 = downlink_message.meta.scheduled_receive_slot == DownlinkMetaMessage.RX_SLOT_2
 
         # RX1 wait             #
-        if  PRINT_ENABLED:
-            print('{}: \t WAIT'.format(self.id))
+        if tracer.enabled:
+            self.trace('rx_wait')
 
         self.change_state(NodeState.SLEEP)
 
         yield env.timeout(LoRaParameters.RX_WINDOW_1_DELAY)
 
-        if  PRINT_ENABLED:
-            print('{}: \t\t RX1'.format(self.id))
+        if tracer.enabled:
+            self.trace('rx1', downlink=rx_on_rx1)
 
         # changed_state is called internally
         begin = self.env.now
@@ -359,8 +447,8 @@ class Node:
             self.change_state(NodeState.SLEEP)
             yield env.timeout(sleep_between_rx1_rx2_window)
 
-        if  PRINT_ENABLED:
-            print('{}: \t\t RX2'.format(self.id))
+        if tracer.enabled:
+            self.trace('rx2', downlink=rx_on_rx2)
 
         if not rx_on_rx1:
             # changed_state is called internally
@@ -371,6 +459,167 @@ class Node:
         self.change_state(NodeState.RADIO_PRE_RX)
         yield self.env.timeout(self.energy_profile.rx_power['pre_ms'])
 
+        rx_time, rx_energy, power = self.rx_window(rec_window, packet, ack)
+
+        self.change_state(NodeState.RX, consumed_power=power, consumed_energy=rx_energy)
+        yield self.env.timeout(rx_time)
+
+        if ack:
+            self.change_state(NodeState.RADIO_POST_RX)
+            yield self.env.timeout(self.energy_profile.rx_power['post_ms'])
+
+    def fast_forward_possible(self) -> bool:
+        # without ADR and confirmed messages a downlink never changes the node, every cycle is the same
+        return not self.adr and not self.confirmed_messages
+
+    def run_fast_forward(self):
+        """The cycle of run (wait, sleep, processing, send, RX1, RX2) with only the start of the cycle, the creation
+        of the packet, the start and the end of its time on air as events.
+        The energy of the other states is computed in closed form and booked (see settle) at the time
+        the full state machine would have booked it."""
+        sleep_power = self.energy_profile.sleep_power_mW
+        now = self.env.now
+        # the node is still sleeping at the start of a cycle if it received a downlink in RX1
+        sleeping_since = None
+        while True:
+            random_wait = self.rng.randint(0, MAX_DELAY_BEFORE_SLEEP_MS)
+            start_sleep = now + random_wait
+            if sleeping_since is None:
+                sleeping_since = start_sleep
+            start_processing = start_sleep + self.sleep_time
+            self.book(start_processing, 'SLEEP', sleep_power * ((start_processing - sleeping_since) / 1000))
+            self.book(start_processing, 'PROCESS', (self.process_time / 1000) * self.energy_profile.proc_power_mW)
+            now = start_processing + self.process_time
+            yield self.env.timeout(now - self.env.now)
+            self.settle()
+
+            # ------------SENDING------------ #
+            if tracer.enabled:
+                self.trace('send')
+
+            self.unique_packet_id += 1
+
+            payload_size = self.payload_size
+            if MAC_IMPROVEMENT and self.packets_sent < 20:
+                payload_size = 5
+
+            packet = UplinkMessage.acquire(node=self, start_on_air=now, payload_size=payload_size,
+                                           confirmed_message=self.confirmed_messages, id=self.unique_packet_id)
+            self.packet_to_sent = packet
+            airtime = packet.my_time_on_air()
+
+            channel = self.best_channel()
+            packet.lora_param.freq = channel
+
+            start_tx = now
+            if self.time_off[channel] > now:
+                wait = self.time_off[channel] - now
+                self.total_wait_time_because_dc += wait
+                start_tx = now + wait
+                self.book(start_tx, 'SLEEP', sleep_power * ((start_tx - now) / 1000))
+
+            time_off = airtime / LoRaParameters.CHANNEL_DUTY_CYCLE[channel] - airtime
+            self.time_off[channel] = start_tx + time_off
+
+            self.book(start_tx, 'packets_sent', 1)
+            self.book(start_tx, 'bytes_sent', packet.payload_size)
+            self.book(start_tx, 'energy_value', packet.lora_param.tp + (5 - packet.lora_param.dr))
+            self.book(start_tx, 'TX', LoRaParameters.RADIO_TX_PREP_ENERGY_MJ)
+            now = start_tx + LoRaParameters.RADIO_TX_PREP_TIME_MS
+            yield self.env.timeout(now - self.env.now)
+            self.settle()
+
+            packet.on_air = now
+            self.air_interface.packet_in_air(packet)
+            tx_power = self.energy_profile.tx_power_mW[packet.lora_param.tp] * self.power_gain
+            self.book(now, 'TX', tx_power * (airtime / 1000))
+            self.book(now, 'num_tx_state_changes', 1)
+            now = now + airtime
+            yield self.env.timeout(now - self.env.now)
+            self.settle()
+
+            collided = self.air_interface.packet_received(packet)
+            if not collided:
+                if tracer.enabled:
+                    self.trace('received_at_bs', rss=packet.rss, snr=packet.snr)
+                downlink_message = self.base_station.packet_received(self, packet, now)
+            else:
+                self.num_collided += 1
+                downlink_message = None
+            if self.air_interface.packet_log is not None:
+                self.record_packet(packet, collided, downlink_message)
+
+            rx_on_rx1 = False
+            rx_on_rx2 = False
+            if downlink_message is not None:
+                rx_on_rx1 = downlink_message.meta.scheduled_receive_slot == DownlinkMetaMessage.RX_SLOT_1
+                rx_on_rx2 = downlink_message.meta.scheduled_receive_slot == DownlinkMetaMessage.RX_SLOT_2
+
+            start_rx = now + LoRaParameters.RX_WINDOW_1_DELAY
+            self.book(start_rx, 'SLEEP', sleep_power * ((start_rx - now) / 1000))
+            end_rx = self.book_rx_window(start_rx, 1, packet, rx_on_rx1)
+            sleep_between_rx1_rx2_window = LoRaParameters.RX_WINDOW_2_DELAY - (
+                LoRaParameters.RX_WINDOW_1_DELAY + (end_rx - start_rx))
+            sleeping_since = None
+            if sleep_between_rx1_rx2_window > 0:
+                sleeping_since = end_rx
+                end_rx = end_rx + sleep_between_rx1_rx2_window
+            if not rx_on_rx1:
+                if sleeping_since is not None:
+                    self.book(end_rx, 'SLEEP', sleep_power * ((end_rx - sleeping_since) / 1000))
+                    sleeping_since = None
+                end_rx = self.book_rx_window(end_rx, 2, packet, rx_on_rx2)
+
+            now = end_rx
+            yield self.env.timeout(now - self.env.now)
+            self.settle()
+
+            if downlink_message is None or downlink_message.meta.is_lost():
+                if downlink_message is not None:
+                    self.lost_packages_time.append(now)
+                self.num_no_downlink += 1
+
+            if tracer.enabled:
+                self.trace('send_done')
+
+            self.num_unique_packets_sent += 1
+            if downlink_message is not None:
+                downlink_message.release()
+            self.packet_to_sent = None
+            packet.release()
+
+    def book_rx_window(self, start, rec_window: int, packet: UplinkMessage, ack: bool) -> float:
+        # books the energy of a receive window (as send_rx_ack) and returns the time it ends
+        rx_power = self.energy_profile.rx_power
+        self.book(start, 'RX', rx_power['pre_mW'] * rx_power['pre_ms'] / 1000)
+        start = start + rx_power['pre_ms']
+        rx_time, rx_energy, power = self.rx_window(rec_window, packet, ack)
+        self.book(start, 'RX', rx_energy)
+        end = start + rx_time
+        if ack:
+            self.book(end, 'RX', rx_power['post_mW'] * (rx_power['post_ms'] / 1000))
+            end = end + rx_power['post_ms']
+        return end
+
+    def book(self, time, key, value):
+        # key is an energy state or a counter of the population
+        self.pending.append((time, key, value))
+
+    def settle(self, until=None):
+        # books everything that happened before `until` (by default now), like the full state machine would have done
+        if until is None:
+            until = self.env.now
+        pending = self.pending
+        while pending and pending[0][0] < until:
+            time, key, value = pending.popleft()
+            if key in NodePopulation.ENERGY_STATE_INDEX:
+                self.energy_measurements.append(time, value)
+                self.population.energy[self.index, NodePopulation.ENERGY_STATE_INDEX[key]] += value
+            else:
+                self.population.columns[key][self.index] += value
+
+    def rx_window(self, rec_window: int, packet: UplinkMessage, ack: bool) -> (float, float, float):
+        # time (ms), energy (mJ) and power (mW) of listening in a receive window
         if not ack:
 
             if rec_window == 1:
@@ -393,25 +642,19 @@ class Node:
                 rx_time = LoRaPacket.time_on_air(12, temp_lora_param)
                 rx_energy = (rx_time / 1000) * self.energy_profile.rx_power['rx_lna_off_mW']
                 power = self.energy_profile.rx_power['rx_lna_off_mW']
-
-        self.change_state(NodeState.RX, consumed_power=power, consumed_energy=rx_energy)
-        yield self.env.timeout(rx_time)
-
-        if ack:
-            self.change_state(NodeState.RADIO_POST_RX)
-            yield self.env.timeout(self.energy_profile.rx_power['post_ms'])
+        return rx_time, rx_energy, power
 
     def sleep(self):
         # ------------SLEEPING------------ #
-        if  PRINT_ENABLED:
-            print('{}: START sleeping'.format(self.id))
+        if tracer.enabled:
+            self.trace('sleep')
         self.change_state(NodeState.SLEEP)
         yield self.env.timeout(self.sleep_time)
 
     def processing(self):
         # ------------PROCESSING------------ #
-        if  PRINT_ENABLED:
-            print('{}: PROCESSING'.format(self.id))
+        if tracer.enabled:
+            self.trace('processing')
         self.change_state(NodeState.PROCESS)
         yield self.env.timeout(self.process_time)
 
@@ -437,11 +680,16 @@ class Node:
                     yield self.env.process(self.dl_message_lost())
                 else:
                     yield self.env.process(self.process_downlink_message(downlink_message, packet))
+                    downlink_message.release()
 
             else:
                 # TODO go to default
                 NotImplementedError('This is not yet implemented')
 
+    def trace(self, event, **fields):
+        if tracer.accepts(event, self.id, self.env.now):
+            tracer.emit(event, self.id, self.env.now, **fields)
+
     def change_state(self, new_state: NodeState, consumed_power=None, consumed_energy=None):
         if self.current_state == new_state:
             ValueError('You can not change state ({}) when the states are the same'.format(NodeState(new_state).name))
@@ -511,28 +759,28 @@ class Node:
         return self.transmit_related_energy_consumed() / (self.num_unique_packets_sent * self.payload_size * 8)
 
     def transmit_related_energy_consumed(self) -> float:
+        self.settle()
         return self.energy_tracking[NodeState(NodeState.TX).name] + self.energy_tracking[NodeState(NodeState.RX).name]
 
     def total_energy_consumed(self) -> float:
+        self.settle()
         total_energy = 0
         for key, value in self.energy_tracking.items():
             total_energy += value
         return total_energy
 
     def track_power(self, power_mW):
-        self.power_tracking['time'].append(self.env.now)
-        self.power_tracking['val'].append(power_mW)
+        self.power_tracking.append(self.env.now, power_mW)
 
     def track_energy(self, state: NodeState, energy_consumed_mJ: float):
-        self.energy_measurements['time'].append(self.env.now)
-        self.energy_measurements['val'].append(energy_consumed_mJ)
+        self.energy_measurements.append(self.env.now, energy_consumed_mJ)
         self.energy_tracking[NodeState(state).name] += energy_consumed_mJ
 
     def track_state_change(self, new_state):
-        self.state_changes['time'].append(self.env.now)
-        self.state_changes['val'].append(new_state)
+        self.state_changes.append(self.env.now, new_state)
 
     def get_simulation_data(self) -> pd.Series:
+        self.settle()
         series = {
             'WaitTimeDC': self.total_wait_time_because_dc / 1000,  # [s] instead of [ms]
             'NoDLReceived': self.num_no_downlink,
@@ -549,17 +797,12 @@ class Node:
 
     @staticmethod
     def get_simulation_data_frame(nodes: list) -> pd.DataFrame:
-        # column_names = ['WaitTimeDC', 'NoDLReceived', 'UniquePackets', 'TotalPackets', 'CollidedPackets',
-        #                 'RetransmittedPackets', 'TotalBytes', 'TotalEnergy', 'TxRxEnergy', 'EnergyValuePackets']
-        df = pd.DataFrame()
-        dfs = []
-        for node in nodes:
-            dfs.append(node.get_simulation_data().to_frame().T)
-        return pd.concat(dfs, ignore_index=True)
+        # the counters of all nodes are read at once, equal to a row per node of get_simulation_data
+        return NodeStatistics(nodes).data_frame()
+
     @staticmethod
     def get_mean_simulation_data_frame(nodes: list, name) -> pd.DataFrame:
-        data = Node.get_simulation_data_frame(nodes)
-        data = data.sum(axis=0)
+        data = NodeStatistics(nodes).sum()
         data['name'] = name
         return pd.DataFrame(data).transpose()
 
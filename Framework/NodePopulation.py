@@ -0,0 +1,198 @@
+import numpy as np
+
+from Framework.LoRaParameters import LoRaParameters
+from Framework.Location import Location
+
+
+class NodePopulation:
+    """Array-backed (struct-of-arrays) state of a population of nodes.
+
+    Every node is one row, a Node object is a thin view on its row (see Column).
+    The population grows when nodes are added and can be saved, loaded and aggregated in bulk.
+    """
+
+    COLUMNS = {
+        'node_id': np.int64,
+        'num_tx_state_changes': np.int64,
+        'total_wait_time_because_dc': np.float64,
+        'num_no_downlink': np.int64,
+        'num_unique_packets_sent': np.int64,
+        'start_device_active': np.float64,
+        'num_collided': np.int64,
+        'num_retransmission': np.int64,
+        'packets_sent': np.int64,
+        'bytes_sent': np.int64,
+        'energy_value': np.float64,
+        'unique_packet_id': np.int64,
+        'prev_power_mW': np.float64,
+        'sleep_start_time': np.float64,
+        'power_gain': np.float64,
+        'payload_size': np.int64,
+        'sleep_time': np.float64,
+        'process_time': np.float64,
+        'adr': np.bool_,
+        'confirmed_messages': np.bool_,
+        # LoRa parameters
+        'freq': np.int64,
+        'sf': np.int64,
+        'tp': np.float64,
+        'dr': np.int64,
+        # location
+        'x': np.float64,
+        'y': np.float64,
+        'alt': np.float64,
+        'indoor': np.bool_,
+    }
+
+    # energy consumed per state (mJ), the order is the order in which the total energy is summed
+    ENERGY_STATES = ['SLEEP', 'PROCESS', 'RX', 'TX']
+    ENERGY_STATE_INDEX = {state: idx for idx, state in enumerate(ENERGY_STATES)}
+    CHANNEL_INDEX = {ch: idx for idx, ch in enumerate(LoRaParameters.CHANNELS)}
+
+    def __init__(self, capacity=16):
+        self.num_nodes = 0
+        self.capacity = capacity
+        self.columns = {name: np.zeros(capacity, dtype=dtype) for name, dtype in NodePopulation.COLUMNS.items()}
+        self.energy = np.zeros((capacity, len(NodePopulation.ENERGY_STATES)))
+        self.time_off = np.zeros((capacity, len(LoRaParameters.CHANNELS)))
+
+    def allocate(self) -> int:
+        if self.num_nodes == self.capacity:
+            self.resize(2 * self.capacity)
+        self.num_nodes += 1
+        return self.num_nodes - 1
+
+    def resize(self, capacity):
+        for name, values in self.columns.items():
+            self.columns[name] = np.resize(values, capacity)
+            self.columns[name][self.num_nodes:] = 0
+        self.energy = np.resize(self.energy, (capacity, self.energy.shape[1]))
+        self.energy[self.num_nodes:] = 0
+        self.time_off = np.resize(self.time_off, (capacity, self.time_off.shape[1]))
+        self.time_off[self.num_nodes:] = 0
+        self.capacity = capacity
+
+    def column(self, name) -> np.ndarray:
+        return self.columns[name][:self.num_nodes]
+
+    def energy_per_state(self, state) -> np.ndarray:
+        return self.energy[:self.num_nodes, NodePopulation.ENERGY_STATE_INDEX[state]]
+
+    def total_energy(self) -> np.ndarray:
+        total = np.zeros(self.num_nodes)
+        for idx in range(len(NodePopulation.ENERGY_STATES)):
+            total += self.energy[:self.num_nodes, idx]
+        return total
+
+    def save(self, file):
+        arrays = {name: self.column(name) for name in self.columns}
+        np.savez(file, energy=self.energy[:self.num_nodes], time_off=self.time_off[:self.num_nodes], **arrays)
+
+    @staticmethod
+    def load(file):
+        with np.load(file) as data:
+            num_nodes = len(data['node_id'])
+            population = NodePopulation(capacity=max(num_nodes, 1))
+            population.num_nodes = num_nodes
+            for name in population.columns:
+                population.columns[name][:num_nodes] = data[name]
+            population.energy[:num_nodes] = data['energy']
+            population.time_off[:num_nodes] = data['time_off']
+        return population
+
+
+class Column:
+    # attribute of a Node stored in a column of its NodePopulation
+    def __init__(self, name):
+        self.name = name
+
+    def __get__(self, node, owner):
+        if node is None:
+            return self
+        return node.population.columns[self.name].item(node.index)
+
+    def __set__(self, node, value):
+        node.population.columns[self.name][node.index] = value
+
+
+class RowView:
+    # dict-like view on a 2D array of the population, e.g. energy per state or time off per channel
+    __slots__ = ['array', 'index', 'keys_index']
+
+    def __init__(self, array, index, keys_index):
+        self.array = array
+        self.index = index
+        self.keys_index = keys_index
+
+    def __getitem__(self, key):
+        return self.array.item(self.index, self.keys_index[key])
+
+    def __setitem__(self, key, value):
+        self.array[self.index, self.keys_index[key]] = value
+
+    def get(self, key, default=None):
+        if key not in self.keys_index:
+            return default
+        return self[key]
+
+    def __contains__(self, key):
+        return key in self.keys_index
+
+    def __iter__(self):
+        return iter(self.keys_index)
+
+    def __len__(self):
+        return len(self.keys_index)
+
+    def keys(self):
+        return self.keys_index.keys()
+
+    def values(self):
+        return [self[key] for key in self.keys_index]
+
+    def items(self):
+        return [(key, self[key]) for key in self.keys_index]
+
+
+class NodeLoRaParameters(LoRaParameters):
+    """LoRa parameters of a node, freq, SF, TP and DR are stored in the NodePopulation"""
+
+    __slots__ = ['population', 'index', 'bw', 'crc', 'cr', 'de', 'h']
+
+    freq = Column('freq')
+    sf = Column('sf')
+    tp = Column('tp')
+
+    def __init__(self, population: NodePopulation, index, lora_param: LoRaParameters):
+        self.population = population
+        self.index = index
+        self.freq = lora_param.freq
+        self.sf = lora_param.sf
+        self.bw = lora_param.bw
+        self.crc = lora_param.crc
+        self.cr = lora_param.cr
+        self.tp = lora_param.tp
+        self.dr = lora_param.dr
+        self.de = lora_param.de
+        self.h = lora_param.h
+
+    @property
+    def dr(self):
+        return self.population.columns['dr'].item(self.index)
+
+    @dr.setter
+    def dr(self, dr):
+        self.population.columns['dr'][self.index] = dr
+
+    def __deepcopy__(self, memo):
+        # a copy is detached from the population
+        lora_param = LoRaParameters.__new__(LoRaParameters)
+        for attr in ['freq', 'sf', 'bw', 'crc', 'cr', 'tp', 'dr', 'de', 'h']:
+            setattr(lora_param, attr, getattr(self, attr))
+        return lora_param
+
+
+def location_of(population: NodePopulation, index) -> Location:
+    alt = population.columns['alt'].item(index)
+    return Location(x=population.columns['x'].item(index), y=population.columns['y'].item(index),
+                    alt=None if np.isnan(alt) else alt, indoor=population.columns['indoor'].item(index))
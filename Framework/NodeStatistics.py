@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+
+from Framework.NodePopulation import NodePopulation
+
+
+class NodeStatistics:
+    """Counters of a list of nodes read in bulk from their NodePopulation(s), one array per counter.
+
+    Replaces building a Series per node: the DataFrame of all nodes is built once (see data_frame) and the reductions
+    (sum, energy per bit statistics) are computed on the arrays without any per node frame.
+    """
+
+    # column of the simulation data: counter of the population
+    COUNTERS = {
+        'NoDLReceived': 'num_no_downlink',
+        'UniquePackets': 'num_unique_packets_sent',
+        'TotalPackets': 'packets_sent',
+        'CollidedPackets': 'num_collided',
+        'RetransmittedPackets': 'num_retransmission',
+        'TotalBytes': 'bytes_sent',
+    }
+    COLUMNS = ['WaitTimeDC', 'NoDLReceived', 'UniquePackets', 'TotalPackets', 'CollidedPackets',
+               'RetransmittedPackets', 'TotalBytes', 'TotalEnergy', 'TxRxEnergy', 'EnergyValuePackets']
+
+    def __init__(self, nodes: list):
+        for node in nodes:
+            node.settle()
+        self.num_nodes = len(nodes)
+        # nodes per population: positions in `nodes` and rows in the population
+        groups = dict()
+        for pos, node in enumerate(nodes):
+            population, positions, rows = groups.setdefault(id(node.population), (node.population, [], []))
+            positions.append(pos)
+            rows.append(node.index)
+        self.groups = [(population, np.array(positions, dtype=np.int64), np.array(rows, dtype=np.int64))
+                       for population, positions, rows in groups.values()]
+
+    def column(self, name) -> np.ndarray:
+        # counter of the population per node, in the order of the nodes
+        values = np.empty(self.num_nodes, dtype=NodePopulation.COLUMNS[name])
+        for population, positions, rows in self.groups:
+            values[positions] = population.columns[name][rows]
+        return values
+
+    def energy(self, state) -> np.ndarray:
+        # energy (mJ) consumed per node in `state`
+        values = np.empty(self.num_nodes)
+        idx = NodePopulation.ENERGY_STATE_INDEX[state]
+        for population, positions, rows in self.groups:
+            values[positions] = population.energy[rows, idx]
+        return values
+
+    def total_energy(self) -> np.ndarray:
+        # summed in the order of Node.total_energy_consumed
+        total = np.zeros(self.num_nodes)
+        for state in NodePopulation.ENERGY_STATES:
+            total += self.energy(state)
+        return total
+
+    def tx_rx_energy(self) -> np.ndarray:
+        return self.energy('TX') + self.energy('RX')
+
+    def energy_per_bit(self) -> np.ndarray:
+        return self.total_energy() / (self.column('packets_sent') * self.column('payload_size') * 8)
+
+    def data(self) -> dict:
+        data = {'WaitTimeDC': self.column('total_wait_time_because_dc') / 1000}  # [s] instead of [ms]
+        for name, counter in NodeStatistics.COUNTERS.items():
+            data[name] = self.column(counter)
+        data['TotalEnergy'] = self.total_energy()
+        data['TxRxEnergy'] = self.tx_rx_energy()
+        data['EnergyValuePackets'] = self.column('energy_value')
+        return data
+
+    def data_frame(self) -> pd.DataFrame:
+        # equal to a row per node of Node.get_simulation_data
+        return pd.DataFrame({name: values.astype(np.float64) for name, values in self.data().items()},
+                            columns=NodeStatistics.COLUMNS)
+
+    def sum(self) -> pd.Series:
+        # a row per node, summed in the same order (hence to the same floats) as the rows of get_simulation_data
+        data = self.data()
+        rows = np.column_stack([data[name].astype(np.float64) for name in NodeStatistics.COLUMNS])
+        return pd.Series(rows.sum(axis=0), index=NodeStatistics.COLUMNS)
+
+    def energy_per_bit_stats(self, percentiles=(5, 50, 95)) -> dict:
+        # mean, std and percentiles of the energy per bit of the nodes that sent at least one packet
+        packets_sent = self.column('packets_sent')
+        sent = packets_sent > 0
+        energy_per_bit = self.total_energy()[sent] / (packets_sent[sent] * self.column('payload_size')[sent] * 8)
+        stats = {'mean': np.mean(energy_per_bit), 'std': np.std(energy_per_bit)}
+        for p, value in zip(percentiles, np.percentile(energy_per_bit, percentiles)):
+            stats['p{}'.format(p)] = value
+        return stats
@@ -0,0 +1,206 @@
+import json
+import operator
+import os
+from glob import glob
+
+import numpy as np
+import pandas as pd
+
+from Simulations.GlobalConfig import *
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+# operators of the filters of PacketLog.read, as in pyarrow
+OPERATORS = {'==': operator.eq, '=': operator.eq, '!=': operator.ne, '<': operator.lt, '<=': operator.le,
+             '>': operator.gt, '>=': operator.ge}
+
+
+class PacketLog:
+    """Per packet event log, one row per transmission (retransmissions included) written when it left the air.
+
+    Every log opened on `directory` (e.g. every simulation run by a pool worker) writes its own part, numbered by its
+    run id, the rows of the part carry the run id in the column 'run'. Without a run id, the log claims the next free
+    one by creating its part exclusively, hence processes sharing the directory never get the same run id. A log never
+    truncates the parts of other runs, opening a log with the run id of an existing part replaces that part (e.g. a
+    cell that is run again).
+    Rows are buffered in typed columns of buffer_size rows and appended to the part when the buffer is full:
+    parquet:    one row group per buffer in packets_<run>.parquet (needs pyarrow)
+    numpy:      a raw file per column (<column>_<run>.bin) and schema.json with the dtypes, readable with np.memmap
+    Use PacketLog.read to load (a selection of) the log of all runs, filters are pushed down to the row groups with
+    parquet. A log resumed from a checkpoint (see state and resume) keeps the rows written up to the checkpoint.
+    The log has to be closed when the simulation ends (see run_resumable), the buffered rows are written by close.
+    """
+
+    COLUMNS = {
+        'run': np.int64,
+        'node_id': np.int64,
+        'start': np.float64,  # ms, start of the time on air
+        'sf': np.int8,
+        'tp': np.int8,
+        'channel': np.int64,
+        'rss': np.float64,  # NaN if no gateway was in range
+        'snr': np.float64,
+        'collided': np.bool_,
+        'weak': np.bool_,
+        'dl_slot': np.int8,  # 0 if no downlink was scheduled
+        'energy': np.float64  # mJ of the transmission (TX preparation and time on air)
+    }
+    FORMATS = ['parquet', 'numpy']
+
+    def __init__(self, directory=PACKET_LOG_DIR, buffer_size=PACKET_LOG_BUFFER_SIZE, log_format=PACKET_LOG_FORMAT,
+                 run=None, keep_rows=0):
+        if directory is None:
+            raise ValueError('A directory is needed for the packet log')
+        if log_format == 'auto':
+            log_format = 'numpy' if pq is None else 'parquet'
+        if log_format not in PacketLog.FORMATS:
+            raise ValueError('Packet log format {} not in {}'.format(log_format, PacketLog.FORMATS))
+        if log_format == 'parquet' and pq is None:
+            raise ValueError('The parquet packet log needs pyarrow')
+        self.directory = directory.format(pid=os.getpid())
+        os.makedirs(self.directory, exist_ok=True)
+        self.log_format = log_format
+        self.run = run
+        if run is None:
+            self.claim()
+            run = self.run
+        self.buffers = {column: np.zeros(buffer_size, dtype=dtype) for column, dtype in PacketLog.COLUMNS.items()}
+        self.buffers['run'][:] = run
+        self.num_rows = 0
+        self.num_rows_written = keep_rows
+        self.writer = None
+        if log_format == 'parquet':
+            kept = None
+            if keep_rows > 0:
+                kept = pq.read_table(self.path()).slice(0, keep_rows)
+                PacketLog.check_rows(run, kept.num_rows, keep_rows)
+            schema = pa.schema([(column, pa.from_numpy_dtype(dtype)) for column, dtype in PacketLog.COLUMNS.items()])
+            self.writer = pq.ParquetWriter(self.path(), schema)
+            if kept is not None:
+                self.writer.write_table(kept)
+        else:
+            with open(os.path.join(self.directory, 'schema.json'), 'w') as f:
+                json.dump({column: np.dtype(dtype).str for column, dtype in PacketLog.COLUMNS.items()}, f)
+            for column, dtype in PacketLog.COLUMNS.items():
+                # an empty part, or the rows of the part up to the checkpoint
+                with open(self.path(column), 'ab') as f:
+                    itemsize = np.dtype(dtype).itemsize
+                    PacketLog.check_rows(run, f.tell() // itemsize, keep_rows)
+                    f.truncate(keep_rows * itemsize)
+
+    def claim(self):
+        # the next free run id, its part (of node_id with numpy) is created exclusively, a run id taken by another
+        # process in the meantime is skipped
+        self.run = max(PacketLog.runs(self.directory), default=-1) + 1
+        while True:
+            try:
+                os.close(os.open(self.path('node_id'), os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                return
+            except FileExistsError:
+                self.run += 1
+
+    @staticmethod
+    def check_rows(run, num_rows, keep_rows):
+        if num_rows < keep_rows:
+            raise ValueError('The packet log part of run {} has {} rows, {} should be kept'.format(run, num_rows,
+                                                                                                keep_rows))
+
+    @staticmethod
+    def runs(directory) -> list:
+        # run ids of the parts in `directory`, ascending
+        pattern = 'packets_*.parquet' if glob(os.path.join(directory, 'packets_*.parquet')) else 'node_id_*.bin'
+        return sorted(int(os.path.splitext(os.path.basename(f))[0].rsplit('_', 1)[1])
+                      for f in glob(os.path.join(directory, pattern)))
+
+    def path(self, column=None):
+        if self.log_format == 'parquet':
+            return os.path.join(self.directory, 'packets_{}.parquet'.format(self.run))
+        return os.path.join(self.directory, '{}_{}.bin'.format(column, self.run))
+
+    def state(self) -> dict:
+        # what is needed to resume the log at this point (see resume), the buffered rows are written first
+        self.flush()
+        return {'directory': self.directory, 'log_format': self.log_format, 'run': self.run, 'rows': len(self)}
+
+    @staticmethod
+    def resume(state: dict, buffer_size=PACKET_LOG_BUFFER_SIZE) -> 'PacketLog':
+        # the rows written after the state was taken are dropped, they are written again by the resumed simulation
+        return PacketLog(directory=state['directory'], buffer_size=buffer_size, log_format=state['log_format'],
+                         run=state['run'], keep_rows=state['rows'])
+
+    def record(self, node_id, start, sf, tp, channel, rss, snr, collided, weak, dl_slot, energy):
+        idx = self.num_rows
+        buffers = self.buffers
+        buffers['node_id'][idx] = node_id
+        buffers['start'][idx] = start
+        buffers['sf'][idx] = sf
+        buffers['tp'][idx] = tp
+        buffers['channel'][idx] = channel
+        buffers['rss'][idx] = np.nan if rss is None else rss
+        buffers['snr'][idx] = np.nan if snr is None else snr
+        buffers['collided'][idx] = collided
+        buffers['weak'][idx] = weak
+        buffers['dl_slot'][idx] = 0 if dl_slot is None else dl_slot
+        buffers['energy'][idx] = energy
+        self.num_rows += 1
+        if self.num_rows == len(buffers['node_id']):
+            self.flush()
+
+    def flush(self):
+        if self.num_rows == 0:
+            return
+        if self.log_format == 'parquet':
+            if self.writer is None:
+                raise ValueError('The packet log is closed')
+            self.writer.write_table(pa.table({column: values[:self.num_rows]
+                                              for column, values in self.buffers.items()}))
+        else:
+            for column, values in self.buffers.items():
+                with open(self.path(column), 'ab') as f:
+                    values[:self.num_rows].tofile(f)
+        self.num_rows_written += self.num_rows
+        self.num_rows = 0
+
+    def close(self):
+        if self.log_format == 'parquet' and self.writer is None:
+            return
+        self.flush()
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+    def __len__(self):
+        return self.num_rows_written + self.num_rows
+
+    @staticmethod
+    def read(directory, columns=None, filters=None) -> pd.DataFrame:
+        """Rows of the log in `directory` (all runs) matching all filters, e.g. [('sf', '>=', 10), ('run', '==', 3)]"""
+        runs = PacketLog.runs(directory)
+        parquet_files = [os.path.join(directory, 'packets_{}.parquet'.format(run)) for run in runs]
+        if len(runs) > 0 and os.path.exists(parquet_files[0]):
+            if pq is None:
+                raise ValueError('Reading a parquet packet log needs pyarrow')
+            return pq.read_table(parquet_files, columns=columns, filters=filters).to_pandas()
+        if columns is None:
+            columns = list(PacketLog.COLUMNS.keys())
+        if len(runs) == 0:
+            return pd.DataFrame({column: np.zeros(0, dtype=PacketLog.COLUMNS[column]) for column in columns})
+        with open(os.path.join(directory, 'schema.json')) as f:
+            schema = json.load(f)
+        parts = []
+        for run in runs:
+            values = dict()
+            for column, dtype in schema.items():
+                path = os.path.join(directory, '{}_{}.bin'.format(column, run))
+                values[column] = np.memmap(path, dtype=np.dtype(dtype), mode='r') if os.path.getsize(path) > 0 \
+                    else np.zeros(0, dtype=dtype)
+            selected = np.ones(len(values['node_id']), dtype=bool)
+            for column, op, value in filters or []:
+                selected &= OPERATORS[op](values[column], value)
+            parts.append({column: np.asarray(values[column][selected]) for column in columns})
+        return pd.DataFrame({column: np.concatenate([part[column] for part in parts]) for column in columns})
@@ -0,0 +1,67 @@
+import numpy as np
+
+from Framework.Geometry import Geometry
+from Framework.Location import Location
+
+
+class PathLossCache:
+    """Deterministic path loss per node, placed in front of a propagation model.
+
+    Nodes never move during a simulation, so the deterministic part of the path loss (see path_loss_batch in
+    PropagationModel.py) is computed once. All nodes registered before the first lookup are predicted in a single
+    batched call. Random components (shadowing, building loss) are still drawn per packet by rss_from_path_loss.
+    An entry is recomputed when the location of a node changed, the TP is applied per packet and is not cached.
+    The distances are read from the column `gateway` of the geometry (see Geometry).
+    """
+
+    def __init__(self, prop_model, geometry: Geometry, gateway=0):
+        self.prop_model = prop_model
+        self.geometry = geometry
+        self.gateway = gateway
+        self.path_loss = dict()
+        # location (x, y, alt) for which the path loss of a node was computed
+        self.computed_for = dict()
+        self.pending = dict()
+        self.hits = 0
+        self.misses = 0
+
+    def register(self, node_id, location: Location):
+        self.pending[node_id] = location
+
+    def invalidate(self, node_id):
+        self.path_loss.pop(node_id, None)
+        self.computed_for.pop(node_id, None)
+
+    def fill(self):
+        if len(self.pending) == 0:
+            return
+        node_ids = list(self.pending.keys())
+        locations = list(self.pending.values())
+        for node_id, loc in self.pending.items():
+            self.geometry.register(node_id, loc)
+        d = self.geometry.distances(node_ids, self.gateway)
+        alt = np.array([np.nan if loc.alt is None else loc.alt for loc in locations], dtype=float)
+        path_loss = self.prop_model.path_loss_batch(d, alt)
+        for node_id, loc, pl in zip(node_ids, locations, path_loss):
+            self.path_loss[node_id] = pl
+            self.computed_for[node_id] = (loc.x, loc.y, loc.alt)
+        self.pending = dict()
+
+    def lookup(self, node_id, location: Location) -> float:
+        if self.computed_for.get(node_id) == (location.x, location.y, location.alt):
+            self.hits += 1
+        else:
+            self.misses += 1
+            self.register(node_id, location)
+            self.fill()
+        return self.path_loss[node_id]
+
+    def tp_to_rss(self, node_id, location: Location, tp_dBm) -> float:
+        path_loss = self.lookup(node_id, location)
+        return float(self.prop_model.rss_from_path_loss(location.indoor, tp_dBm, path_loss))
+
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        if lookups == 0:
+            return 0
+        return self.hits / lookups
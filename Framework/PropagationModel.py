@@ -1,13 +1,34 @@
 import math
 
 import numpy as np
-import joblib
-import zipfile
+
+from Framework import ML_Propagation_Models
+from Framework.RandomStreams import resolve
+
+BUILDING_PATH_LOSS = [17, 27, 21, 30]  # according Rep. ITU-R P.2346-0
+
+
+# Every model has a scalar tp_to_rss and a vectorized tp_to_rss_batch with the same per-element semantics.
+# The batch version is split in a deterministic part, path_loss_batch(d, alt), which only depends on the location of
+# the node, and rss_from_path_loss(indoor, tp_dBm, path_loss, rng) which adds the random components
+# (shadowing, building loss) drawn from rng. If no rng is given, the stream of the model is used (rng argument of the
+# constructor, see RandomStreams), which is the global np.random by default.
+
+
+def building_path_loss(indoor, shape, rng):
+    indoor = np.broadcast_to(np.asarray(indoor, dtype=bool), shape)
+    bpl = np.zeros(shape)
+    num_indoor = np.count_nonzero(indoor)
+    if num_indoor > 0:
+        bpl[indoor] = rng.choice(BUILDING_PATH_LOSS, num_indoor)
+    return bpl
+
 
 class LogShadow:
 
     # 10.1109/ITST.2015.7377400
-    def __init__(self, gamma=2.32, d0=1000.0, std=7.8, Lpld0=128.95, GL=0):
+    def __init__(self, gamma=2.32, d0=1000.0, std=7.8, Lpld0=128.95, GL=0, rng=None):
+        self.rng = rng
         self.gamma = gamma
         self.d0 = d0
         self.std = std
@@ -17,29 +38,46 @@ class LogShadow:
         self.GL = GL
 
     def tp_to_rss(self, indoor: bool, tp_dBm: int, d: float, alt: int):
+        rng = resolve(self.rng)
         bpl = 0  # building path loss
         if indoor:
-            bpl = np.random.choice([17, 27, 21, 30])  # according Rep. ITU-R P.2346-0
-        Lpl = 10 * self.gamma * np.log10(d / self.d0) + np.random.normal(self.Lpld0, self.std) + bpl
+            bpl = rng.choice([17, 27, 21, 30])  # according Rep. ITU-R P.2346-0
+        Lpl = 10 * self.gamma * np.log10(d / self.d0) + rng.normal(self.Lpld0, self.std) + bpl
         if Lpl <0:
             Lpl = 0
         return tp_dBm + self.GL - Lpl
 
+    def path_loss_batch(self, d, alt):
+        return 10 * self.gamma * np.log10(np.asarray(d, dtype=float) / self.d0)
+
+    def rss_from_path_loss(self, indoor, tp_dBm, path_loss, rng=None):
+        rng = resolve(self.rng) if rng is None else rng
+        path_loss = np.asarray(path_loss, dtype=float)
+        bpl = building_path_loss(indoor, path_loss.shape, rng)
+        Lpl = path_loss + rng.normal(self.Lpld0, self.std, path_loss.shape) + bpl
+        Lpl = np.maximum(Lpl, 0)
+        return np.asarray(tp_dBm) + self.GL - Lpl
+
+    def tp_to_rss_batch(self, indoor, tp_dBm, d, alt, rng=None):
+        return self.rss_from_path_loss(indoor, tp_dBm, self.path_loss_batch(d, alt), rng)
+
 
 class COST231:
 
-    def __init__(self, fc, W=None, b=None, hr=None, hm=2, phi=None, hb=15, metropolitan_center=True):
+    def __init__(self, fc, W=None, b=None, hr=None, hm=2, phi=None, hb=15, metropolitan_center=True, rng=None):
+        self.rng = rng
+        rng = resolve(rng)
 
         # default desribed in Understanding UMTS Radio Network Modelling, Planning and Automated Optimisation: Theory
         #  and Practice no data about propagation path on page 87
-        roof_height = round(np.random.uniform(0, 1)) * 3
-        num_of_floors = round(2 + round(np.random.uniform(0, 1)) * (5 - 2))
+        roof_height = round(rng.uniform(0, 1)) * 3
+        num_of_floors = round(2 + round(rng.uniform(0, 1)) * (5 - 2))
         if hr is None:
             hr = 3 * num_of_floors + roof_height
         if phi is None:
             phi = 90
         if b is None:
-            b = np.random.uniform(20, 50)
+            b = rng.uniform(20, 50)
         if W is None:
             W = b / 2
 
@@ -143,7 +181,7 @@ class COST231:
     def tp_to_rss(self, indoor: bool, tp_dBm: int, d: float, alt: int):
         bpl = 0  # building path loss
         if indoor:
-            bpl = np.random.choice([17, 27, 21, 30])  # according Rep. ITU-R P.2346-0
+            bpl = resolve(self.rng).choice([17, 27, 21, 30])  # according Rep. ITU-R P.2346-0
         # The propagation loss in free space conditions, L0, is obtained according to the expression:
         L0 = 32.4 + 20 * np.log10(d) + 20 * np.log10(self.fc)
         # NLOS - The term ka represents the increase of path loss for base station antennas below the average height
@@ -169,6 +207,25 @@ class COST231:
             L50 = L0
         return tp_dBm - L50 - bpl
 
+    def path_loss_batch(self, d, alt):
+        d = np.asarray(d, dtype=float)
+        L0 = 32.4 + 20 * np.log10(d) + 20 * np.log10(self.fc)
+        if self.hb > self.hr:
+            ka = np.full(d.shape, 54.0)
+        else:
+            ka = np.where(d >= 0.5, 54 - 8 * self.dhb, 54 - 0.8 * self.dhb / 0.5)
+        Lmsd = self.Lbsh + ka + self.kd * np.log10(d) + self.kf * np.log10(self.fc) - 9 * np.log10(self.b)
+        Lmsd = np.maximum(Lmsd, 0)
+        return np.where((self.Lrts + Lmsd) > 0, L0 + self.Lrts + Lmsd, L0)
+
+    def rss_from_path_loss(self, indoor, tp_dBm, path_loss, rng=None):
+        rng = resolve(self.rng) if rng is None else rng
+        path_loss = np.asarray(path_loss, dtype=float)
+        return np.asarray(tp_dBm) - path_loss - building_path_loss(indoor, path_loss.shape, rng)
+
+    def tp_to_rss_batch(self, indoor, tp_dBm, d, alt, rng=None):
+        return self.rss_from_path_loss(indoor, tp_dBm, self.path_loss_batch(d, alt), rng)
+
 
 class FreeSpace:
     def __init__(self, fc):
@@ -181,6 +238,15 @@ class FreeSpace:
         pl = 20 * np.log10((4 * math.pi * d) / (299.792458 / self.fc))
         return tp_dBm - pl
 
+    def path_loss_batch(self, d, alt):
+        return 20 * np.log10((4 * math.pi * np.asarray(d, dtype=float)) / (299.792458 / self.fc))
+
+    def rss_from_path_loss(self, indoor, tp_dBm, path_loss, rng=None):
+        return np.asarray(tp_dBm) - np.asarray(path_loss, dtype=float)
+
+    def tp_to_rss_batch(self, indoor, tp_dBm, d, alt, rng=None):
+        return self.rss_from_path_loss(indoor, tp_dBm, self.path_loss_batch(d, alt), rng)
+
 
 class Egli:
     def __init__(self, fc):
@@ -195,6 +261,16 @@ class Egli:
         pl = -10 * np.log10(self.beta * (height * 2 / d ** 2) ** 2)
         return tp_dBm - pl
 
+    def path_loss_batch(self, d, alt):
+        height = 10
+        return -10 * np.log10(self.beta * (height * 2 / np.asarray(d, dtype=float) ** 2) ** 2)
+
+    def rss_from_path_loss(self, indoor, tp_dBm, path_loss, rng=None):
+        return np.asarray(tp_dBm) - np.asarray(path_loss, dtype=float)
+
+    def tp_to_rss_batch(self, indoor, tp_dBm, d, alt, rng=None):
+        return self.rss_from_path_loss(indoor, tp_dBm, self.path_loss_batch(d, alt), rng)
+
 
 class OkumuraHata:
     def __init__(self, fc, ht=2):
@@ -210,6 +286,17 @@ class OkumuraHata:
              self.ahr + (44.9 - 6.55 * np.log10(height)) * np.log10(d/1000)
         return tp_dBm - pl
 
+    def path_loss_batch(self, d, alt):
+        height = 10
+        return 69.55 + 26.16 * np.log10(self.fc) - 13.82 * np.log10(height) - \
+            self.ahr + (44.9 - 6.55 * np.log10(height)) * np.log10(np.asarray(d, dtype=float) / 1000)
+
+    def rss_from_path_loss(self, indoor, tp_dBm, path_loss, rng=None):
+        return np.asarray(tp_dBm) - np.asarray(path_loss, dtype=float)
+
+    def tp_to_rss_batch(self, indoor, tp_dBm, d, alt, rng=None):
+        return self.rss_from_path_loss(indoor, tp_dBm, self.path_loss_batch(d, alt), rng)
+
 
 class COST231Hata:
     def __init__(self, fc, ht=2):
@@ -227,97 +314,86 @@ class COST231Hata:
         pl = A + B*np.log10(d/1000)+C
         return tp_dBm - pl
 
+    def path_loss_batch(self, d, alt):
+        height = 10
+        A = 46.3 + 33.9 * np.log10(self.fc) - 13.28 * np.log10(height) - self.ahr
+        B = 44.9 - 6.55 * np.log10(self.ht)
+        C = 0
+        return A + B * np.log10(np.asarray(d, dtype=float) / 1000) + C
 
-class DecisionTree:
-    def __init__(self):
-        zf = zipfile.ZipFile("../../Framework/ML_Propagation_Models/mclab_tree.zip")
-        self.loaded_model = joblib.load(zf.open('mclab_tree.sav'))
-        self.scaler = joblib.load('../../Framework/ML_Propagation_Models/mclab_scaler.sav')
+    def rss_from_path_loss(self, indoor, tp_dBm, path_loss, rng=None):
+        return np.asarray(tp_dBm) - np.asarray(path_loss, dtype=float)
 
-    def tp_to_rss(self, indoor: bool, tp_dBm: int, d: float, alt: int):
-        # TODO: Create height as a gateway parameter?
-        height = 10
-        print("Distance: {}".format(d))
-        input = self.scaler.transform([[d/1000, height, alt]])
-        pl = self.loaded_model.predict(input)[0]
-        return tp_dBm - pl
+    def tp_to_rss_batch(self, indoor, tp_dBm, d, alt, rng=None):
+        return self.rss_from_path_loss(indoor, tp_dBm, self.path_loss_batch(d, alt), rng)
 
 
-class RandomForest:
-    def __init__(self):
-        zf = zipfile.ZipFile("../../Framework/ML_Propagation_Models/mclab_forest.zip")
-        self.loaded_model = joblib.load(zf.open('mclab_forest.sav'))
-        self.scaler = joblib.load('../../Framework/ML_Propagation_Models/mclab_scaler.sav')
+class MLModel:
+    # Machine learning models trained on the MCLAB measurements,
+    # features are the distance (km), the gateway height (m) and the altitude (m) of the node.
+    # The trained model and scaler are fetched from the process-wide registry (see ML_Propagation_Models/__init__.py),
+    # only the name of the artifact is stored, hence pickling a model to a pool worker is cheap.
 
-    def tp_to_rss(self, indoor: bool, tp_dBm: int, d: float, alt: int):
-        # TODO: Create height as a gateway parameter?
-        height = 10
-        print("Distance: {}".format(d))
-        input = self.scaler.transform([[d/1000, height, alt]])
-        pl = self.loaded_model.predict(input)[0]
-        return tp_dBm - pl
+    @property
+    def loaded_model(self):
+        return ML_Propagation_Models.load(self.artifact)
 
+    @property
+    def scaler(self):
+        return ML_Propagation_Models.load(ML_Propagation_Models.SCALER)
 
-class SVR:
-    def __init__(self):
-        zf = zipfile.ZipFile("../../Framework/ML_Propagation_Models/mclab_svr_rbf.zip")
-        self.loaded_model = joblib.load(zf.open('mclab_svr_rbf.sav'))
-        self.scaler = joblib.load('../../Framework/ML_Propagation_Models/mclab_scaler.sav')
+    def preload(self):
+        ML_Propagation_Models.preload(self.artifact)
 
     def tp_to_rss(self, indoor: bool, tp_dBm: int, d: float, alt: int):
         # TODO: Create height as a gateway parameter?
         height = 10
-        print("Distance: {}".format(d))
         input = self.scaler.transform([[d/1000, height, alt]])
-        pl = self.loaded_model.predict(input)[0]
+        pl = np.ravel(self.loaded_model.predict(input))[0]
         return tp_dBm - pl
 
+    def path_loss_batch(self, d, alt):
+        height = 10
+        d = np.asarray(d, dtype=float)
+        features = np.column_stack(np.broadcast_arrays(np.ravel(d) / 1000, height, np.ravel(alt)))
+        pl = np.asarray(self.loaded_model.predict(self.scaler.transform(features)))
+        return pl.reshape(features.shape[0], -1)[:, 0].reshape(d.shape)
+
+    def rss_from_path_loss(self, indoor, tp_dBm, path_loss, rng=None):
+        return np.asarray(tp_dBm) - np.asarray(path_loss, dtype=float)
+
+    def tp_to_rss_batch(self, indoor, tp_dBm, d, alt, rng=None):
+        return self.rss_from_path_loss(indoor, tp_dBm, self.path_loss_batch(d, alt), rng)
 
-class Lasso:
+
+class DecisionTree(MLModel):
     def __init__(self):
-        zf = zipfile.ZipFile("../../Framework/ML_Propagation_Models/mclab_lasso.zip")
-        self.loaded_model = joblib.load(zf.open('mclab_lasso.sav'))
-        self.scaler = joblib.load('../../Framework/ML_Propagation_Models/mclab_scaler.sav')
+        self.artifact = 'mclab_tree'
 
-    def tp_to_rss(self, indoor: bool, tp_dBm: int, d: float, alt: int):
-        # TODO: Create height as a gateway parameter?
-        height = 10
-        print("Distance: {}".format(d))
-        input = self.scaler.transform([[d/1000, height, alt]])
-        pl = self.loaded_model.predict(input)[0]
-        return tp_dBm - pl
+
+class RandomForest(MLModel):
+    def __init__(self):
+        self.artifact = 'mclab_forest'
 
 
-class XGBOOST:
+class SVR(MLModel):
     def __init__(self):
-        zf = zipfile.ZipFile("../../Framework/ML_Propagation_Models/mclab_xgboost.zip")
-        self.loaded_model = joblib.load(zf.open('mclab_xgboost.sav'))
-        self.scaler = joblib.load('../../Framework/ML_Propagation_Models/mclab_scaler.sav')
+        self.artifact = 'mclab_svr_rbf'
 
-    def tp_to_rss(self, indoor: bool, tp_dBm: int, d: float, alt: int):
-        # TODO: Create height as a gateway parameter?
-        height = 10
-        print("Distance: {}".format(d))
-        input = self.scaler.transform([[d/1000, height, alt]])
-        pl = self.loaded_model.predict(input)[0]
-        return tp_dBm - pl
+
+class Lasso(MLModel):
+    def __init__(self):
+        self.artifact = 'mclab_lasso'
 
 
-class NeuralNetwork:
+class XGBOOST(MLModel):
+    def __init__(self):
+        self.artifact = 'mclab_xgboost'
+
+
+class NeuralNetwork(MLModel):
     def __init__(self, fast: bool):
         if fast:
-            zf = zipfile.ZipFile("../../Framework/ML_Propagation_Models/mclab_ann_small.zip")
-            self.loaded_model = joblib.load(zf.open('mclab_ann_small.sav'))
+            self.artifact = 'mclab_ann_small'
         else:
-            zf = zipfile.ZipFile("../../Framework/ML_Propagation_Models/mclab_ann_best.zip")
-            self.loaded_model = joblib.load(zf.open('mclab_ann_best.sav'))
-
-        self.scaler = joblib.load('../../Framework/ML_Propagation_Models/mclab_scaler.sav')
-
-    def tp_to_rss(self, indoor: bool, tp_dBm: int, d: float, alt: int):
-        # TODO: Create height as a gateway parameter?
-        height = 10
-        print("Distance: {}".format(d))
-        input = self.scaler.transform([[d/1000, height, alt]])
-        pl = self.loaded_model.predict(input)[0]
-        return tp_dBm - pl[0]
+            self.artifact = 'mclab_ann_best'
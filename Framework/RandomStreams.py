@@ -0,0 +1,112 @@
+import zlib
+
+import numpy as np
+
+from Simulations.GlobalConfig import *
+
+
+def resolve(rng):
+    # the global np.random is used if no stream is given
+    return np.random if rng is None else rng
+
+
+class BufferedStream:
+    """Random stream with the subset of the np.random interface used by the framework, on top of a numpy Generator.
+
+    Uniform and standard normal samples are drawn in vectorized chunks of chunk_size and handed out from a buffer,
+    so scalar draws (e.g. the start delay of a node or the shadowing of a packet) do not call into the Generator
+    one at a time. A draw of size n takes the next n samples of the buffer, hence the sequence of a stream does not
+    depend on how the draws are batched.
+    """
+
+    def __init__(self, generator: np.random.Generator, chunk_size=RANDOM_CHUNK_SIZE):
+        self.generator = generator
+        self.chunk_size = chunk_size
+        self.uniforms = np.empty(0)
+        self.uniform_pos = 0
+        self.normals = np.empty(0)
+        self.normal_pos = 0
+
+    def next_uniforms(self, n) -> np.ndarray:
+        if self.uniform_pos + n > len(self.uniforms):
+            rest = self.uniforms[self.uniform_pos:]
+            self.uniforms = np.concatenate([rest, self.generator.random(max(self.chunk_size, n - len(rest)))])
+            self.uniform_pos = 0
+        values = self.uniforms[self.uniform_pos:self.uniform_pos + n]
+        self.uniform_pos += n
+        return values
+
+    def next_normals(self, n) -> np.ndarray:
+        if self.normal_pos + n > len(self.normals):
+            rest = self.normals[self.normal_pos:]
+            self.normals = np.concatenate([rest, self.generator.standard_normal(max(self.chunk_size, n - len(rest)))])
+            self.normal_pos = 0
+        values = self.normals[self.normal_pos:self.normal_pos + n]
+        self.normal_pos += n
+        return values
+
+    def random(self, size=None):
+        if size is None:
+            return float(self.next_uniforms(1)[0])
+        return self.next_uniforms(int(np.prod(size))).reshape(size)
+
+    def uniform(self, low=0.0, high=1.0, size=None):
+        return low + (high - low) * self.random(size)
+
+    def normal(self, loc=0.0, scale=1.0, size=None):
+        if size is None:
+            return loc + scale * float(self.next_normals(1)[0])
+        return loc + scale * self.next_normals(int(np.prod(size))).reshape(size)
+
+    def randint(self, low, high=None, size=None):
+        # as np.random.randint: [low, high), or [0, low) if high is None
+        if high is None:
+            low, high = 0, low
+        if size is None:
+            return low + int(self.random() * (high - low))
+        return low + (self.random(size) * (high - low)).astype(int)
+
+    def choice(self, a, size=None):
+        a = np.asarray(a)
+        if size is None:
+            return a[int(self.random() * len(a))]
+        return a[(self.random(size) * len(a)).astype(int)]
+
+
+class RandomStreams:
+    """Independent random streams per node, per propagation model and for the set-up of a simulation.
+
+    Every stream is derived from a SeedSequence on (seed, replicate, kind, id), so a stream only depends on what it
+    is used for and not on the order in which nodes are created or on the pool worker that runs the replicate.
+    The node streams draw chunks of node_chunk_size samples: every node holds its own buffers, hence large chunks add
+    up to a lot of memory for a large population (a node only draws a few uniform samples per packet).
+    """
+
+    NODE = 0
+    MODEL = 1
+    SETUP = 2
+
+    def __init__(self, seed=RANDOM_SEED, replicate=0, chunk_size=RANDOM_CHUNK_SIZE,
+                 node_chunk_size=RANDOM_NODE_CHUNK_SIZE):
+        self.seed = seed
+        self.replicate = replicate
+        self.chunk_size = chunk_size
+        self.node_chunk_size = node_chunk_size
+
+    def stream(self, kind, stream_id, chunk_size=None) -> BufferedStream:
+        sequence = np.random.SeedSequence(self.seed, spawn_key=(self.replicate, kind, stream_id))
+        return BufferedStream(np.random.Generator(np.random.PCG64(sequence)),
+                              self.chunk_size if chunk_size is None else chunk_size)
+
+    def node(self, node_id) -> BufferedStream:
+        return self.stream(RandomStreams.NODE, node_id, self.node_chunk_size)
+
+    def model(self, name) -> BufferedStream:
+        # the name (e.g. the class of the model) is hashed to a stable id
+        return self.stream(RandomStreams.MODEL, zlib.crc32(name.encode()))
+
+    def setup(self) -> BufferedStream:
+        return self.stream(RandomStreams.SETUP, 0)
+
+    def for_replicate(self, replicate):
+        return RandomStreams(self.seed, replicate, self.chunk_size, self.node_chunk_size)
@@ -0,0 +1,103 @@
+import json
+import os
+from glob import glob
+
+import pandas as pd
+
+from Framework.PacketLog import OPERATORS
+from Simulations.GlobalConfig import *
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+
+class ResultsStore:
+    """Append-only store of the results of a simulation study, written one cell at a time.
+
+    A cell is one replicate of one parameter combination, identified by a key, e.g.
+    {'simulation': 3, 'payload_size': 12, 'sigma': 7.8}. Every table of a cell (e.g. 'nodes', 'gateway') is written to
+    its own file <directory>/<table>/<cell>.<ext>, holding one row group with the key columns prepended:
+    parquet:    <cell>.parquet (needs pyarrow)
+    pickle:     <cell>.pkl, a pickled DataFrame
+    Files are written to a temporary file and renamed, hence an interrupted write never corrupts the store, and a cell
+    is only marked done once all its tables are written. Writing a cell again replaces it.
+    Use ResultsStore.read to load (a selection of the columns of) a table.
+    """
+
+    FORMATS = ['parquet', 'pickle']
+    EXTENSIONS = {'parquet': '.parquet', 'pickle': '.pkl'}
+    DONE = '_done'
+
+    def __init__(self, directory, store_format=RESULTS_FORMAT):
+        if store_format == 'auto':
+            store_format = 'pickle' if pq is None else 'parquet'
+        if store_format not in ResultsStore.FORMATS:
+            raise ValueError('Results store format {} not in {}'.format(store_format, ResultsStore.FORMATS))
+        if store_format == 'parquet' and pq is None:
+            raise ValueError('The parquet results store needs pyarrow')
+        self.directory = directory
+        self.store_format = store_format
+        os.makedirs(os.path.join(self.directory, ResultsStore.DONE), exist_ok=True)
+
+    @staticmethod
+    def cell_name(key: dict) -> str:
+        return '_'.join('{}'.format(value) for value in key.values())
+
+    def write_meta(self, **meta):
+        # parameters of the study, shared by all cells
+        path = os.path.join(self.directory, 'meta.json')
+        with open(path + '.tmp', 'w') as f:
+            json.dump(meta, f)
+        os.replace(path + '.tmp', path)
+
+    def append(self, key: dict, **tables):
+        """Write the tables (DataFrames, or Series for a single row) of the cell `key`"""
+        name = ResultsStore.cell_name(key)
+        for table, data in tables.items():
+            if isinstance(data, pd.Series):
+                data = data.to_frame().T
+            data = data.reset_index(drop=True).infer_objects()
+            for idx, (column, value) in enumerate(key.items()):
+                data.insert(idx, column, value)
+            os.makedirs(os.path.join(self.directory, table), exist_ok=True)
+            path = os.path.join(self.directory, table, name + ResultsStore.EXTENSIONS[self.store_format])
+            # a leading dot, the readers skip unfinished files
+            tmp_path = os.path.join(self.directory, table, '.' + name + '.tmp')
+            if self.store_format == 'parquet':
+                pq.write_table(pa.Table.from_pandas(data, preserve_index=False), tmp_path)
+            else:
+                data.to_pickle(tmp_path)
+            os.replace(tmp_path, path)
+        open(os.path.join(self.directory, ResultsStore.DONE, name), 'w').close()
+
+    def has(self, key: dict) -> bool:
+        return os.path.exists(os.path.join(self.directory, ResultsStore.DONE, ResultsStore.cell_name(key)))
+
+    @staticmethod
+    def meta(directory) -> dict:
+        with open(os.path.join(directory, 'meta.json')) as f:
+            return json.load(f)
+
+    @staticmethod
+    def read(directory, table, columns=None, filters=None) -> pd.DataFrame:
+        """Rows of `table` matching all filters, e.g. [('payload_size', '==', 12)], of all cells written"""
+        parquet_files = sorted(glob(os.path.join(directory, table, '*.parquet')))
+        if parquet_files:
+            if pq is None:
+                raise ValueError('Reading a parquet results store needs pyarrow')
+            # cells may differ in the types of a column (e.g. an int and a float sigma), these are promoted
+            schema = pa.unify_schemas([pq.read_schema(f) for f in parquet_files], promote_options='permissive')
+            return pq.read_table(parquet_files, schema=schema, columns=columns, filters=filters).to_pandas()
+        pickle_files = sorted(glob(os.path.join(directory, table, '*.pkl')))
+        if not pickle_files:
+            return pd.DataFrame(columns=columns)
+        data = pd.concat([pd.read_pickle(f) for f in pickle_files], ignore_index=True)
+        for column, op, value in filters or []:
+            data = data[OPERATORS[op](data[column], value)]
+        if columns is not None:
+            data = data[columns]
+        return data.reset_index(drop=True)
@@ -0,0 +1,620 @@
+"""Windowed parallel simulation of nodes without ADR and confirmed messages (ShardedSimulation, run_resumable).
+
+The results are bit-identical for any number of processes, i.e. to the serial run of this engine (processes=0), and
+to a run resumed from a checkpoint. They are not bit-identical to the serial simpy engine (Node.run and the air
+interfaces): it draws from one shared random stream in event order, this engine draws keyed random numbers, hence for
+the configurations both support (no ADR, unconfirmed messages) the results only agree within the statistical tolerance.
+"""
+import heapq
+import multiprocessing as mp
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+
+from Simulations.GlobalConfig import *
+from Framework.AirInterface import AirInterface
+from Framework.CollisionIndex import CollisionIndex
+from Framework.EventTrace import tracer
+from Framework.KeyedRandom import KeyedRandom, uniform_of
+from Framework.LoRaPacket import DownlinkMetaMessage, airtime
+from Framework.GatewayIndex import GatewayIndex
+from Framework.LoRaParameters import LoRaParameters
+from Framework.Geometry import Geometry
+from Framework.NetworkServer import NetworkServer
+from Framework.NodePopulation import NodePopulation
+from Framework.PacketLog import PacketLog
+
+# streams of the keyed random numbers
+START_STREAM = 0
+WAIT_STREAM = 1
+RSS_STREAM = 2
+# streams used by one RSS draw (building loss and shadowing), every gateway has its own streams
+RSS_DRAWS = 3
+# message to a shard process asking for the state of its shard
+STATE = 'state'
+
+
+class Clock:
+    # simulated time (ms) used as `env` of the gateway and the transmissions, there is no simpy environment
+    def __init__(self, now=0):
+        self.now = now
+
+
+class Sender:
+    __slots__ = ['id', 'env']
+
+    def __init__(self, node_id, env):
+        self.id = node_id
+        self.env = env
+
+
+class Radio:
+    # LoRa parameters of a transmission needed for the collision checks
+    __slots__ = ['sf', 'bw', 'freq']
+
+    def __init__(self, sf, bw, freq):
+        self.sf = sf
+        self.bw = bw
+        self.freq = freq
+
+
+class Transmission:
+    # a packet in the air of a shard, compatible with the collision checks of the AirInterface
+    __slots__ = ['node', 'seq', 'lora_param', 'start_on_air', 'time_on_air', 'rss', 'snr', 'collided', 'air_key']
+
+    def __init__(self, node, seq, lora_param, start_on_air, time_on_air):
+        self.node = node
+        self.seq = seq
+        self.lora_param = lora_param
+        self.start_on_air = start_on_air
+        self.time_on_air = time_on_air
+        self.rss = None
+        self.snr = None
+        self.collided = False
+
+    def my_time_on_air(self):
+        return self.time_on_air
+
+
+class GatewayAir:
+    # the air of a gateway as seen by the NetworkServer
+    __slots__ = ['gateway']
+
+    def __init__(self, gateway):
+        self.gateway = gateway
+
+
+class Uplink:
+    # an uplink (or a reception of it) as seen by the gateway and the network server
+    __slots__ = ['node', 'lora_param', 'payload_size', 'id', 'rss', 'snr', 'is_confirmed_message', 'collided',
+                 'receptions']
+
+    def __init__(self, node, payload_size, packet_id, rss, snr):
+        self.node = node
+        self.lora_param = node.lora_param
+        self.payload_size = payload_size
+        self.id = packet_id
+        self.rss = rss
+        self.snr = snr
+        self.is_confirmed_message = False
+        self.collided = False
+        self.receptions = []
+
+
+class Shard:
+    """The air interfaces of a subset of the receivers (gateway and channel).
+
+    The transmissions are put in and taken out of the air of their gateway in time order, exactly as the AirInterface
+    does, but only up to the end of the current window. The RSS is drawn with keyed random numbers (per packet and
+    gateway), hence the outcome does not depend on how the receivers are spread over shards or processes.
+    """
+
+    def __init__(self, prop_model, snr_model, seed):
+        self.prop_model = prop_model
+        self.snr_model = snr_model
+        self.seed = seed
+        self.clock = Clock()
+        # packets in the air per gateway
+        self.packages_in_air = dict()
+        self.starts = []
+        self.ends = []
+
+    def rss(self, node_idx, seq, gateway, path_loss, indoor, tp):
+        keys = (node_idx.astype(np.uint64) << np.uint64(32)) | seq.astype(np.uint64)
+        rss = np.empty(len(keys))
+        # per gateway, indoor and outdoor packets are drawn separately, so each call draws one value per key
+        for g in np.unique(gateway):
+            for mask in [indoor & (gateway == g), ~indoor & (gateway == g)]:
+                if np.any(mask):
+                    rng = KeyedRandom(self.seed, keys[mask], stream=RSS_STREAM + RSS_DRAWS * int(g))
+                    rss[mask] = self.prop_model.rss_from_path_loss(indoor[mask], tp[mask], path_loss[mask], rng)
+        return rss
+
+    def run_window(self, window_end, transmissions):
+        """Adds the transmissions (tuples, see ShardedSimulation.cycle) and processes the air interfaces up to
+        window_end, returns (node index, seq, gateway, collided, rss, snr) of every transmission that ended."""
+        if len(transmissions) > 0:
+            columns = list(zip(*transmissions))
+            rss = self.rss(np.array(columns[0], dtype=np.int64), np.array(columns[1], dtype=np.int64),
+                           np.array(columns[7], dtype=np.int64), np.array(columns[8], dtype=float),
+                           np.array(columns[9], dtype=bool), np.array(columns[10], dtype=float))
+            snr = self.snr_model.rss_to_snr(rss)
+            for (idx, s, start, time_on_air, sf, bw, freq, g, _, _, _), r, n in zip(transmissions, rss, snr):
+                transmission = Transmission(Sender(idx, self.clock), s, Radio(sf, bw, freq), start, time_on_air)
+                transmission.rss = float(r)
+                transmission.snr = float(n)
+                heapq.heappush(self.starts, (start, idx, s, g, transmission))
+
+        outcomes = []
+        while True:
+            next_start = self.starts[0][0] if self.starts else np.inf
+            next_end = self.ends[0][0] if self.ends else np.inf
+            if min(next_start, next_end) >= window_end:
+                break
+            if next_end <= next_start:
+                end, idx, s, g, transmission = heapq.heappop(self.ends)
+                self.clock.now = end
+                collided = AirInterface.collision_in(self.packages_in_air[g], transmission, end)
+                self.packages_in_air[g].remove(transmission)
+                outcomes.append((idx, s, g, collided, transmission.rss, transmission.snr))
+            else:
+                start, idx, s, g, transmission = heapq.heappop(self.starts)
+                self.clock.now = start
+                if g not in self.packages_in_air:
+                    self.packages_in_air[g] = CollisionIndex()
+                self.packages_in_air[g].add(transmission)
+                heapq.heappush(self.ends, (start + transmission.time_on_air, idx, s, g, transmission))
+        return outcomes
+
+    def state(self) -> dict:
+        # the packets that did not start yet or are in the air, pickled together so they stay shared
+        return {'clock': self.clock, 'packages_in_air': self.packages_in_air, 'starts': self.starts, 'ends': self.ends}
+
+    def restore(self, state: dict):
+        self.clock = state['clock']
+        self.packages_in_air = state['packages_in_air']
+        self.starts = state['starts']
+        self.ends = state['ends']
+
+
+def serve(connection, shard: Shard):
+    # loop of a shard in its own process
+    while True:
+        message = connection.recv()
+        if message is None:
+            break
+        if message == STATE:
+            connection.send(shard.state())
+            continue
+        connection.send(shard.run_window(*message))
+    connection.close()
+
+
+class ShardedSimulation:
+    """Conservative parallel simulation of nodes without ADR and confirmed messages (see Node.run_fast_forward).
+
+    Packets on different channels or at different gateways never interfere, so the air interfaces of the receivers
+    (gateway and channel) are spread over shards, each shard can run in its own process. With several gateways
+    (a NetworkServer as base station) the receivers are partitioned geographically by the cells of the GatewayIndex,
+    a packet is only sent to the shards of the gateways within max_range of its node: packets of nodes at the boundary
+    of a partition are the only ones exchanged with more than one shard. The node cycles and the gateways or network
+    server run in this process. Time advances in windows of `lookahead` ms: all uplinks starting in a window are known
+    at its start, because the next uplink of a node starts at least a sleep time after the end of its previous one.
+    Hence the lookahead is at most the minimum sleep time. Only at the end of a window the shards and the nodes
+    synchronize: the uplinks that ended are handed, in time order, to the base station and the nodes choose the channel
+    (and time) of their next uplink.
+
+    The random numbers are keyed per node, packet and gateway (KeyedRandom), the results are identical for any number
+    of processes (0 runs the shards serially in this process), but differ from the simpy engines (which share one
+    random stream) within the statistical tolerance.
+    Results are written to the nodes (population), the gateways, the network server and to this object
+    (as AirInterface).
+
+    A run with a checkpoint file saves the full state of the simulation at the end of a window every
+    checkpoint_interval ms of simulated time: the node populations, the gateways (and network server), the packets
+    that did not start yet or are in the air (of every shard), the per node state of this engine and the clock.
+    The random numbers are keyed, their state is the seed and the packet counters of the nodes. Running the same
+    simulation (same nodes, base station, models and seed) with the same checkpoint file resumes from the last
+    checkpoint, with results identical to a run that was never interrupted. The file is removed when the run completes.
+    The packet log is part of the checkpoint: a resumed run keeps the rows logged up to the checkpoint and logs the
+    later packets again, hence its log equals the log of an uninterrupted run.
+    """
+
+    def __init__(self, nodes: list, base_station, prop_model, snr_model, processes=SHARD_PROCESSES,
+                 lookahead=None, seed=0, max_range=MAX_GATEWAY_RANGE_M, packet_log: PacketLog = None):
+        for node in nodes:
+            if not node.fast_forward_possible():
+                raise ValueError('Node {} uses ADR or confirmed messages, it can not be sharded'.format(node.id))
+        self.nodes = nodes
+        self.base_station = base_station
+        if isinstance(base_station, NetworkServer):
+            self.gateways = base_station.gateways
+        else:
+            self.gateways = [base_station]
+            max_range = None
+        self.airs = [GatewayAir(gateway) for gateway in self.gateways]
+        self.prop_model = prop_model
+        self.snr_model = snr_model
+        self.seed = seed
+        # without a packet log, one is opened by run if PACKET_LOG_DIR is set (a resumed run reopens its own)
+        self.packet_log = packet_log
+        self.clock = Clock()
+        # the gateways are driven by this engine
+        for gateway in self.gateways:
+            gateway.env = self.clock
+
+        min_sleep_time = min(node.sleep_time for node in nodes)
+        if lookahead is None:
+            lookahead = min_sleep_time
+        if lookahead > min_sleep_time:
+            raise ValueError('The lookahead ({} ms) can not exceed the minimum sleep time ({} ms)'.format(
+                lookahead, min_sleep_time))
+        self.lookahead = lookahead
+
+        self.channels = LoRaParameters.CHANNELS
+        gateway_index = GatewayIndex(self.gateways, max_range)
+        receivers = [(g, channel) for g in range(len(self.gateways)) for channel in self.channels]
+        if processes is None:
+            processes = mp.cpu_count()
+        self.processes = min(processes, len(receivers))
+        self.num_shards = max(self.processes, 1)
+        # neighbouring cells end up in the same shard, so few packets have to be sent to several shards
+        if max_range is not None:
+            receivers.sort(key=lambda r: (gateway_index.cell(self.gateways[r[0]].location), r))
+        self.shard_of = dict()
+        for position, receiver in enumerate(receivers):
+            self.shard_of[receiver] = position * self.num_shards // len(receivers)
+
+        # (gateway, path loss) of the gateways in range per node
+        self.receptions = [[] for _ in nodes]
+        alt = np.array([np.nan if node.location.alt is None else node.location.alt for node in nodes], dtype=float)
+        in_range = [gateway_index.within(node.location) for node in nodes]
+        geometry = Geometry.of([node.location for node in nodes], [gateway.location for gateway in self.gateways])
+        for g, gateway in enumerate(self.gateways):
+            node_idx = [idx for idx in range(len(nodes)) if g in in_range[idx]]
+            d = geometry.distance_2d[node_idx, g]
+            for idx, path_loss in zip(node_idx, prop_model.path_loss_batch(d, alt[node_idx]).tolist()):
+                self.receptions[idx].append((g, path_loss))
+        self.indoor = [bool(node.location.indoor) for node in nodes]
+
+        num_nodes = len(nodes)
+        self.seq = [0] * num_nodes
+        self.sleeping_since = [None] * num_nodes
+        self.payload_size = [0] * num_nodes
+        self.on_air = [0] * num_nodes
+        self.packets_sent = [0] * num_nodes
+
+        self.num_of_packets_collided = 0
+        self.num_of_packets_send = 0
+        self.until = 0
+        self.window_end = 0
+        # transmissions per shard that did not start yet and (end, node index, seq) of the packets in the air
+        self.pending = []
+        self.in_air = []
+
+    def book(self, idx, time, key, value):
+        # books energy or a counter of a node if it happened in the simulated time
+        if time >= self.until:
+            return
+        node = self.nodes[idx]
+        if key in NodePopulation.ENERGY_STATE_INDEX:
+            node.population.energy[node.index, NodePopulation.ENERGY_STATE_INDEX[key]] += value
+        else:
+            node.population.columns[key][node.index] += value
+
+    def cycle(self, idx, now):
+        # wait, sleep, processing and channel choice of a node (as Node.run_fast_forward), the uplink is queued
+        node = self.nodes[idx]
+        sleep_power = node.energy_profile.sleep_power_mW
+        self.seq[idx] += 1
+        seq = self.seq[idx]
+        random_wait = int(uniform_of(self.seed, (idx << 32) | seq, WAIT_STREAM) * MAX_DELAY_BEFORE_SLEEP_MS)
+        start_sleep = now + random_wait
+        sleeping_since = self.sleeping_since[idx]
+        if sleeping_since is None:
+            sleeping_since = start_sleep
+        self.sleeping_since[idx] = None
+        start_processing = start_sleep + node.sleep_time
+        self.book(idx, start_processing, 'SLEEP', sleep_power * ((start_processing - sleeping_since) / 1000))
+        self.book(idx, start_processing, 'PROCESS', (node.process_time / 1000) * node.energy_profile.proc_power_mW)
+        now = start_processing + node.process_time
+        if now >= self.until:
+            return
+        node.unique_packet_id = seq
+
+        payload_size = node.payload_size
+        if MAC_IMPROVEMENT and self.packets_sent[idx] < 20:
+            payload_size = 5
+        self.payload_size[idx] = payload_size
+        lora_param = node.lora_param
+        time_on_air = airtime(payload_size, lora_param.sf, lora_param.bw, lora_param.cr, lora_param.crc, lora_param.h,
+                              lora_param.de)
+
+        time_off = node.population.time_off[node.index]
+        channel = node.best_channel()
+        lora_param.freq = channel
+        channel_idx = NodePopulation.CHANNEL_INDEX[channel]
+
+        start_tx = now
+        if time_off[channel_idx] > now:
+            wait = time_off[channel_idx] - now
+            node.total_wait_time_because_dc += wait
+            start_tx = now + wait
+            self.book(idx, start_tx, 'SLEEP', sleep_power * ((start_tx - now) / 1000))
+        time_off[channel_idx] = start_tx + (time_on_air / LoRaParameters.CHANNEL_DUTY_CYCLE[channel] - time_on_air)
+
+        self.packets_sent[idx] += 1
+        self.book(idx, start_tx, 'packets_sent', 1)
+        self.book(idx, start_tx, 'bytes_sent', payload_size)
+        self.book(idx, start_tx, 'energy_value', lora_param.tp + (5 - lora_param.dr))
+        self.book(idx, start_tx, 'TX', LoRaParameters.RADIO_TX_PREP_ENERGY_MJ)
+        start = start_tx + LoRaParameters.RADIO_TX_PREP_TIME_MS
+        if start >= self.until:
+            return
+        if start < self.window_end:
+            raise RuntimeError('Node {} sends in a window that already started, lower the lookahead'.format(node.id))
+        tx_power = node.energy_profile.tx_power_mW[lora_param.tp] * node.power_gain
+        self.book(idx, start, 'TX', tx_power * (time_on_air / 1000))
+        self.book(idx, start, 'num_tx_state_changes', 1)
+        self.num_of_packets_send += 1
+        self.on_air[idx] = start
+        heapq.heappush(self.in_air, (start + time_on_air, idx, seq))
+        for g, path_loss in self.receptions[idx]:
+            transmission = (idx, seq, start, time_on_air, lora_param.sf, lora_param.bw, channel, g, path_loss,
+                            self.indoor[idx], lora_param.tp)
+            heapq.heappush(self.pending, (start, idx, seq, g, self.shard_of[(g, channel)], transmission))
+
+    def book_rx_window(self, idx, start, rec_window, uplink, ack):
+        # as Node.book_rx_window
+        node = self.nodes[idx]
+        rx_power = node.energy_profile.rx_power
+        self.book(idx, start, 'RX', rx_power['pre_mW'] * rx_power['pre_ms'] / 1000)
+        start = start + rx_power['pre_ms']
+        rx_time, rx_energy, power = node.rx_window(rec_window, uplink, ack)
+        self.book(idx, start, 'RX', rx_energy)
+        end = start + rx_time
+        if ack:
+            self.book(idx, end, 'RX', rx_power['post_mW'] * (rx_power['post_ms'] / 1000))
+            end = end + rx_power['post_ms']
+        return end
+
+    def received(self, end, idx, seq, receptions):
+        # the uplink left the air: base station, RX windows and the next cycle of the node
+        node = self.nodes[idx]
+        self.clock.now = end
+        uplink = Uplink(node, self.payload_size[idx], seq, None, None)
+        for g, collided, rss, snr in receptions:
+            reception = Uplink(node, uplink.payload_size, seq, rss, snr)
+            reception.collided = collided
+            uplink.receptions.append((self.airs[g], reception))
+        if len(uplink.receptions) > 0:
+            strongest = max(uplink.receptions, key=lambda r: r[1].rss)[1]
+            uplink.rss = strongest.rss
+            uplink.snr = strongest.snr
+        # as the MultiGatewayAirInterface: a packet is only collided if it collided at every gateway in range
+        uplink.collided = len(receptions) > 0 and all(reception[1] for reception in receptions)
+        if not uplink.collided:
+            downlink_message = self.base_station.packet_received(node, uplink, end)
+        else:
+            self.num_of_packets_collided += 1
+            node.num_collided += 1
+            downlink_message = None
+
+        rx_on_rx1 = False
+        rx_on_rx2 = False
+        if downlink_message is not None:
+            rx_on_rx1 = downlink_message.meta.scheduled_receive_slot == DownlinkMetaMessage.RX_SLOT_1
+            rx_on_rx2 = downlink_message.meta.scheduled_receive_slot == DownlinkMetaMessage.RX_SLOT_2
+
+        sleep_power = node.energy_profile.sleep_power_mW
+        start_rx = end + LoRaParameters.RX_WINDOW_1_DELAY
+        self.book(idx, start_rx, 'SLEEP', sleep_power * ((start_rx - end) / 1000))
+        end_rx = self.book_rx_window(idx, start_rx, 1, uplink, rx_on_rx1)
+        sleep_between_rx1_rx2_window = LoRaParameters.RX_WINDOW_2_DELAY - (
+            LoRaParameters.RX_WINDOW_1_DELAY + (end_rx - start_rx))
+        sleeping_since = None
+        if sleep_between_rx1_rx2_window > 0:
+            sleeping_since = end_rx
+            end_rx = end_rx + sleep_between_rx1_rx2_window
+        if not rx_on_rx1:
+            if sleeping_since is not None:
+                self.book(idx, end_rx, 'SLEEP', sleep_power * ((end_rx - sleeping_since) / 1000))
+                sleeping_since = None
+            end_rx = self.book_rx_window(idx, end_rx, 2, uplink, rx_on_rx2)
+        self.sleeping_since[idx] = sleeping_since
+
+        if downlink_message is None or downlink_message.meta.is_lost():
+            if downlink_message is not None and end_rx < self.until:
+                node.lost_packages_time.append(end_rx)
+            self.book(idx, end_rx, 'num_no_downlink', 1)
+        self.book(idx, end_rx, 'num_unique_packets_sent', 1)
+        if self.packet_log is not None:
+            self.record_packet(idx, end, uplink, downlink_message)
+        if downlink_message is not None:
+            downlink_message.release()
+        self.cycle(idx, end_rx)
+
+    def record_packet(self, idx, end, uplink, downlink_message):
+        # as Node.record_packet
+        node = self.nodes[idx]
+        lora_param = node.lora_param
+        start = self.on_air[idx]
+        energy = LoRaParameters.RADIO_TX_PREP_ENERGY_MJ + node.energy_profile.tx_power_mW[lora_param.tp] * \
+            node.power_gain * ((end - start) / 1000)
+        weak = downlink_message is not None and downlink_message.meta.weak_packet
+        dl_slot = None if downlink_message is None else downlink_message.meta.scheduled_receive_slot
+        self.packet_log.record(node.id, start, lora_param.sf, lora_param.tp, lora_param.freq, uplink.rss, uplink.snr,
+                               uplink.collided, weak, dl_slot, energy)
+
+    def populations(self) -> list:
+        populations = dict()
+        for node in self.nodes:
+            populations[id(node.population)] = node.population
+        return list(populations.values())
+
+    def state(self, shard_states: list) -> dict:
+        base_station = None
+        if isinstance(self.base_station, NetworkServer):
+            base_station = {k: v for k, v in self.base_station.__dict__.items() if k != 'gateways'}
+        return {
+            'num_nodes': len(self.nodes),
+            'seed': self.seed,
+            'until': self.until,
+            'now': self.clock.now,
+            'window_end': self.window_end,
+            'populations': self.populations(),
+            'lost_packages_time': [node.lost_packages_time for node in self.nodes],
+            'gateways': [{k: v for k, v in gateway.__dict__.items() if k != 'env'} for gateway in self.gateways],
+            'base_station': base_station,
+            'engine': {name: getattr(self, name) for name in ['seq', 'sleeping_since', 'payload_size', 'on_air',
+                                                               'packets_sent', 'num_of_packets_collided',
+                                                               'num_of_packets_send', 'pending', 'in_air']},
+            'shards': shard_states,
+            'packet_log': None if self.packet_log is None else self.packet_log.state(),
+        }
+
+    def restore(self, state: dict, shards: list):
+        if state['num_nodes'] != len(self.nodes) or state['seed'] != self.seed or state['until'] != self.until:
+            raise ValueError('The checkpoint is of another simulation ({} nodes, seed {}, until {})'.format(
+                state['num_nodes'], state['seed'], state['until']))
+        if len(state['shards']) != len(shards):
+            raise ValueError('The checkpoint has {} shards, the simulation {}'.format(len(state['shards']),
+                                                                                      len(shards)))
+        self.clock.now = state['now']
+        self.window_end = state['window_end']
+        # in place, the nodes keep their view on their population
+        for population, saved in zip(self.populations(), state['populations']):
+            population.__dict__.update(saved.__dict__)
+        for node, lost_packages_time in zip(self.nodes, state['lost_packages_time']):
+            node.lost_packages_time = lost_packages_time
+        for gateway, saved in zip(self.gateways, state['gateways']):
+            gateway.__dict__.update(saved)
+        if state['base_station'] is not None:
+            self.base_station.__dict__.update(state['base_station'])
+        for name, value in state['engine'].items():
+            setattr(self, name, value)
+        for shard, shard_state in zip(shards, state['shards']):
+            shard.restore(shard_state)
+        if state['packet_log'] is not None:
+            # the part of the log of the interrupted run, cut back to the rows logged up to the checkpoint
+            if self.packet_log is not None:
+                self.packet_log.close()
+            self.packet_log = PacketLog.resume(state['packet_log'])
+
+    def checkpoint(self, file, shards: list, connections: list):
+        if len(connections) > 0:
+            for connection in connections:
+                connection.send(STATE)
+            shard_states = [connection.recv() for connection in connections]
+        else:
+            shard_states = [shard.state() for shard in shards]
+        # an interrupted write leaves the previous checkpoint intact
+        with open(file + '.tmp', 'wb') as f:
+            pickle.dump(self.state(shard_states), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(file + '.tmp', file)
+
+    def run(self, until, checkpoint_file=None, checkpoint_interval=CHECKPOINT_INTERVAL_MS):
+        self.until = until
+        shards = [Shard(self.prop_model, self.snr_model, self.seed) for _ in range(self.num_shards)]
+        resume = checkpoint_file is not None and os.path.exists(checkpoint_file)
+        if resume:
+            # before the shard processes are started, they get the restored shards
+            with open(checkpoint_file, 'rb') as f:
+                self.restore(pickle.load(f), shards)
+        if self.packet_log is None and PACKET_LOG_DIR is not None:
+            self.packet_log = PacketLog()
+        connections = []
+        workers = []
+        if self.processes > 1:
+            for shard in shards:
+                parent, child = mp.Pipe()
+                worker = mp.Process(target=serve, args=(child, shard), daemon=True)
+                worker.start()
+                connections.append(parent)
+                workers.append(worker)
+
+        if not resume:
+            for idx, node in enumerate(self.nodes):
+                start = uniform_of(self.seed, idx << 32, START_STREAM) * MAX_DELAY_START_PER_NODE_MS
+                if start < until:
+                    node.start_device_active = start
+                    self.cycle(idx, start)
+
+        window_start = self.window_end
+        next_checkpoint = window_start + checkpoint_interval
+        try:
+            while window_start < until:
+                self.window_end = min(window_start + self.lookahead, until)
+                batches = [[] for _ in range(self.num_shards)]
+                while self.pending and self.pending[0][0] < self.window_end:
+                    _, _, _, _, shard, transmission = heapq.heappop(self.pending)
+                    batches[shard].append(transmission)
+                outcomes = []
+                if self.processes > 1:
+                    for connection, batch in zip(connections, batches):
+                        connection.send((self.window_end, batch))
+                    for connection in connections:
+                        outcomes.extend(connection.recv())
+                else:
+                    for shard, batch in zip(shards, batches):
+                        outcomes.extend(shard.run_window(self.window_end, batch))
+                receptions = dict()
+                for idx, seq, g, collided, rss, snr in sorted(outcomes):
+                    receptions.setdefault((idx, seq), []).append((g, collided, rss, snr))
+                while self.in_air and self.in_air[0][0] < self.window_end:
+                    end, idx, seq = heapq.heappop(self.in_air)
+                    self.received(end, idx, seq, receptions.pop((idx, seq), []))
+                window_start = self.window_end
+                if checkpoint_file is not None and next_checkpoint <= window_start < until:
+                    self.checkpoint(checkpoint_file, shards, connections)
+                    next_checkpoint = window_start + checkpoint_interval
+        finally:
+            for connection in connections:
+                connection.send(None)
+            for worker in workers:
+                worker.join()
+        if checkpoint_file is not None and os.path.exists(checkpoint_file):
+            os.remove(checkpoint_file)
+
+    def get_simulation_data(self, name) -> pd.Series:
+        series = pd.Series([self.num_of_packets_collided, self.num_of_packets_send],
+                           index=['NumberOfPacketsCollided', 'NumberOfPacketsOnAir'])
+        series.name = name
+        return series.transpose()
+
+
+def run_resumable(sim_env, nodes: list, gateway, air_interface: AirInterface, until, checkpoint_file=None, seed=0):
+    """Runs the simulation of a driver cell (see Simulations/*/SimulationProcess.py) until `until`, returns the object
+    with the simulation data of the air interface.
+
+    Without a checkpoint file the cell is run by simpy. With a checkpoint file it is run by the ShardedSimulation (in
+    this process), which checkpoints it to the file and resumes an interrupted run from it. The simpy engine can not be
+    checkpointed (its nodes are generators), hence a cell with nodes using ADR or confirmed messages, which can not be
+    sharded, raises a ValueError with a checkpoint file instead of silently running without checkpoints.
+    Checkpointed results differ from the results of the serial simpy run of the same cell: the sharded engine draws
+    other (keyed) random numbers, the results only agree within the statistical tolerance. A checkpointed cell gives
+    the same results whether or not it was interrupted.
+    The packet log and the tracking policy are closed and the traced events are written when the run ends.
+    """
+    simulation = air_interface
+    try:
+        if checkpoint_file is None:
+            sim_env.run(until=until)
+        else:
+            for node in nodes:
+                if not node.fast_forward_possible():
+                    raise ValueError('Node {} uses ADR or confirmed messages, only the sharded engine can be '
+                                     'checkpointed, run the cell without a checkpoint file'.format(node.id))
+            os.makedirs(os.path.dirname(checkpoint_file) or '.', exist_ok=True)
+            simulation = ShardedSimulation(nodes, gateway, air_interface.prop_model, air_interface.snr_model,
+                                           processes=0, seed=seed, packet_log=air_interface.packet_log)
+            simulation.run(until, checkpoint_file=checkpoint_file)
+    finally:
+        # pool workers end with os._exit (no atexit handlers), the buffered rows are written when the cell ends
+        if simulation.packet_log is not None:
+            simulation.packet_log.close()
+        air_interface.tracking.close()
+        tracer.close()
+    return simulation
@@ -0,0 +1,47 @@
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from Framework.Deployment import Deployment
+
+
+class SharedLocations(Deployment):
+    """Deployment (locations of the nodes of every replicate) in one block of shared memory.
+
+    Pickling a SharedLocations (e.g. as a constant of the SweepRunner) only sends the name and shape of the block, the
+    receiving process attaches to the block by name instead of unpickling a list of Location objects per replicate.
+    locations[replicate] is a lazy view on the Locations of a replicate (see Deployment).
+    The creating process frees the block on close (or at the end of a with block).
+    """
+
+    def __init__(self, deployment):
+        # a Deployment or a list (per replicate) of lists of Locations
+        if not isinstance(deployment, Deployment):
+            deployment = Deployment.from_locations(deployment)
+        self.shape = deployment.array.shape
+        self.shm = shared_memory.SharedMemory(create=True, size=max(1, int(np.prod(self.shape)) * 8))
+        self.owner = True
+        super().__init__(np.ndarray(self.shape, dtype=np.float64, buffer=self.shm.buf))
+        self.array[...] = deployment.array
+
+    def __getstate__(self):
+        return {'name': self.shm.name, 'shape': self.shape}
+
+    def __setstate__(self, state):
+        self.shape = state['shape']
+        self.shm = shared_memory.SharedMemory(name=state['name'])
+        self.owner = False
+        self.array = np.ndarray(self.shape, dtype=np.float64, buffer=self.shm.buf)
+
+    def close(self):
+        # the array is a view on the block, it has to be released before the block is closed
+        self.array = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,84 @@
+import itertools
+import multiprocessing as mp
+import time
+
+from Framework.ResultsStore import ResultsStore
+from Simulations.GlobalConfig import *
+
+# function and constants of the sweep in a worker process, set once per worker by init_worker
+worker_run = None
+worker_constants = None
+
+
+def init_worker(run, constants):
+    global worker_run, worker_constants
+    worker_run = run
+    worker_constants = constants
+
+
+def execute(task):
+    replicate, point = task
+    return replicate, point, worker_run(replicate, **point, **worker_constants)
+
+
+class SweepRunner:
+    """Runs a simulation for every point of a parameter grid and every replicate (Monte-Carlo run).
+
+    run(replicate, **point, **constants) simulates one cell and returns its tables (see ResultsStore.append), e.g.
+    grid = {'payload_size': [12, 30], 'sigma': [0, 7.8]} gives 4 points, each run `replicates` times.
+    The cells are handed out in chunks to a process pool (imap_unordered): an idle worker takes the next chunk, so fast
+    and slow cells balance out over the workers. The constants are sent once to every worker instead of with every
+    cell. Every cell is appended to the store as soon as it is done, cells already in the store are skipped.
+    """
+
+    def __init__(self, run, grid: dict, replicates: int, store: ResultsStore, constants: dict = None,
+                 processes=SWEEP_PROCESSES, chunksize=None):
+        self.run_cell = run
+        self.grid = grid
+        self.replicates = replicates
+        self.store = store
+        self.constants = dict() if constants is None else constants
+        if processes is None:
+            processes = mp.cpu_count()
+        self.processes = processes
+        self.chunksize = chunksize
+
+    @staticmethod
+    def key(replicate, point) -> dict:
+        return dict(simulation=replicate, **point)
+
+    def tasks(self) -> list:
+        # replicate by replicate, so the first replicates of all points are done first
+        names = list(self.grid.keys())
+        points = [dict(zip(names, values)) for values in itertools.product(*self.grid.values())]
+        return [(replicate, point) for replicate in range(self.replicates) for point in points
+                if not self.store.has(SweepRunner.key(replicate, point))]
+
+    def run(self) -> int:
+        """Runs the cells not in the store yet, returns the number of cells run"""
+        tasks = self.tasks()
+        total = len(tasks)
+        print('{} cells to run ({} in the store)'.format(
+            total, self.replicates * len(list(itertools.product(*self.grid.values()))) - total))
+        if total == 0:
+            return 0
+        start = time.time()
+        if self.processes == 0:
+            # in this process, e.g. for debugging
+            init_worker(self.run_cell, self.constants)
+            self.collect(map(execute, tasks), total, start)
+        else:
+            chunksize = self.chunksize
+            if chunksize is None:
+                chunksize = max(1, total // (4 * self.processes))
+            with mp.Pool(self.processes, initializer=init_worker, initargs=(self.run_cell, self.constants)) as pool:
+                self.collect(pool.imap_unordered(execute, tasks, chunksize=chunksize), total, start)
+        return total
+
+    def collect(self, results, total, start):
+        for done, (replicate, point, tables) in enumerate(results, start=1):
+            self.store.append(SweepRunner.key(replicate, point), **tables)
+            elapsed = time.time() - start
+            rate = done / elapsed
+            print('Simulation #{} {} done: {}/{} cells, {:.2f} cells/s, ETA {:.0f} s'.format(
+                replicate, point, done, total, rate, (total - done) / rate))
@@ -0,0 +1,279 @@
+import os
+from glob import glob
+from enum import Enum
+
+import numpy as np
+
+from Simulations.GlobalConfig import *
+
+
+def _number(value) -> float:
+    # node states are stored as their enum value in the numeric buffers
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+class OffSeries:
+    """Nothing is tracked"""
+    __slots__ = ['fields']
+
+    def __init__(self, fields):
+        self.fields = fields
+
+    def append(self, time, *values):
+        pass
+
+    def __len__(self):
+        return 0
+
+    def __getitem__(self, field):
+        return np.empty(0)
+
+
+class AggregateSeries:
+    """Only the number of samples and the sum, min, max and last value per field are tracked"""
+    __slots__ = ['fields', 'count', 'first_time', 'last_time', 'sum', 'min', 'max', 'last']
+
+    def __init__(self, fields):
+        self.fields = fields
+        self.count = 0
+        self.first_time = None
+        self.last_time = None
+        self.sum = [0] * len(fields)
+        self.min = [np.inf] * len(fields)
+        self.max = [-np.inf] * len(fields)
+        self.last = [None] * len(fields)
+
+    def append(self, time, *values):
+        if self.count == 0:
+            self.first_time = time
+        self.count += 1
+        self.last_time = time
+        for idx, value in enumerate(values):
+            value = _number(value)
+            self.sum[idx] += value
+            if value < self.min[idx]:
+                self.min[idx] = value
+            if value > self.max[idx]:
+                self.max[idx] = value
+            self.last[idx] = value
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, field):
+        # no history is kept
+        return np.empty(0)
+
+    def summary(self) -> dict:
+        summary = {'count': self.count, 'first_time': self.first_time, 'last_time': self.last_time}
+        for idx, field in enumerate(self.fields):
+            summary[field] = {'sum': self.sum[idx], 'min': self.min[idx], 'max': self.max[idx],
+                              'last': self.last[idx]}
+        return summary
+
+
+class RingSeries:
+    """The last `size` samples are kept in a preallocated buffer"""
+    __slots__ = ['fields', 'buffer', 'count']
+
+    def __init__(self, fields, size):
+        self.fields = fields
+        # column 0 is the time
+        self.buffer = np.zeros((size, len(fields) + 1))
+        self.count = 0
+
+    def append(self, time, *values):
+        row = self.buffer[self.count % len(self.buffer)]
+        row[0] = time
+        for idx, value in enumerate(values):
+            row[idx + 1] = _number(value)
+        self.count += 1
+
+    def __len__(self):
+        return min(self.count, len(self.buffer))
+
+    def __getitem__(self, field):
+        column = 0 if field == 'time' else self.fields.index(field) + 1
+        size = len(self.buffer)
+        if self.count <= size:
+            return self.buffer[:self.count, column].copy()
+        start = self.count % size
+        return np.concatenate((self.buffer[start:, column], self.buffer[:start, column]))
+
+
+class MemorySeries:
+    """The full history is kept in memory as lists"""
+    __slots__ = ['fields', 'values']
+
+    def __init__(self, fields):
+        self.fields = fields
+        self.values = {'time': []}
+        for field in fields:
+            self.values[field] = []
+
+    def append(self, time, *values):
+        self.values['time'].append(time)
+        for field, value in zip(self.fields, values):
+            self.values[field].append(value)
+
+    def __len__(self):
+        return len(self.values['time'])
+
+    def __getitem__(self, field):
+        return self.values[field]
+
+
+class ColumnarWriter:
+    """Buffers the samples of one series name for all nodes and appends them per column to disk.
+
+    Every column of run `run` is a raw float64 file <directory>/<name>/<column>_<run>.f64 that can be read with
+    np.fromfile, the files of other runs are left untouched.
+    """
+
+    def __init__(self, directory, name, fields, buffer_size, run):
+        self.directory = os.path.join(directory, name)
+        os.makedirs(self.directory, exist_ok=True)
+        self.run = run
+        self.columns = ['owner', 'time'] + list(fields)
+        self.buffer = np.zeros((buffer_size, len(self.columns)))
+        self.num_rows = 0
+        for column in self.columns:
+            # start from an empty part
+            open(self.path(column), 'wb').close()
+
+    def path(self, column):
+        return os.path.join(self.directory, '{}_{}.f64'.format(column, self.run))
+
+    def append(self, owner, time, values):
+        row = self.buffer[self.num_rows]
+        row[0] = owner
+        row[1] = time
+        for idx, value in enumerate(values):
+            row[idx + 2] = _number(value)
+        self.num_rows += 1
+        if self.num_rows == len(self.buffer):
+            self.flush()
+
+    def flush(self):
+        if self.num_rows == 0:
+            return
+        for idx, column in enumerate(self.columns):
+            with open(self.path(column), 'ab') as f:
+                np.ascontiguousarray(self.buffer[:self.num_rows, idx]).tofile(f)
+        self.num_rows = 0
+
+    def read(self, column, owner=None) -> np.ndarray:
+        self.flush()
+        values = np.fromfile(self.path(column))
+        if owner is None:
+            return values
+        return values[np.fromfile(self.path('owner')) == owner]
+
+
+class DiskSeries:
+    """The full history is written to a ColumnarWriter shared by all nodes"""
+    __slots__ = ['fields', 'writer', 'owner', 'count']
+
+    def __init__(self, fields, writer: ColumnarWriter, owner):
+        self.fields = fields
+        self.writer = writer
+        self.owner = owner
+        self.count = 0
+
+    def append(self, time, *values):
+        self.writer.append(self.owner, time, values)
+        self.count += 1
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, field):
+        return self.writer.read(field, self.owner)
+
+
+class TrackingPolicy:
+    """Decides how the time series of nodes (power, energy, state changes) and the air interface (RSS/SNR) are kept.
+
+    off:        nothing is kept
+    aggregate:  only count, sum, min, max and last value
+    ring:       the last `ring_size` samples per series
+    memory:     the full history in memory
+    disk:       the full history written to columnar files in `directory`
+
+    With disk, every policy (i.e. every simulation, e.g. the cells run by a pool worker) claims its own run id in
+    `directory` by creating the file run_<run> exclusively and writes its own part of every series (see
+    ColumnarWriter), TrackingPolicy.read reads a column of a run. The policy has to be closed when the simulation ends
+    (see run_resumable), the buffered samples are written by close.
+    The energy per state of a node (used for all results) is always tracked exactly, independent of the policy.
+    """
+
+    MODES = ['off', 'aggregate', 'ring', 'memory', 'disk']
+
+    def __init__(self, mode=TRACKING_MODE, ring_size=TRACKING_RING_SIZE, directory=TRACKING_DIR,
+                 buffer_size=TRACKING_BUFFER_SIZE):
+        if mode not in TrackingPolicy.MODES:
+            raise ValueError('Tracking mode {} not in {}'.format(mode, TrackingPolicy.MODES))
+        if mode == 'disk' and directory is None:
+            raise ValueError('A directory is needed to track to disk')
+        self.mode = mode
+        self.ring_size = ring_size
+        if directory is not None:
+            directory = directory.format(pid=os.getpid())
+        self.directory = directory
+        self.buffer_size = buffer_size
+        self.writers = dict()
+        self.run = None
+        if mode == 'disk':
+            self.claim()
+        # one shared series per name suffices when nothing is tracked
+        self.off_series = dict()
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != 'off'
+
+    def series(self, name, fields, owner):
+        fields = tuple(fields)
+        if self.mode == 'off':
+            if name not in self.off_series:
+                self.off_series[name] = OffSeries(fields)
+            return self.off_series[name]
+        elif self.mode == 'aggregate':
+            return AggregateSeries(fields)
+        elif self.mode == 'ring':
+            return RingSeries(fields, self.ring_size)
+        elif self.mode == 'memory':
+            return MemorySeries(fields)
+        if name not in self.writers:
+            self.writers[name] = ColumnarWriter(self.directory, name, fields, self.buffer_size, self.run)
+        return DiskSeries(fields, self.writers[name], owner)
+
+    def claim(self):
+        # the next free run id, a run id taken by another process in the meantime is skipped
+        os.makedirs(self.directory, exist_ok=True)
+        self.run = max(TrackingPolicy.runs(self.directory), default=-1) + 1
+        while True:
+            try:
+                os.close(os.open(os.path.join(self.directory, 'run_{}'.format(self.run)),
+                                 os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                return
+            except FileExistsError:
+                self.run += 1
+
+    def flush(self):
+        for writer in self.writers.values():
+            writer.flush()
+
+    def close(self):
+        self.flush()
+
+    @staticmethod
+    def runs(directory) -> list:
+        # run ids claimed in `directory`, ascending
+        return sorted(int(os.path.basename(f).rsplit('_', 1)[1]) for f in glob(os.path.join(directory, 'run_*')))
+
+    @staticmethod
+    def read(directory, name, column, run) -> np.ndarray:
+        return np.fromfile(os.path.join(directory, name, '{}_{}.f64'.format(column, run)))
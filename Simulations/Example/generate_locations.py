@@ -1,27 +1,14 @@
 import os
-import pickle
 
 from Simulations.GlobalConfig import locations_file
-from Framework.Location import Location
+from Framework.Deployment import Deployment
 
 num_locations = 3
 cell_size = 100
 num_of_simulations = 1
 
-locations_per_simulation = list()
-
-
-for num_sim in range(num_of_simulations):
-    locations = list()
-    for i in range(num_locations):
-        locations.append(Location(min=0, max=cell_size, indoor=False))
-    locations_per_simulation.append(locations)
-
+# uniform in the square cell, see Deployment for the other spatial distributions (disc, clusters, grid, indoor)
+deployment = Deployment.uniform_square(num_of_simulations, num_locations, cell_size)
 
 os.makedirs(os.path.dirname(locations_file), exist_ok=True)
-with open(locations_file, 'wb') as f:
-    pickle.dump(locations_per_simulation, f)
-
-# just to test the code
-# with open('locations_10000_locations_1000_sim.pkl', 'rb') as filehandler:
-#     print(pickle.load(filehandler))
+deployment.save(locations_file)
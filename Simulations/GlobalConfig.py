@@ -22,18 +22,121 @@ path_loss_variance = 0
 MAC_IMPROVEMENT = False
 num_locations = 100
 num_of_simulations = 1
-locations_file = "locations/"+"{}_locations_{}_sim_{}_cell.pkl".format(num_locations, num_of_simulations, cell_size)
-results_file = "results/{}_{}_{}_{}_{}_propagation.p".format(num_locations, cell_size, start_sf, adr, confirmed_messages)
+# a Deployment (see generate_locations.py), the shipped Simulations/propagation/locations are converted to .npy,
+# former pickled lists of Locations (.pkl) can still be loaded
+locations_file = "locations/"+"{}_locations_{}_sim_{}_cell.npy".format(num_locations, num_of_simulations, cell_size)
+results_dir = "results/{}_{}_{}_{}_{}_propagation".format(num_locations, cell_size, start_sf, adr, confirmed_messages)
 
 ############### SIMULATION SPECIFIC PARAMETERS ###############
 
 ############### DEFAULT PARAMETERS ###############
 LOG_ENABLED = True
 MAX_DELAY_BEFORE_SLEEP_MS = 500
-PRINT_ENABLED = True
 MAX_DELAY_START_PER_NODE_MS = np.round(simulation_time / 10)
 track_changes = True
 middle = np.round(cell_size / 2)
 load_prev_simulation_results = True
 
 ############### DEFAULT PARAMETERS ###############
+
+############### FAST FORWARD ###############
+# nodes without ADR and confirmed messages only simulate their packets on air as events,
+# the energy of the other states is computed in closed form (see Node.run_fast_forward)
+FAST_FORWARD = False
+
+############### FAST FORWARD ###############
+
+############### TRACING ###############
+# structured event trace (JSON lines, see Framework/EventTrace.py), None disables tracing
+# use {pid} in the file name when running a multiprocessing pool, e.g. "trace_{pid}.jsonl"
+TRACE_FILE = None
+TRACE_LEVEL = 'INFO'  # 'INFO' or 'DEBUG' (includes the collision checks)
+TRACE_NODE_IDS = None  # e.g. [0, 5], None traces all nodes
+TRACE_EVENTS = None  # e.g. ['tx', 'rx1'], None traces all events
+TRACE_WINDOW_MS = None  # (start, end) in ms of simulated time, None traces the whole simulation
+
+############### TRACING ###############
+
+############### ML PROPAGATION MODELS ###############
+# directory to store the ML propagation models uncompressed and load them memory-mapped, None loads them in memory
+ML_MODEL_MMAP_DIR = None
+
+############### ML PROPAGATION MODELS ###############
+
+############### MEMORY MANAGEMENT ###############
+# garbage collection during a simulation (see Framework/MemoryPolicy.py)
+# 'off', 'generational' (with GC_THRESHOLDS) or 'periodic' (full collection every GC_PERIOD_MIN simulated minutes)
+GC_MODE = 'generational'
+GC_THRESHOLDS = (700, 10, 10)
+GC_PERIOD_MIN = 60
+# number of released messages kept for reuse per message class (see Framework/LoRaPacket.py), 0 disables the pools
+MESSAGE_POOL_SIZE = 1024
+
+############### MEMORY MANAGEMENT ###############
+
+############### TRACKING ###############
+# time series of the nodes (power, energy, state changes, lost packets) and of the air interface (RSS, SNR)
+# see Framework/Tracking.py, the energy per state of the nodes is always tracked exactly
+# 'off', 'aggregate', 'ring' (last TRACKING_RING_SIZE samples), 'memory' (full history) or 'disk' (full history)
+TRACKING_MODE = 'aggregate'
+TRACKING_RING_SIZE = 100
+# directory for the 'disk' mode, every simulation writes its own part of the series (see TrackingPolicy.read)
+TRACKING_DIR = None
+TRACKING_BUFFER_SIZE = 10000  # samples buffered per series name before writing to disk
+
+############### TRACKING ###############
+
+############### MULTI GATEWAY ###############
+# only gateways within this distance (m) of a node receive its packets (see Framework/MultiGatewayAirInterface.py)
+# None lets every gateway receive every packet
+MAX_GATEWAY_RANGE_M = 10000
+
+############### MULTI GATEWAY ###############
+
+############### SHARDED SIMULATION ###############
+# number of processes of the ShardedSimulation (None: one per CPU), at most one per gateway and channel
+SHARD_PROCESSES = None
+# simulated time (ms) between two checkpoints of a ShardedSimulation run with a checkpoint file
+CHECKPOINT_INTERVAL_MS = 24 * 60 * 60 * 1000
+# directory of the checkpoint files of the cells of the drivers (see run_resumable in Framework/ShardedSimulation.py),
+# e.g. results_dir + "/checkpoints". None runs the cells with simpy, a killed cell is then run again from the start.
+# Only cells without ADR and confirmed messages can be checkpointed (others raise a ValueError), they are run by the
+# sharded engine, whose results differ from the simpy results within the statistical tolerance (other random numbers).
+CHECKPOINT_DIR = None
+
+############### SHARDED SIMULATION ###############
+
+############### RANDOM STREAMS ###############
+# seed of the per node, per propagation model and set-up streams (see Framework/RandomStreams.py),
+# every replicate (Monte-Carlo run) derives its own independent streams from it
+RANDOM_SEED = 42
+# number of uniform and normal samples a stream draws at once
+RANDOM_CHUNK_SIZE = 1024
+# the same for the per node streams, kept small as every node holds its own buffers
+RANDOM_NODE_CHUNK_SIZE = 64
+
+############### RANDOM STREAMS ###############
+
+############### PACKET LOG ###############
+# directory of the per packet event log (see Framework/PacketLog.py), {pid} is replaced by the process id,
+# None disables the log. Every simulation writes its own part of the log, its rows have the run id of the part
+PACKET_LOG_DIR = None
+# rows buffered before they are appended to the log
+PACKET_LOG_BUFFER_SIZE = 65536
+# 'parquet' (needs pyarrow), 'numpy' (raw column files) or 'auto' (parquet if pyarrow is installed)
+PACKET_LOG_FORMAT = 'auto'
+
+############### PACKET LOG ###############
+
+############### RESULTS STORE ###############
+# 'parquet' (needs pyarrow), 'pickle' (a pickled DataFrame per cell) or 'auto' (parquet if pyarrow is installed),
+# see Framework/ResultsStore.py
+RESULTS_FORMAT = 'auto'
+
+############### RESULTS STORE ###############
+
+############### SWEEP ###############
+# number of processes of the SweepRunner (None: one per CPU, 0: run the cells in the main process)
+SWEEP_PROCESSES = None
+
+############### SWEEP ###############
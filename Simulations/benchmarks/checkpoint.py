@@ -0,0 +1,82 @@
+# Size of a checkpoint of the sharded simulation and the time to write and to restore it, for a growing number of
+# nodes. The run is interrupted after its first checkpoint and resumed from it, the resumed results are compared with
+# a run that was never interrupted. Run from the root of the repository:
+#   python -m Simulations.benchmarks.checkpoint
+import os
+import pickle
+import tempfile
+import time
+
+import Framework.Node
+import Framework.ShardedSimulation
+from Framework.Node import Node
+from Framework.ShardedSimulation import ShardedSimulation
+from Framework.SNRModel import SNRModel
+from Simulations.benchmarks import scenario
+
+simulation_time_ms = 6 * 60 * 60 * 1000
+checkpoint_interval_ms = 3 * 60 * 60 * 1000
+Framework.ShardedSimulation.MAX_DELAY_START_PER_NODE_MS = Framework.Node.MAX_DELAY_START_PER_NODE_MS
+
+
+class Interrupted(Exception):
+    pass
+
+
+def build(num_nodes):
+    sim_env, nodes, gateway, air_interface = scenario.build(num_nodes, adr=False, confirmed=False, seed=1)
+    return nodes, gateway, ShardedSimulation(nodes, gateway, air_interface.prop_model, SNRModel(), processes=0)
+
+
+def results(nodes, gateway, simulation):
+    return Node.get_simulation_data_frame(nodes), gateway.get_simulation_data(''), simulation.get_simulation_data('')
+
+
+def run(num_nodes, checkpoint_file):
+    nodes, gateway, simulation = build(num_nodes)
+    simulation.run(simulation_time_ms)
+    uninterrupted = results(nodes, gateway, simulation)
+
+    nodes, gateway, simulation = build(num_nodes)
+    durations = dict()
+    checkpoint = simulation.checkpoint
+
+    def checkpoint_and_stop(*args):
+        start = time.perf_counter()
+        checkpoint(*args)
+        durations['write'] = time.perf_counter() - start
+        raise Interrupted
+
+    simulation.checkpoint = checkpoint_and_stop
+    try:
+        simulation.run(simulation_time_ms, checkpoint_file=checkpoint_file, checkpoint_interval=checkpoint_interval_ms)
+    except Interrupted:
+        pass
+    size = os.path.getsize(checkpoint_file)
+    start = time.perf_counter()
+    with open(checkpoint_file, 'rb') as f:
+        pickle.load(f)
+    durations['load'] = time.perf_counter() - start
+
+    nodes, gateway, simulation = build(num_nodes)
+    restore = simulation.restore
+
+    def timed_restore(*args):
+        start = time.perf_counter()
+        restore(*args)
+        durations['restore'] = time.perf_counter() - start
+
+    simulation.restore = timed_restore
+    simulation.run(simulation_time_ms, checkpoint_file=checkpoint_file, checkpoint_interval=checkpoint_interval_ms)
+    resumed = results(nodes, gateway, simulation)
+    identical = all(a.equals(b) for a, b in zip(uninterrupted, resumed))
+    return num_nodes, size / 2 ** 20, durations['write'] * 1e3, (durations['load'] + durations['restore']) * 1e3, \
+        str(identical)
+
+
+if __name__ == '__main__':
+    print('{:>7} {:>10} {:>11} {:>13} {:>10}'.format('nodes', 'size [MB]', 'write [ms]', 'restore [ms]', 'identical'))
+    with tempfile.TemporaryDirectory() as tmp:
+        for _num_nodes in [1000, 5000, 10000]:
+            print('{:>7} {:>10.2f} {:>11.1f} {:>13.1f} {:>10}'.format(
+                *run(_num_nodes, os.path.join(tmp, 'checkpoint.pkl'))))
@@ -0,0 +1,108 @@
+# Compares the collision check of the AirInterface (indexed per channel and SF) with the former linear scan over all
+# packets in the air. Run from the root of the repository:
+#   python -m Simulations.benchmarks.collision_scaling
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+from Framework.AirInterface import AirInterface
+from Framework.CollisionIndex import CollisionIndex
+from Framework.LoRaPacket import UplinkMessage
+from Framework.LoRaParameters import LoRaParameters
+
+num_nodes_list = [100, 1000, 10000, 100000]
+period_ms = 60 * 1000  # every node sends one packet per period
+max_packets = 20000  # the replayed time span is shortened for large networks, the load in the air stays the same
+payload_size = 12
+
+
+def generate_packets(num_nodes, seed=0):
+    rng = np.random.default_rng(seed)
+    num_packets = min(num_nodes * 5, max_packets)
+    duration_ms = num_packets * period_ms / num_nodes
+    node_ids = rng.integers(0, num_nodes, num_packets)
+    starts = np.sort(rng.uniform(0, duration_ms, num_packets))
+    sfs = rng.choice(LoRaParameters.SPREADING_FACTORS, num_packets)
+    channels = rng.choice(LoRaParameters.DEFAULT_CHANNELS, num_packets)
+    rss = rng.uniform(-140, -80, num_packets)
+    packets = []
+    for node_id, start, sf, channel, _rss in zip(node_ids, starts, sfs, channels, rss):
+        lora_param = LoRaParameters(freq=int(channel), sf=int(sf), bw=125, cr=5, crc_enabled=1, de_enabled=0,
+                                    header_implicit_mode=0)
+        node = SimpleNamespace(id=int(node_id), lora_param=lora_param, rng=rng)
+        packet = UplinkMessage(node=node, start_on_air=float(start), payload_size=payload_size, id=0)
+        packet.lora_param.freq = int(channel)
+        packet.rss = float(_rss)
+        packets.append(packet)
+    return packets
+
+
+def events(packets):
+    # (time, is_start, index) sorted in time, a packet ends before another one starts at the same time
+    ev = [(p.start_on_air, 1, i) for i, p in enumerate(packets)]
+    ev += [(p.start_on_air + p.my_time_on_air(), 0, i) for i, p in enumerate(packets)]
+    ev.sort()
+    return ev
+
+
+def linear_scan(packet, packages_in_air):
+    if packet.collided:
+        return True
+    for other in packages_in_air:
+        if other.node.id != packet.node.id:
+            if AirInterface.frequency_collision(packet, other):
+                if AirInterface.sf_collision(packet, other):
+                    time_collided_nodes = AirInterface.timing_collision(packet, other)
+                    if time_collided_nodes is not None:
+                        AirInterface.power_collision(packet, other, time_collided_nodes)
+    return packet.collided
+
+
+def replay_linear(packets, ev):
+    in_air = list()
+    collided = np.zeros(len(packets), dtype=bool)
+    for _, is_start, i in ev:
+        if is_start:
+            in_air.append(packets[i])
+        else:
+            collided[i] = linear_scan(packets[i], in_air)
+            in_air.remove(packets[i])
+    return collided
+
+
+def replay_indexed(packets, ev):
+    air_interface = AirInterface.__new__(AirInterface)
+    air_interface.packages_in_air = CollisionIndex()
+    collided = np.zeros(len(packets), dtype=bool)
+    for _, is_start, i in ev:
+        if is_start:
+            air_interface.packages_in_air.add(packets[i])
+        else:
+            collided[i] = air_interface.collision(packets[i])
+            air_interface.packages_in_air.remove(packets[i])
+    return collided
+
+
+if __name__ == '__main__':
+    print('{:>8} {:>9} {:>14} {:>14} {:>9} {:>10}'.format('nodes', 'packets', 'linear [us/p]', 'indexed [us/p]',
+                                                          'speed-up', 'identical'))
+    for num_nodes in num_nodes_list:
+        packets = generate_packets(num_nodes)
+        ev = events(packets)
+
+        start = time.perf_counter()
+        collided_linear = replay_linear(packets, ev)
+        t_linear = time.perf_counter() - start
+
+        for p in packets:
+            p.collided = False
+
+        start = time.perf_counter()
+        collided_indexed = replay_indexed(packets, ev)
+        t_indexed = time.perf_counter() - start
+
+        num_packets = len(packets)
+        print('{:>8} {:>9} {:>14.2f} {:>14.2f} {:>9.1f} {:>10}'.format(
+            num_nodes, num_packets, t_linear / num_packets * 1e6, t_indexed / num_packets * 1e6, t_linear / t_indexed,
+            str(np.array_equal(collided_linear, collided_indexed))))
@@ -0,0 +1,51 @@
+# Time to generate and save the locations of a deployment, creating Location objects one at a time and pickling the
+# lists (former generate_locations.py) and with the vectorized Deployment saved as a .npy file, the file size and the
+# time to load the file and get the Locations of the first replicate. The Location objects of 10 replicates of a million
+# nodes do not fit in a few GB of memory, hence the pickled lists stop at 100k nodes.
+# Run from the root of the repository:
+#   python -m Simulations.benchmarks.deployment
+import os
+import pickle
+import tempfile
+import time
+
+from Framework.Deployment import Deployment
+from Framework.Location import Location
+
+num_replicates = 10
+cell_size = 10000
+
+
+def pickled_lists(file, num_nodes):
+    start = time.perf_counter()
+    locations_per_simulation = [[Location(min=0, max=cell_size, indoor=False) for _ in range(num_nodes)]
+                                for _ in range(num_replicates)]
+    with open(file, 'wb') as f:
+        pickle.dump(locations_per_simulation, f)
+    generate = time.perf_counter() - start
+    start = time.perf_counter()
+    with open(file, 'rb') as f:
+        pickle.load(f)[0]
+    return generate, os.path.getsize(file), time.perf_counter() - start
+
+
+def deployment(file, num_nodes):
+    start = time.perf_counter()
+    Deployment.uniform_square(num_replicates, num_nodes, cell_size).save(file)
+    generate = time.perf_counter() - start
+    start = time.perf_counter()
+    list(Deployment.load(file)[0])
+    return generate, os.path.getsize(file), time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    print('{:>8} {:>14} {:>15} {:>10} {:>10}'.format('nodes', 'storage', 'generate [s]', 'size [MB]', 'load [s]'))
+    with tempfile.TemporaryDirectory() as tmp:
+        for _num_nodes in [10000, 100000, 1000000]:
+            generators = [('deployment', deployment, '.npy')]
+            if _num_nodes <= 100000:
+                generators.insert(0, ('pickled lists', pickled_lists, '.pkl'))
+            for name, generator, extension in generators:
+                _generate, _size, _load = generator(os.path.join(tmp, 'locations' + extension), _num_nodes)
+                print('{:>8} {:>14} {:>15.3f} {:>10.1f} {:>10.3f}'.format(_num_nodes, name, _generate,
+                                                                          _size / 2 ** 20, _load))
@@ -0,0 +1,37 @@
+# Wall-clock time of the full node state machine and of the fast-forward engine (adr=False, unconfirmed messages),
+# and the largest relative difference of the per node results. Run from the root of the repository:
+#   python -m Simulations.benchmarks.fast_forward
+import time
+
+import numpy as np
+
+import Framework.Node
+from Framework.Node import Node
+from Simulations.benchmarks import scenario
+
+num_nodes = 1000
+simulation_time_ms = 6 * 60 * 60 * 1000
+sleep_time_ms = 10 * 60 * 1000
+
+
+def run(fast_forward):
+    Framework.Node.FAST_FORWARD = fast_forward
+    start = time.perf_counter()
+    sim_env, nodes, gateway, air_interface = scenario.build(num_nodes, sleep_time_ms=sleep_time_ms, adr=False,
+                                                           confirmed=False)
+    sim_env.run(until=simulation_time_ms)
+    wall_clock = time.perf_counter() - start
+    return wall_clock, Node.get_simulation_data_frame(nodes)
+
+
+if __name__ == '__main__':
+    reference_time, reference = run(False)
+    fast_time, fast = run(True)
+    print('{:>14} {:>12}'.format('engine', 'time [s]'))
+    print('{:>14} {:>12.2f}'.format('state machine', reference_time))
+    print('{:>14} {:>12.2f}'.format('fast-forward', fast_time))
+    print('speed-up {:.1f}x'.format(reference_time / fast_time))
+    for column in reference.columns:
+        scale = np.maximum(np.abs(reference[column].values), 1e-12)
+        diff = np.max(np.abs(fast[column].values - reference[column].values) / scale)
+        print('{:>22} max relative difference {:.2e}'.format(column, diff))
@@ -0,0 +1,51 @@
+# Received uplinks per second through Gateway.packet_received in isolation (no air interface, no node processes).
+# Run from the root of the repository:
+#   python -m Simulations.benchmarks.gateway_throughput
+import time
+
+import numpy as np
+import simpy
+
+from Framework.Gateway import Gateway
+from Framework.LoRaPacket import UplinkMessage
+from Framework.Location import Location
+from Simulations.benchmarks import scenario
+
+num_nodes = 1000
+num_uplinks = 200000
+# uplinks received per ms of simulated time, the duty cycle of the gateway blocks most downlinks
+uplinks_per_ms = 1
+
+
+def uplinks(nodes, n):
+    packets = []
+    for idx in range(n):
+        node = nodes[idx % len(nodes)]
+        packet = UplinkMessage(node=node, start_on_air=0, payload_size=12, confirmed_message=False, id=idx)
+        packet.rss = np.random.uniform(-125, -60)
+        packet.snr = np.random.uniform(-5, 15)
+        packets.append(packet)
+    return packets
+
+
+def run(adr):
+    _, nodes, _, _ = scenario.build(num_nodes, adr=adr, confirmed=False)
+    packets = uplinks(nodes, num_uplinks)
+    sim_env = simpy.Environment()
+    gateway = Gateway(sim_env, Location(x=500, y=500, indoor=False))
+    elapsed = 0
+    for start in range(0, num_uplinks, uplinks_per_ms):
+        sim_env.run(until=sim_env.now + 1)
+        t = time.perf_counter()
+        for packet in packets[start:start + uplinks_per_ms]:
+            gateway.packet_received(packet.node, packet, sim_env.now).release()
+        elapsed += time.perf_counter() - t
+    return num_uplinks / elapsed, gateway
+
+
+if __name__ == '__main__':
+    print('{:>6} {:>14} {:>10} {:>10}'.format('ADR', 'uplinks/s', 'received', 'DL lost'))
+    for _adr in [False, True]:
+        throughput, _gateway = run(_adr)
+        print('{:>6} {:>14.0f} {:>10} {:>10}'.format(str(_adr), throughput, _gateway.num_of_packet_received,
+                                                     _gateway.dl_not_schedulable))
@@ -0,0 +1,30 @@
+# Wall-clock time and peak RSS of a simulation for every garbage collection mode of the MemoryPolicy.
+# Every mode runs in a fresh process. Run from the root of the repository:
+#   python -m Simulations.benchmarks.gc_modes
+import multiprocessing as mp
+import resource
+import time
+
+from Framework.MemoryPolicy import MemoryPolicy
+
+num_nodes = 1000
+simulation_time_ms = 3 * 60 * 60 * 1000
+
+
+def run(mode):
+    from Simulations.benchmarks import scenario
+
+    start = time.perf_counter()
+    sim_env, nodes, gateway, air_interface = scenario.build(num_nodes,
+                                                           memory_policy=MemoryPolicy(mode=mode, period_min=60))
+    sim_env.run(until=simulation_time_ms)
+    wall_clock = time.perf_counter() - start
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # ru_maxrss is in kB on Linux
+    return mode, wall_clock, peak_rss_mb, air_interface.num_of_packets_send
+
+
+if __name__ == '__main__':
+    print('{:>14} {:>12} {:>15} {:>10}'.format('mode', 'time [s]', 'peak RSS [MB]', 'packets'))
+    for _mode in MemoryPolicy.MODES:
+        with mp.Pool(1, maxtasksperchild=1) as pool:
+            print('{:>14} {:>12.2f} {:>15.1f} {:>10}'.format(*pool.apply(run, (_mode,))))
@@ -0,0 +1,44 @@
+# Time to compute the node-gateway distances of a deployment, calling Location.distance per node and gateway (former
+# PathLossCache and ShardedSimulation) and with the vectorized Geometry, and the time to update the row of one moved
+# node. Run from the root of the repository:
+#   python -m Simulations.benchmarks.geometry
+import time
+
+import numpy as np
+
+from Framework.Deployment import Deployment
+from Framework.Geometry import Geometry
+from Framework.Location import Location
+
+cell_size = 10000
+num_moves = 1000
+
+
+def locations(num_nodes, num_gateways):
+    # Location objects, as the locations of the nodes and gateways of a simulation
+    nodes = list(Deployment.uniform_square(1, num_nodes, cell_size, alt_min=1, alt_max=10, seed=1)[0])
+    gateways = list(Deployment.grid(1, num_gateways, cell_size, alt_min=15, alt_max=30, seed=2)[0])
+    return nodes, gateways
+
+
+if __name__ == '__main__':
+    print('{:>8} {:>9} {:>14} {:>13} {:>9} {:>10}'.format('nodes', 'gateways', 'per pair [s]', 'geometry [s]',
+                                                          'equal', 'move [us]'))
+    for _num_nodes, _num_gateways in [(10000, 1), (100000, 1), (10000, 16), (100000, 16)]:
+        _nodes, _gateways = locations(_num_nodes, _num_gateways)
+        start = time.perf_counter()
+        per_pair = np.array([[Location.distance(node, gateway) for gateway in _gateways] for node in _nodes])
+        per_pair_duration = time.perf_counter() - start
+        start = time.perf_counter()
+        geometry = Geometry.of(_nodes, _gateways)
+        geometry.distance_3d
+        geometry_duration = time.perf_counter() - start
+        rng = np.random.default_rng(3)
+        start = time.perf_counter()
+        for node_id in rng.integers(0, _num_nodes, num_moves):
+            geometry.move(node_id, Location(x=rng.uniform(0, cell_size), y=rng.uniform(0, cell_size), indoor=False))
+        move_duration = time.perf_counter() - start
+        print('{:>8} {:>9} {:>14.3f} {:>13.3f} {:>9} {:>10.1f}'.format(
+            _num_nodes, _num_gateways, per_pair_duration, geometry_duration,
+            str(np.array_equal(per_pair, Geometry.of(_nodes, _gateways).distance_2d)),
+            move_duration / num_moves * 1e6))
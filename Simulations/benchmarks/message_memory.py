@@ -0,0 +1,32 @@
+# Memory held at the end of a simulation and number of UplinkMessage objects alive, for a growing simulated time.
+# The cell is large, so many uplinks are too weak for the gateway. Every run is done in a fresh process.
+# Run from the root of the repository:
+#   python -m Simulations.benchmarks.message_memory
+import gc
+import multiprocessing as mp
+import tracemalloc
+
+num_nodes = 200
+cell_size = 8000
+day_ms = 24 * 60 * 60 * 1000
+
+
+def run(days):
+    from Framework.LoRaPacket import UplinkMessage
+    from Simulations.benchmarks import scenario
+
+    tracemalloc.start()
+    sim_env, nodes, gateway, air_interface = scenario.build(num_nodes, cell_size=cell_size, adr=False, confirmed=False)
+    sim_env.run(until=days * day_ms)
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    alive = sum(1 for obj in gc.get_objects() if isinstance(obj, UplinkMessage))
+    return days, air_interface.num_of_packets_send, gateway.num_of_weak_packets, current / 2 ** 20, peak / 2 ** 20, alive
+
+
+if __name__ == '__main__':
+    print('{:>5} {:>9} {:>7} {:>13} {:>10} {:>15}'.format('days', 'packets', 'weak', 'current [MB]', 'peak [MB]',
+                                                         'UplinkMessages'))
+    for _days in [1, 2, 4]:
+        with mp.Pool(1, maxtasksperchild=1) as pool:
+            print('{:>5} {:>9} {:>7} {:>13.1f} {:>10.1f} {:>15}'.format(*pool.apply(run, (_days,))))
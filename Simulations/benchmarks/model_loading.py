@@ -0,0 +1,78 @@
+# Start-up time and per-worker memory of the ML propagation models, loaded per use (as the models did before the
+# registry in Framework/ML_Propagation_Models) and through the registry. Run from the root of the repository:
+#   python -m Simulations.benchmarks.model_loading
+import multiprocessing as mp
+import os
+import time
+import zipfile
+
+import joblib
+import numpy as np
+
+from Framework import ML_Propagation_Models
+from Framework import PropagationModel
+
+num_iterations = 10  # e.g. Monte-Carlo iterations, each creating the model again
+num_workers = 4
+d = np.linspace(250, 10000, 1000)
+alt = np.full(d.shape, 60)
+
+
+def load_per_use(name):
+    # former behaviour of the constructors: unzip and unpickle the model and the scaler
+    zf = zipfile.ZipFile(os.path.join(ML_Propagation_Models.MODEL_DIR, name + '.zip'))
+    loaded_model = joblib.load(zf.open(name + '.sav'))
+    scaler = joblib.load(os.path.join(ML_Propagation_Models.MODEL_DIR, ML_Propagation_Models.SCALER + '.sav'))
+    return loaded_model, scaler
+
+
+def memory_mb():
+    # resident and private (not shared with the parent) memory of this process
+    values = dict()
+    with open('/proc/self/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if parts[0] in ['Rss:', 'Private_Clean:', 'Private_Dirty:']:
+                values[parts[0]] = int(parts[1]) / 1024
+    return values['Rss:'], values['Private_Clean:'] + values['Private_Dirty:']
+
+
+def worker_per_use(name):
+    loaded_model, scaler = load_per_use(name)
+    features = np.column_stack([d / 1000, np.full(d.shape, 10), alt])
+    loaded_model.predict(scaler.transform(features))
+    return memory_mb()
+
+
+def worker_registry(model):
+    model.path_loss_batch(d, alt)
+    return memory_mb()
+
+
+def report(label, results):
+    rss = np.mean([r[0] for r in results])
+    private = np.mean([r[1] for r in results])
+    print('{:>30} {:>12.1f} {:>16.1f}'.format(label, rss, private))
+
+
+if __name__ == '__main__':
+    mp.set_start_method('fork')
+    models = {'mclab_tree': PropagationModel.DecisionTree, 'mclab_lasso': PropagationModel.Lasso}
+    for name, model_class in models.items():
+        print('----- {} -----'.format(name))
+        start = time.perf_counter()
+        for _ in range(num_iterations):
+            load_per_use(name)
+        print('start-up per use: {:.3f} s for {} iterations'.format(time.perf_counter() - start, num_iterations))
+        start = time.perf_counter()
+        for _ in range(num_iterations):
+            model_class().path_loss_batch(d[:1], alt[:1])
+        print('start-up registry: {:.3f} s for {} iterations'.format(time.perf_counter() - start, num_iterations))
+
+        print('{:>30} {:>12} {:>16}'.format('', 'RSS [MB]', 'private [MB]'))
+        with mp.Pool(num_workers) as pool:
+            report('workers load per use', pool.map(worker_per_use, [name] * num_workers))
+        model = model_class()
+        model.preload()
+        with mp.Pool(num_workers) as pool:
+            report('workers inherit registry', pool.map(worker_registry, [model] * num_workers))
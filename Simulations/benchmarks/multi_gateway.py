@@ -0,0 +1,96 @@
+# Multi-gateway air interface: equivalence with the single gateway AirInterface, and the wall-clock time per packet
+# for a growing grid of gateways (same node and gateway density) with and without the gateway index.
+# Run from the root of the repository:
+#   python -m Simulations.benchmarks.multi_gateway
+import time
+
+import numpy as np
+import simpy
+
+from Framework import PropagationModel
+from Framework.EnergyProfile import EnergyProfile
+from Framework.Gateway import Gateway
+from Framework.LoRaParameters import LoRaParameters
+from Framework.Location import Location
+from Framework.MultiGatewayAirInterface import MultiGatewayAirInterface
+from Framework.NetworkServer import NetworkServer
+from Framework.Node import Node
+from Framework.SNRModel import SNRModel
+from Simulations.benchmarks import scenario
+
+gateway_spacing = 2000
+max_range = 3000
+nodes_per_gateway = 100
+sleep_time_ms = 10 * 60 * 1000
+simulation_time_ms = 60 * 60 * 1000
+
+
+def build(num_gateways_per_side, max_range, seed=0, adr=True):
+    np.random.seed(seed)
+    sim_env = simpy.Environment()
+    side = num_gateways_per_side * gateway_spacing
+    gateways = [Gateway(sim_env, Location(x=(i + 0.5) * gateway_spacing, y=(j + 0.5) * gateway_spacing, indoor=False))
+                for i in range(num_gateways_per_side) for j in range(num_gateways_per_side)]
+    air_interface = MultiGatewayAirInterface(gateways, PropagationModel.LogShadow(std=7.8), SNRModel(), sim_env,
+                                             max_range=max_range)
+    network_server = NetworkServer(gateways)
+    nodes = []
+    for node_id in range(nodes_per_gateway * len(gateways)):
+        location = Location(x=np.random.uniform(0, side), y=np.random.uniform(0, side),
+                            alt=np.random.uniform(45, 90), indoor=False)
+        lora_param = LoRaParameters(freq=np.random.choice(LoRaParameters.DEFAULT_CHANNELS),
+                                    sf=np.random.choice(LoRaParameters.SPREADING_FACTORS),
+                                    bw=125, cr=5, crc_enabled=1, de_enabled=0, header_implicit_mode=0, tp=14)
+        node = Node(node_id, EnergyProfile(5.7e-3, 15, scenario.tx_power_mW, rx_power=scenario.rx_measurements),
+                    lora_param, sleep_time=sleep_time_ms, process_time=5, adr=adr, location=location,
+                    base_station=network_server, env=sim_env, payload_size=12, air_interface=air_interface,
+                    confirmed_messages=False)
+        nodes.append(node)
+        sim_env.process(node.run())
+    return sim_env, nodes, network_server, air_interface
+
+
+def equivalence(num_nodes=300):
+    # one gateway: the multi-gateway air interface and network server give the same results as the AirInterface
+    sim_env, nodes, gateway, air_interface = scenario.build(num_nodes, confirmed=False, seed=1)
+    sim_env.run(until=simulation_time_ms)
+    single = Node.get_simulation_data_frame(nodes).sum()
+
+    np.random.seed(1)
+    sim_env = simpy.Environment()
+    gateway = Gateway(sim_env, Location(x=500, y=500, indoor=False))
+    multi_air_interface = MultiGatewayAirInterface([gateway], PropagationModel.LogShadow(std=7.8), SNRModel(),
+                                                   sim_env, max_range=None)
+    network_server = NetworkServer([gateway])
+    nodes = []
+    for node_id in range(num_nodes):
+        location = Location(x=np.random.uniform(0, 1000), y=np.random.uniform(0, 1000),
+                            alt=np.random.uniform(45, 90), indoor=False)
+        lora_param = LoRaParameters(freq=np.random.choice(LoRaParameters.DEFAULT_CHANNELS),
+                                    sf=np.random.choice(LoRaParameters.SPREADING_FACTORS),
+                                    bw=125, cr=5, crc_enabled=1, de_enabled=0, header_implicit_mode=0, tp=14)
+        node = Node(node_id, EnergyProfile(5.7e-3, 15, scenario.tx_power_mW, rx_power=scenario.rx_measurements),
+                    lora_param, sleep_time=10 * 60 * 1000, process_time=5, adr=True, location=location,
+                    base_station=network_server, env=sim_env, payload_size=12, air_interface=multi_air_interface,
+                    confirmed_messages=False)
+        nodes.append(node)
+        sim_env.process(node.run())
+    sim_env.run(until=simulation_time_ms)
+    multi = Node.get_simulation_data_frame(nodes).sum()
+    return single.equals(multi)
+
+
+if __name__ == '__main__':
+    print('single gateway equivalent: {}'.format(equivalence()))
+    print('{:>9} {:>8} {:>10} {:>22} {:>22}'.format('gateways', 'nodes', 'packets', 'indexed [us/packet]',
+                                                   'all gateways [us/packet]'))
+    for _side in [1, 2, 4, 6]:
+        results = []
+        for _max_range in [max_range, None]:
+            start = time.perf_counter()
+            _sim_env, _nodes, _network_server, _air_interface = build(_side, _max_range)
+            _sim_env.run(until=simulation_time_ms)
+            results.append(((time.perf_counter() - start) / _air_interface.num_of_packets_send * 1e6,
+                            _air_interface.num_of_packets_send))
+        print('{:>9} {:>8} {:>10} {:>22.1f} {:>22.1f}'.format(_side ** 2, len(_nodes), results[0][1], results[0][0],
+                                                               results[1][0]))
@@ -0,0 +1,45 @@
+# Time to post-process the node counters of a simulation, building a Series per node and concatenating the one-row
+# frames (former Node.get_simulation_data_frame) and reading the counters in bulk with NodeStatistics, and whether
+# the sums of both are equal (bit-identical floats, see also tests/test_node_statistics.py).
+# Run from the root of the repository:
+#   python -m Simulations.benchmarks.node_statistics
+import time
+
+import numpy as np
+import pandas as pd
+
+import Framework.Node
+from Framework.Node import Node
+from Framework.NodeStatistics import NodeStatistics
+from Simulations.benchmarks import scenario
+
+simulation_time_ms = 60 * 60 * 1000
+
+
+def per_node_frames(nodes):
+    return pd.concat([node.get_simulation_data().to_frame().T for node in nodes], ignore_index=True).sum(axis=0)
+
+
+def bulk(nodes):
+    return Node.get_mean_simulation_data_frame(nodes, name=0)
+
+
+def energy_per_bit_stats(nodes):
+    return NodeStatistics(nodes).energy_per_bit_stats()
+
+
+if __name__ == '__main__':
+    Framework.Node.FAST_FORWARD = True
+    print('{:>7} {:>22} {:>10} {:>24} {:>7}'.format('nodes', 'per node frames [ms]', 'bulk [ms]',
+                                                   'energy/bit stats [ms]', 'equal'))
+    for num_nodes in [1000, 5000, 10000]:
+        sim_env, nodes, gateway, air_interface = scenario.build(num_nodes, adr=False, confirmed=False)
+        sim_env.run(until=simulation_time_ms)
+        durations = []
+        for f in [per_node_frames, bulk, energy_per_bit_stats]:
+            start = time.perf_counter()
+            f(nodes)
+            durations.append((time.perf_counter() - start) * 1e3)
+        equal = np.array_equal(NodeStatistics(nodes).sum().to_numpy(dtype=np.float64),
+                               per_node_frames(nodes).to_numpy(dtype=np.float64))
+        print('{:>7} {:>22.1f} {:>10.1f} {:>24.1f} {:>7}'.format(num_nodes, *durations, str(equal)))
@@ -0,0 +1,77 @@
+# Time per packet of the random draws and of the channel choice on the packet creation path, with the global np.random
+# (one scalar call per draw) and with the buffered random streams of a node and a propagation model, and the number of
+# packets constructed per second. Run from the root of the repository:
+#   python -m Simulations.benchmarks.packet_construction
+import timeit
+
+import numpy as np
+
+from Framework.LoRaPacket import UplinkMessage
+from Framework.LoRaParameters import LoRaParameters
+from Framework.RandomStreams import RandomStreams
+from Simulations.GlobalConfig import MAX_DELAY_BEFORE_SLEEP_MS
+from Simulations.benchmarks import scenario
+
+num_packets = 200000
+
+
+if __name__ == '__main__':
+    sim_env, nodes, gateway, air_interface = scenario.build(100, adr=False, confirmed=False)
+    node = nodes[0]
+    node.population.time_off[node.index] = np.random.uniform(0, 1000, len(LoRaParameters.CHANNELS))
+    streams = RandomStreams()
+    node_stream = streams.node(node.id)
+    model_stream = streams.model('LogShadow')
+
+    def channel_global():
+        # random channel of every new packet (overwritten by the node when it sends the packet)
+        for _ in range(num_packets):
+            np.random.choice(LoRaParameters.DEFAULT_CHANNELS)
+
+    def channel_lookup():
+        for _ in range(num_packets):
+            min(node.time_off, key=node.time_off.get)
+
+    def channel_best():
+        for _ in range(num_packets):
+            node.best_channel()
+
+    def jitter_global():
+        for _ in range(num_packets):
+            np.random.randint(0, MAX_DELAY_BEFORE_SLEEP_MS)
+
+    def jitter_stream():
+        for _ in range(num_packets):
+            node_stream.randint(0, MAX_DELAY_BEFORE_SLEEP_MS)
+
+    def shadowing_global():
+        for _ in range(num_packets):
+            np.random.normal(128.95, 7.8)
+
+    def shadowing_stream():
+        for _ in range(num_packets):
+            model_stream.normal(128.95, 7.8)
+
+    def construct():
+        for idx in range(num_packets):
+            UplinkMessage(node=node, start_on_air=0, payload_size=12, confirmed_message=False, id=idx)
+
+    def time_per_packet(f):
+        return min(timeit.repeat(f, number=1, repeat=3)) / num_packets * 1e9
+
+    results = {}
+    print('{:>34} {:>18}'.format('step', 'time/packet [ns]'))
+    for name, f in [('random channel, np.random (removed)', channel_global),
+                    ('lowest time off, min over the row', channel_lookup),
+                    ('lowest time off, best_channel', channel_best),
+                    ('start jitter, np.random', jitter_global), ('start jitter, node stream', jitter_stream),
+                    ('shadowing, np.random', shadowing_global), ('shadowing, model stream', shadowing_stream),
+                    ('UplinkMessage()', construct)]:
+        results[name] = time_per_packet(f)
+        print('{:>34} {:>18.1f}'.format(name, results[name]))
+
+    before = sum(results[name] for name in ['random channel, np.random (removed)', 'lowest time off, min over the row',
+                                            'start jitter, np.random', 'shadowing, np.random', 'UplinkMessage()'])
+    after = sum(results[name] for name in ['lowest time off, best_channel', 'start jitter, node stream',
+                                           'shadowing, model stream', 'UplinkMessage()'])
+    print('packets per second: {:.0f} before, {:.0f} after'.format(1e9 / before, 1e9 / after))
@@ -0,0 +1,50 @@
+# Wall-clock time of a simulation without and with the per packet event log (every available format), the size of the
+# log and the time to read it back completely and with a filter. Run from the root of the repository:
+#   python -m Simulations.benchmarks.packet_log
+import os
+import tempfile
+import time
+
+import Framework.Node
+from Framework import PacketLog as packet_log_module
+from Framework.PacketLog import PacketLog
+from Simulations.benchmarks import scenario
+
+num_nodes = 1000
+simulation_time_ms = 6 * 60 * 60 * 1000
+
+
+def run(log_format, directory):
+    Framework.Node.FAST_FORWARD = True
+    packet_log = None
+    if log_format is not None:
+        packet_log = PacketLog(directory=directory, log_format=log_format)
+    sim_env, nodes, gateway, air_interface = scenario.build(num_nodes, adr=False, confirmed=False,
+                                                           packet_log=packet_log)
+    start = time.perf_counter()
+    sim_env.run(until=simulation_time_ms)
+    if packet_log is not None:
+        packet_log.close()
+    return time.perf_counter() - start, air_interface.num_of_packets_send
+
+
+if __name__ == '__main__':
+    formats = ['numpy'] if packet_log_module.pq is None else ['numpy', 'parquet']
+    print('{:>8} {:>10} {:>9} {:>10} {:>14} {:>16}'.format('format', 'time [s]', 'packets', 'size [MB]',
+                                                           'read all [ms]', 'read SF12 [ms]'))
+    with tempfile.TemporaryDirectory() as tmp:
+        for _format in [None] + formats:
+            _directory = os.path.join(tmp, str(_format))
+            wall_clock, packets = run(_format, _directory)
+            if _format is None:
+                print('{:>8} {:>10.2f} {:>9}'.format('no log', wall_clock, packets))
+                continue
+            size = sum(os.path.getsize(os.path.join(_directory, f)) for f in os.listdir(_directory)) / 2 ** 20
+            start = time.perf_counter()
+            PacketLog.read(_directory)
+            read_all = time.perf_counter() - start
+            start = time.perf_counter()
+            PacketLog.read(_directory, columns=['node_id', 'rss', 'snr'], filters=[('sf', '==', 12)])
+            read_filtered = time.perf_counter() - start
+            print('{:>8} {:>10.2f} {:>9} {:>10.2f} {:>14.1f} {:>16.1f}'.format(_format, wall_clock, packets, size,
+                                                                            read_all * 1e3, read_filtered * 1e3))
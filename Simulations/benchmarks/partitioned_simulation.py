@@ -0,0 +1,56 @@
+# Wall-clock time of the simpy fast-forward engine and of the sharded simulation partitioned over gateway cells
+# (serial and in parallel), for a grid of gateways with a network server (see multi_gateway.py) and nodes without ADR.
+# The parallel results are identical to the serial ones. Run from the root of the repository:
+#   python -m Simulations.benchmarks.partitioned_simulation
+import time
+
+import pandas as pd
+
+import Framework.Node
+import Framework.ShardedSimulation
+from Framework.Node import Node
+from Framework.ShardedSimulation import ShardedSimulation
+from Framework.SNRModel import SNRModel
+from Simulations.benchmarks import multi_gateway
+
+num_gateways_per_side = 6
+processes = 4
+Framework.ShardedSimulation.MAX_DELAY_START_PER_NODE_MS = Framework.Node.MAX_DELAY_START_PER_NODE_MS
+
+
+def run_simpy():
+    Framework.Node.FAST_FORWARD = True
+    sim_env, nodes, network_server, air_interface = multi_gateway.build(num_gateways_per_side, multi_gateway.max_range,
+                                                                        adr=False)
+    start = time.perf_counter()
+    sim_env.run(until=multi_gateway.simulation_time_ms)
+    wall_clock = time.perf_counter() - start
+    return wall_clock, nodes, network_server, air_interface
+
+
+def run_sharded(num_processes):
+    sim_env, nodes, network_server, air_interface = multi_gateway.build(num_gateways_per_side, multi_gateway.max_range,
+                                                                        adr=False)
+    simulation = ShardedSimulation(nodes, network_server, air_interface.air_interfaces[0].prop_model, SNRModel(),
+                                   processes=num_processes, max_range=multi_gateway.max_range)
+    start = time.perf_counter()
+    simulation.run(multi_gateway.simulation_time_ms)
+    wall_clock = time.perf_counter() - start
+    return wall_clock, nodes, network_server, simulation
+
+
+def results(nodes, network_server, air_interface) -> pd.Series:
+    return pd.concat([Node.get_simulation_data_frame(nodes).sum(), network_server.get_simulation_data(''),
+                      air_interface.get_simulation_data('')])
+
+
+if __name__ == '__main__':
+    runs = {'simpy fast-forward': run_simpy(), 'partitioned serial': run_sharded(0),
+            'partitioned {} processes'.format(processes): run_sharded(processes)}
+    print('{} gateways, {} nodes'.format(num_gateways_per_side ** 2, len(runs['partitioned serial'][1])))
+    print('{:>26} {:>10}'.format('engine', 'time [s]'))
+    for engine, run in runs.items():
+        print('{:>26} {:>10.2f}'.format(engine, run[0]))
+    table = pd.DataFrame({engine: results(*run[1:]) for engine, run in runs.items()})
+    print('parallel identical to serial: {}'.format(table.iloc[:, 1].equals(table.iloc[:, 2])))
+    print(table.to_string())
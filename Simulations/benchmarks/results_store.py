@@ -0,0 +1,66 @@
+# Time to store the results after every Monte-Carlo iteration, rewriting the pickled results dict (former behaviour of
+# the drivers) and appending the iteration to the results store, and the time to read one column back.
+# Run from the root of the repository:
+#   python -m Simulations.benchmarks.results_store
+import os
+import pickle
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from Framework import ResultsStore as results_store_module
+from Framework.ResultsStore import ResultsStore
+
+num_iterations = 100
+propagation_models = ['LogShadow', 'COST231', 'FreeSpace', 'Egli', 'OkumuraHata', 'COST231Hata']
+num_nodes = 1000
+columns = ['WaitTimeDC', 'NoDLReceived', 'UniquePackets', 'TotalPackets', 'CollidedPackets', 'RetransmittedPackets',
+           'TotalBytes', 'TotalEnergy', 'TxRxEnergy', 'EnergyValuePackets']
+
+
+def iteration_results():
+    return {model: {'data_nodes_raw': pd.DataFrame(np.random.uniform(0, 100, (num_nodes, len(columns))),
+                                                   columns=columns),
+                    'data_gateway_raw': pd.Series({'PacketsReceived': 1000, 'ULWeakPackets': 10}, name=0)}
+            for model in propagation_models}
+
+
+if __name__ == '__main__':
+    formats = ['pickle'] if results_store_module.pq is None else ['pickle', 'parquet']
+    results = [iteration_results() for _ in range(num_iterations)]
+    with tempfile.TemporaryDirectory() as tmp:
+        _results = {model: dict() for model in propagation_models}
+        durations = []
+        for n_sim, r in enumerate(results):
+            start = time.perf_counter()
+            for model in propagation_models:
+                _results[model][n_sim] = r[model]
+            pickle.dump(_results, open(os.path.join(tmp, 'results.p'), 'wb'))
+            durations.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        data = pickle.load(open(os.path.join(tmp, 'results.p'), 'rb'))
+        [data[model][n_sim]['data_gateway_raw']['PacketsReceived'] for model in propagation_models
+         for n_sim in range(num_iterations)]
+        read = time.perf_counter() - start
+        print('{:>14} {:>15} {:>15} {:>10} {:>15}'.format('storage', 'first it. [ms]', 'last it. [ms]', 'total [s]',
+                                                         'read col. [ms]'))
+        print('{:>14} {:>15.1f} {:>15.1f} {:>10.2f} {:>15.1f}'.format('pickled dict', durations[0] * 1e3,
+                                                                    durations[-1] * 1e3, sum(durations), read * 1e3))
+
+        for _format in formats:
+            store = ResultsStore(os.path.join(tmp, _format), store_format=_format)
+            durations = []
+            for n_sim, r in enumerate(results):
+                start = time.perf_counter()
+                for model in propagation_models:
+                    store.append({'simulation': n_sim, 'propagation': model}, nodes=r[model]['data_nodes_raw'],
+                                 gateway=r[model]['data_gateway_raw'])
+                durations.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            ResultsStore.read(store.directory, 'gateway', columns=['propagation', 'PacketsReceived'])
+            read = time.perf_counter() - start
+            print('{:>14} {:>15.1f} {:>15.1f} {:>10.2f} {:>15.1f}'.format('store ' + _format, durations[0] * 1e3,
+                                                                        durations[-1] * 1e3, sum(durations),
+                                                                        read * 1e3))
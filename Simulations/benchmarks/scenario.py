@@ -0,0 +1,47 @@
+# Small simulation set-up shared by the benchmarks, it mirrors Simulations/*/SimulationProcess.py
+import numpy as np
+import simpy
+
+import Framework.Node
+from Framework import PropagationModel
+from Framework.AirInterface import AirInterface
+from Framework.EnergyProfile import EnergyProfile
+from Framework.Gateway import Gateway
+from Framework.LoRaParameters import LoRaParameters
+from Framework.Location import Location
+from Framework.Node import Node
+from Framework.SNRModel import SNRModel
+
+tx_power_mW = {2: 91.8, 5: 95.9, 8: 101.6, 11: 120.8, 14: 146.5}
+rx_measurements = {'pre_mW': 8.2, 'pre_ms': 3.4, 'rx_lna_on_mW': 39,
+                   'rx_lna_off_mW': 34,
+                   'post_mW': 8.3, 'post_ms': 10.7}
+
+# all nodes start in the first minute
+Framework.Node.LOG_ENABLED = False
+Framework.Node.MAX_DELAY_START_PER_NODE_MS = 60 * 1000
+
+
+def build(num_nodes, cell_size=1000, sleep_time_ms=10 * 60 * 1000, payload_size=12, adr=True, confirmed=True,
+          prop_model=None, seed=0, **air_interface_kwargs):
+    np.random.seed(seed)
+    sim_env = simpy.Environment()
+    middle = cell_size / 2
+    gateway = Gateway(sim_env, Location(x=middle, y=middle, indoor=False))
+    if prop_model is None:
+        prop_model = PropagationModel.LogShadow(std=7.8)
+    air_interface = AirInterface(gateway, prop_model, SNRModel(), sim_env, **air_interface_kwargs)
+    nodes = []
+    for node_id in range(num_nodes):
+        location = Location(x=np.random.uniform(0, cell_size), y=np.random.uniform(0, cell_size),
+                            alt=np.random.uniform(45, 90), indoor=False)
+        lora_param = LoRaParameters(freq=np.random.choice(LoRaParameters.DEFAULT_CHANNELS),
+                                    sf=np.random.choice(LoRaParameters.SPREADING_FACTORS),
+                                    bw=125, cr=5, crc_enabled=1, de_enabled=0, header_implicit_mode=0, tp=14)
+        node = Node(node_id, EnergyProfile(5.7e-3, 15, tx_power_mW, rx_power=rx_measurements), lora_param,
+                    sleep_time=sleep_time_ms, process_time=5, adr=adr, location=location, base_station=gateway,
+                    env=sim_env, payload_size=payload_size, air_interface=air_interface,
+                    confirmed_messages=confirmed)
+        nodes.append(node)
+        sim_env.process(node.run())
+    return sim_env, nodes, gateway, air_interface
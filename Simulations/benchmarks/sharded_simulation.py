@@ -0,0 +1,49 @@
+# Wall-clock time of the simpy fast-forward engine and of the sharded simulation (inline and with one process per
+# channel), for nodes without ADR and confirmed messages. The sharded results do not depend on the number of processes
+# and are statistically close to the simpy engine (other random numbers). Run from the root of the repository:
+#   python -m Simulations.benchmarks.sharded_simulation
+import time
+
+import pandas as pd
+
+import Framework.Node
+import Framework.ShardedSimulation
+from Framework.LoRaParameters import LoRaParameters
+from Framework.Node import Node
+from Framework.ShardedSimulation import ShardedSimulation
+from Framework.SNRModel import SNRModel
+from Simulations.benchmarks import scenario
+
+num_nodes = 4000
+simulation_time_ms = 3 * 60 * 60 * 1000
+Framework.ShardedSimulation.MAX_DELAY_START_PER_NODE_MS = Framework.Node.MAX_DELAY_START_PER_NODE_MS
+
+
+def run_simpy():
+    Framework.Node.FAST_FORWARD = True
+    sim_env, nodes, gateway, air_interface = scenario.build(num_nodes, adr=False, confirmed=False)
+    start = time.perf_counter()
+    sim_env.run(until=simulation_time_ms)
+    wall_clock = time.perf_counter() - start
+    return wall_clock, Node.get_simulation_data_frame(nodes).sum(), air_interface.get_simulation_data('')
+
+
+def run_sharded(processes):
+    sim_env, nodes, gateway, air_interface = scenario.build(num_nodes, adr=False, confirmed=False)
+    simulation = ShardedSimulation(nodes, gateway, air_interface.prop_model, SNRModel(), processes=processes)
+    start = time.perf_counter()
+    simulation.run(simulation_time_ms)
+    wall_clock = time.perf_counter() - start
+    return wall_clock, Node.get_simulation_data_frame(nodes).sum(), simulation.get_simulation_data('')
+
+
+if __name__ == '__main__':
+    results = {'simpy fast-forward': run_simpy(), 'sharded inline': run_sharded(0),
+               'sharded {} processes'.format(len(LoRaParameters.CHANNELS)): run_sharded(len(LoRaParameters.CHANNELS))}
+    print('{:>22} {:>10}'.format('engine', 'time [s]'))
+    for engine, (wall_clock, _, _) in results.items():
+        print('{:>22} {:>10.2f}'.format(engine, wall_clock))
+    sharded = [r for engine, r in results.items() if engine.startswith('sharded')]
+    print('sharded results identical: {}'.format(sharded[0][1].equals(sharded[1][1]) and
+                                                 sharded[0][2].equals(sharded[1][2])))
+    print(pd.DataFrame({engine: pd.concat([r[1], r[2]]) for engine, r in results.items()}).to_string())
@@ -0,0 +1,44 @@
+# Bytes sent to a worker process for the locations of all replicates and the time to send and receive them (pickle and
+# unpickle), for the pickled list of lists of Locations and for SharedLocations, which only pickles the name of its
+# shared memory block. Also the time to get the Locations of one replicate in the worker.
+# Run from the root of the repository:
+#   python -m Simulations.benchmarks.shared_locations
+import pickle
+import time
+
+import numpy as np
+
+from Framework.Location import Location
+from Framework.SharedLocations import SharedLocations
+
+num_replicates = 10
+cell_size = 1000
+
+
+def generate(num_nodes):
+    rng = np.random.RandomState(1)
+    return [[Location(min=0, max=cell_size, alt_min=1, alt_max=10, indoor=False, rng=rng) for _ in range(num_nodes)]
+            for _ in range(num_replicates)]
+
+
+def send(data):
+    start = time.perf_counter()
+    received = pickle.loads(pickle.dumps(data))
+    return len(pickle.dumps(data)), time.perf_counter() - start, received
+
+
+if __name__ == '__main__':
+    print('{:>7} {:>14} {:>14} {:>16} {:>16} {:>18}'.format('nodes', 'list [MB]', 'shared [B]', 'list send [ms]',
+                                                          'shared send [ms]', 'replicate get [ms]'))
+    for _num_nodes in [1000, 10000, 100000]:
+        locations_per_simulation = generate(_num_nodes)
+        list_size, list_duration, _ = send(locations_per_simulation)
+        with SharedLocations(locations_per_simulation) as shared:
+            shared_size, shared_duration, attached = send(shared)
+            start = time.perf_counter()
+            list(attached[num_replicates - 1])
+            get_duration = time.perf_counter() - start
+            attached.close()
+        print('{:>7} {:>14.2f} {:>14} {:>16.1f} {:>16.2f} {:>18.1f}'.format(
+            _num_nodes, list_size / 2 ** 20, shared_size, list_duration * 1e3, shared_duration * 1e3,
+            get_duration * 1e3))
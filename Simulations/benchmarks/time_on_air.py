@@ -0,0 +1,47 @@
+# Time per airtime computation: the formula evaluated on every call, the memoized airtime table and the vectorized
+# variant. Run from the root of the repository:
+#   python -m Simulations.benchmarks.time_on_air
+import timeit
+
+import numpy as np
+
+from Framework import LoRaPacket
+from Framework.LoRaParameters import LoRaParameters
+
+num_calls = 100000
+
+formula = LoRaPacket.airtime.__wrapped__
+
+
+def draw_parameters(n):
+    sf = np.random.choice(LoRaParameters.SPREADING_FACTORS, n)
+    payload_size = np.random.randint(1, 52, n)
+    de = (sf >= 11).astype(int)
+    return payload_size, sf, de
+
+
+if __name__ == '__main__':
+    np.random.seed(0)
+    payload_size, sf, de = draw_parameters(num_calls)
+    calls = [(int(p), int(s), 125, 5, 1, 0, int(d)) for p, s, d in zip(payload_size, sf, de)]
+
+    def run_formula():
+        for args in calls:
+            formula(*args)
+
+    def run_memoized():
+        for args in calls:
+            LoRaPacket.airtime(*args)
+
+    def run_batch():
+        LoRaPacket.time_on_air_batch(payload_size, sf, 125, 5, 1, 0, de)
+
+    run_memoized()  # fill the table
+    assert np.array_equal(LoRaPacket.time_on_air_batch(payload_size, sf, 125, 5, 1, 0, de),
+                          [formula(*args) for args in calls])
+
+    print('{:>10} {:>16}'.format('variant', 'time/call [ns]'))
+    for name, f in [('formula', run_formula), ('memoized', run_memoized), ('batch', run_batch)]:
+        best = min(timeit.repeat(f, number=1, repeat=5))
+        print('{:>10} {:>16.1f}'.format(name, best / num_calls * 1e9))
+    print(LoRaPacket.airtime.cache_info())
@@ -1,3 +1,6 @@
+import os
+
+import pandas as pd
 import simpy
 
 import PropagationModel
@@ -6,7 +9,10 @@ from EnergyProfile import EnergyProfile
 from Gateway import Gateway
 from LoRaParameters import LoRaParameters
 from Node import Node
+from NodeStatistics import NodeStatistics
+from RandomStreams import RandomStreams
 from SNRModel import SNRModel
+from ShardedSimulation import run_resumable
 from GlobalConfig import *
 
 tx_power_mW = {2: 91.8, 5: 95.9, 8: 101.6, 11: 120.8, 14: 146.5}
@@ -15,22 +21,32 @@ rx_measurements = {'pre_mW': 8.2, 'pre_ms': 3.4, 'rx_lna_on_mW': 39,
                    'post_mW': 8.3, 'post_ms': 10.7}
 
 
-def run_helper(args):
-    return run(*args)
+def run_cell(replicate, payload_size, sigma, locations_per_simulation, sim_time, gateway_location, num_nodes,
+             transmission_rate, confirmed_messages, adr):
+    # one cell of the sweep (see SweepRunner), returns the tables of the results store
+    r = run(locations_per_simulation[replicate], payload_size, sigma, sim_time, gateway_location, num_nodes,
+            transmission_rate, confirmed_messages, adr, replicate)
+    energy = pd.Series({'MeanEnergyPerBit': np.mean(r['mean_energy_all_nodes']),
+                        'StdEnergyPerBit': np.std(r['mean_energy_all_nodes'])})
+    return {'nodes': r['mean_nodes'], 'gateway': r['gateway'], 'air_interface': r['air_interface'], 'energy': energy}
 
 
-def run(locs, p_size, sigma, sim_time, gateway_location, num_nodes, transmission_rate, confirmed_messages, adr):
+def run(locs, p_size, sigma, sim_time, gateway_location, num_nodes, transmission_rate, confirmed_messages, adr,
+        replicate):
+    # independent random streams per replicate (Monte-Carlo run), whichever pool worker runs it
+    streams = RandomStreams(replicate=replicate)
+    setup_rng = streams.setup()
     sim_env = simpy.Environment()
     gateway = Gateway(sim_env, gateway_location, max_snr_adr=True, avg_snr_adr=False)
     nodes = []
-    air_interface = AirInterface(gateway, PropagationModel.LogShadow(std=sigma), SNRModel(), sim_env)
+    air_interface = AirInterface(gateway, PropagationModel.LogShadow(std=sigma, rng=streams.model('LogShadow')), SNRModel(), sim_env)
     for node_id in range(num_nodes):
         energy_profile = EnergyProfile(5.7e-3, 15, tx_power_mW,
                                        rx_power=rx_measurements)
-        _sf = np.random.choice(LoRaParameters.SPREADING_FACTORS)
+        _sf = setup_rng.choice(LoRaParameters.SPREADING_FACTORS)
         if start_with_fixed_sf:
             _sf = start_sf
-        lora_param = LoRaParameters(freq=np.random.choice(LoRaParameters.DEFAULT_CHANNELS),
+        lora_param = LoRaParameters(freq=setup_rng.choice(LoRaParameters.DEFAULT_CHANNELS),
                                     sf=_sf,
                                     bw=125, cr=5, crc_enabled=1, de_enabled=0, header_implicit_mode=0, tp=14)
         node = Node(node_id, energy_profile, lora_param, sleep_time=(8 * p_size / transmission_rate),
@@ -38,18 +54,20 @@ def run(locs, p_size, sigma, sim_time, gateway_location, num_nodes, transmission
                     adr=adr,
                     location=locs[node_id],
                     base_station=gateway, env=sim_env, payload_size=p_size, air_interface=air_interface,
-                    confirmed_messages=confirmed_messages)
+                    confirmed_messages=confirmed_messages, rng=streams.node(node_id))
         nodes.append(node)
         sim_env.process(node.run())
 
-    sim_env.run(until=sim_time)
+    # resumable from its last checkpoint if CHECKPOINT_DIR is set (see run_resumable)
+    checkpoint_file = None
+    if CHECKPOINT_DIR is not None:
+        checkpoint_file = os.path.join(CHECKPOINT_DIR, '{}_{}_{}.pkl'.format(replicate, p_size, sigma))
+    air_interface = run_resumable(sim_env, nodes, gateway, air_interface, sim_time, checkpoint_file, seed=replicate)
 
     # Simulation is done.
     # process data
 
-    mean_energy_per_bit_list = list()
-    for n in nodes:
-        mean_energy_per_bit_list.append(n.energy_per_bit())
+    mean_energy_per_bit_list = NodeStatistics(nodes).energy_per_bit().tolist()
 
     data_mean_nodes = Node.get_mean_simulation_data_frame(nodes, name=sigma) / (
         num_nodes)
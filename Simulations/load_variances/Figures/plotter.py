@@ -1,9 +1,10 @@
-import pickle
 from collections import OrderedDict
 
 import matplotlib.pyplot as plt
 import seaborn as sns
 
+from Framework.ResultsStore import ResultsStore
+
 sns.axes_style('white')
 
 color = [(31, 119, 180), (174, 199, 232), (255, 127, 14), (255, 187, 120),
@@ -21,11 +22,19 @@ load = ['0.1', '0.5', '1', '1.5', '2']
 files = {}
 
 for n in load:
-    files[n] = '../results/{}_SF_random.p'.format(n)
+    files[n] = '../results/{}_SF_random'.format(n)
 
+node_columns = ['RetransmittedPackets', 'UniquePackets', 'CollidedPackets', 'NoDLReceived', 'TxRxEnergy',
+                'TotalEnergy', 'TotalBytes', 'WaitTimeDC']
 results = dict()
 for n in load:
-    results[n] = pickle.load(open(files[n], "rb"))
+    # mean over the replicates of the plotted columns, per payload size and path loss variance
+    results[n] = ResultsStore.meta(files[n])
+    results[n]['nodes'] = ResultsStore.read(files[n], 'nodes', columns=['payload_size', 'sigma'] + node_columns) \
+        .groupby(['payload_size', 'sigma']).mean()
+    results[n]['gateway'] = ResultsStore.read(files[n], 'gateway',
+                                              columns=['payload_size', 'sigma', 'UniquePacketsReceived']) \
+        .groupby(['payload_size', 'sigma']).mean()
 
 sigmas = results[load[0]]['path_loss_variances']
 payload_sizes = results[load[0]]['payload_sizes']
@@ -63,10 +72,8 @@ def show(plot):
 if plot_retransmitted_bytes:
     for idx_p, p in enumerate(payload_sizes):
         for idx, s in enumerate(sigmas):
-            p_str = str(p)
-            s_str = str(s)
             for i, (load, result) in enumerate(results.items()):
-                node_data = result['nodes'][p_str][s_str]
+                node_data = result['nodes'].loc[(p, s)]
                 rate = result['transmission_rate']
                 print(rate)
                 plt.scatter(p, (node_data['RetransmittedPackets'] / node_data['UniquePackets']) * 100,
@@ -78,10 +85,8 @@ if plot_retransmitted_bytes:
 if plot_collisions:
     for idx_p, p in enumerate(payload_sizes):
         for idx, s in enumerate(sigmas):
-            p_str = str(p)
-            s_str = str(s)
             for i, (start_sf, result) in enumerate(results.items()):
-                node_data = result['nodes'][p_str][s_str]
+                node_data = result['nodes'].loc[(p, s)]
                 plt.scatter(p, (node_data['CollidedPackets'] / node_data['UniquePackets']) * 100,
                              color=color[i],
                             label=start_sf)
@@ -90,10 +95,8 @@ if plot_collisions:
 if plot_no_dl:
     for idx_p, p in enumerate(payload_sizes):
         for idx, s in enumerate(sigmas):
-            p_str = str(p)
-            s_str = str(s)
             for i, (start_sf, result) in enumerate(results.items()):
-                node_data = result['nodes'][p_str][s_str]
+                node_data = result['nodes'].loc[(p, s)]
                 plt.scatter(p, (node_data['NoDLReceived'] / node_data['UniquePackets']) * 100,
                              color=color[i],
                             label=start_sf)
@@ -102,10 +105,8 @@ if plot_no_dl:
 if plot_energy:
     for idx_p, p in enumerate(payload_sizes):
         for idx, s in enumerate(sigmas):
-            p_str = str(p)
-            s_str = str(s)
             for i, (start_sf, result) in enumerate(results.items()):
-                node_data = result['nodes'][p_str][s_str]
+                node_data = result['nodes'].loc[(p, s)]
                 eff_en = node_data['TxRxEnergy'] / (p * node_data['UniquePackets'])
                 plt.scatter(p, eff_en,  color=color[i], label=start_sf)
     plt.title('Eb (txrxen)')
@@ -113,10 +114,8 @@ if plot_energy:
 if plot_energy:
     for idx_p, p in enumerate(payload_sizes):
         for idx, s in enumerate(sigmas):
-            p_str = str(p)
-            s_str = str(s)
             for i, (start_sf, result) in enumerate(results.items()):
-                node_data = result['nodes'][p_str][s_str]
+                node_data = result['nodes'].loc[(p, s)]
                 eff_en = node_data['TotalEnergy'] / (p * node_data['UniquePackets'])
                 plt.scatter(p, eff_en,  color=color[i], label=start_sf)
     plt.title('Eb (total)')
@@ -124,10 +123,8 @@ if plot_energy:
 if plot_total_bytes:
     for idx_p, p in enumerate(payload_sizes):
         for idx, s in enumerate(sigmas):
-            p_str = str(p)
-            s_str = str(s)
             for i, (start_sf, result) in enumerate(results.items()):
-                node_data = result['nodes'][p_str][s_str]
+                node_data = result['nodes'].loc[(p, s)]
                 # plt.scatter(p, node_data['TotalBytes'], color=color[i], label=start_sf)
                 plt.scatter(p, ((node_data['TotalBytes'] - (node_data['UniquePackets'] * p)) / (
                         node_data['UniquePackets'] * p)) * 100,  color=color[i],
@@ -137,10 +134,8 @@ if plot_total_bytes:
 if plot_unique_bytes:
     for idx_p, p in enumerate(payload_sizes):
         for idx, s in enumerate(sigmas):
-            p_str = str(p)
-            s_str = str(s)
             for i, (start_sf, result) in enumerate(results.items()):
-                node_data = result['nodes'][p_str][s_str]
+                node_data = result['nodes'].loc[(p, s)]
                 plt.scatter(p, node_data['UniquePackets'] * p, color=color[i],
                             label=start_sf)
     plt.title('Unique Bytes')
@@ -149,21 +144,17 @@ if plot_unique_bytes:
 if plot_wait_time:
     for idx_p, p in enumerate(payload_sizes):
         for idx, s in enumerate(sigmas):
-            p_str = str(p)
-            s_str = str(s)
             for i, (start_sf, result) in enumerate(results.items()):
-                node_data = result['nodes'][p_str][s_str]
+                node_data = result['nodes'].loc[(p, s)]
                 plt.scatter(p, node_data['WaitTimeDC'],  color=color[i], label=start_sf)
     plt.title('Wait time')
     show(plt)
 if plot_der:
     for idx_p, p in enumerate(payload_sizes):
         for idx, s in enumerate(sigmas):
-            p_str = str(p)
-            s_str = str(s)
             for i, (start_sf, result) in enumerate(results.items()):
-                node_data = result['nodes'][p_str][s_str]
-                gateway_data = result['gateway'][p_str][s_str]
+                node_data = result['nodes'].loc[(p, s)]
+                gateway_data = result['gateway'].loc[(p, s)]
                 plt.scatter(p, ((gateway_data['UniquePacketsReceived'] * p) / node_data['TotalBytes']) * 100,
                              color=color[i], label=start_sf)
     plt.title('DER')
@@ -1,3 +1,6 @@
+import os
+
+import pandas as pd
 import simpy
 
 from Framework import PropagationModel
@@ -6,7 +9,10 @@ from Framework.EnergyProfile import EnergyProfile
 from Framework.Gateway import Gateway
 from Framework.LoRaParameters import LoRaParameters
 from Framework.Node import Node
+from Framework.NodeStatistics import NodeStatistics
+from Framework.RandomStreams import RandomStreams
 from Framework.SNRModel import SNRModel
+from Framework.ShardedSimulation import run_resumable
 from Simulations.GlobalConfig import *
 
 import time
@@ -17,12 +23,40 @@ rx_measurements = {'pre_mW': 8.2, 'pre_ms': 3.4, 'rx_lna_on_mW': 39,
                    'rx_lna_off_mW': 34,
                    'post_mW': 8.3, 'post_ms': 10.7}
 
-def run_helper(args):
-    return run(*args)
+# propagation models compared by the sweep, by name, built from the random streams of the replicate
+PROPAGATION_MODELS = {
+    'LogShadow': lambda streams: PropagationModel.LogShadow(std=path_loss_variance),
+    'COST231': lambda streams: PropagationModel.COST231(fc=868, rng=streams.model('COST231')),
+    'FreeSpace': lambda streams: PropagationModel.FreeSpace(fc=868),
+    'Egli': lambda streams: PropagationModel.Egli(fc=868),
+    'OkumuraHata': lambda streams: PropagationModel.OkumuraHata(fc=868),
+    'COST231Hata': lambda streams: PropagationModel.COST231Hata(fc=868),
+    'DecisionTree': lambda streams: PropagationModel.DecisionTree(),
+    'RandomForest': lambda streams: PropagationModel.RandomForest(),
+    # 'SVR': lambda streams: PropagationModel.SVR(),
+    # 'Lasso': lambda streams: PropagationModel.Lasso(),
+    'XGBOOST': lambda streams: PropagationModel.XGBOOST(),
+    # 'NeuralNetwork': lambda streams: PropagationModel.NeuralNetwork(fast=True),
+}
+
+
+def run_cell(replicate, propagation, locations_per_simulation, p_size, sim_time, gateway_location, num_nodes,
+             transmission_rate, confirmed_messages, adr):
+    # one cell of the sweep (see SweepRunner), returns the tables of the results store
+    r = run(locations_per_simulation[replicate], p_size, sim_time, gateway_location, num_nodes, transmission_rate,
+            confirmed_messages, adr, PROPAGATION_MODELS[propagation](RandomStreams(replicate=replicate)), replicate)
+    return {'nodes': r['data_nodes_raw'].assign(EnergyPerBit=r['mean_energy_all_nodes_per_bit']),
+            'gateway': r['data_gateway_raw'], 'air_interface': r['data_air_interface_raw'],
+            'timing': pd.Series({'simulation_time': r['simulation_time']})}
 
 
-def run(locs, p_size, sim_time, gateway_location, num_nodes, transmission_rate, confirmed_messages, adr, propagation_model):
+def run(locs, p_size, sim_time, gateway_location, num_nodes, transmission_rate, confirmed_messages, adr, propagation_model,
+        replicate):
     start_time = time.time()
+    # independent random streams per replicate (Monte-Carlo run), whichever pool worker runs it
+    streams = RandomStreams(replicate=replicate)
+    setup_rng = streams.setup()
+    propagation_model.rng = streams.model(type(propagation_model).__name__)
 
     sim_env = simpy.Environment()
     gateway = Gateway(sim_env, gateway_location, max_snr_adr=True, avg_snr_adr=False)
@@ -31,10 +65,10 @@ def run(locs, p_size, sim_time, gateway_location, num_nodes, transmission_rate,
     for node_id in range(num_nodes):
         energy_profile = EnergyProfile(5.7e-3, 15, tx_power_mW,
                                        rx_power=rx_measurements)
-        _sf = np.random.choice(LoRaParameters.SPREADING_FACTORS)
+        _sf = setup_rng.choice(LoRaParameters.SPREADING_FACTORS)
         if start_with_fixed_sf:
             _sf = start_sf
-        lora_param = LoRaParameters(freq=np.random.choice(LoRaParameters.DEFAULT_CHANNELS),
+        lora_param = LoRaParameters(freq=setup_rng.choice(LoRaParameters.DEFAULT_CHANNELS),
                                     sf=_sf,
                                     bw=125, cr=5, crc_enabled=1, de_enabled=0, header_implicit_mode=0, tp=14)
         node = Node(node_id, energy_profile, lora_param, sleep_time=(8 * p_size / transmission_rate),
@@ -42,20 +76,22 @@ def run(locs, p_size, sim_time, gateway_location, num_nodes, transmission_rate,
                     adr=adr,
                     location=locs[node_id],
                     base_station=gateway, env=sim_env, payload_size=p_size, air_interface=air_interface,
-                    confirmed_messages=confirmed_messages)
+                    confirmed_messages=confirmed_messages, rng=streams.node(node_id))
         nodes.append(node)
         sim_env.process(node.run())
 
-    sim_env.run(until=sim_time)
+    # resumable from its last checkpoint if CHECKPOINT_DIR is set (see run_resumable)
+    checkpoint_file = None
+    if CHECKPOINT_DIR is not None:
+        checkpoint_file = os.path.join(CHECKPOINT_DIR, '{}_{}.pkl'.format(replicate, type(propagation_model).__name__))
+    air_interface = run_resumable(sim_env, nodes, gateway, air_interface, sim_time, checkpoint_file, seed=replicate)
 
     end_time = time.time()
     print("--- %s seconds ---" % (end_time - start_time))
     # Simulation is done.
     # process data
 
-    mean_energy_per_bit_list = list()
-    for n in nodes:
-        mean_energy_per_bit_list.append(n.energy_per_bit())
+    mean_energy_per_bit_list = NodeStatistics(nodes).energy_per_bit().tolist()
 
     data_nodes_raw = Node.get_simulation_data_frame(nodes)
     data_gateway_raw = gateway.get_simulation_data(0)
@@ -1,8 +1,9 @@
-import pickle
 import matplotlib.pyplot as plt
 import numpy as np
 from matplotlib.ticker import FuncFormatter
 
+from Framework.ResultsStore import ResultsStore
+
 # ============================================================
 # Global style configuration
 # ============================================================
@@ -29,9 +30,9 @@ algoritmos = [
 ]
 
 arquivos = [
-    'C:\\GitHub\\LoRaEnergySim\\Simulations\\propagation\\results\\100_100_7_True_True_propagation.p',
-    'C:\\GitHub\\LoRaEnergySim\\Simulations\\propagation\\results\\100_1000_7_True_True_propagation.p',
-    'C:\\GitHub\\LoRaEnergySim\\Simulations\\propagation\\results\\100_10000_7_True_True_propagation.p'
+    'C:\\GitHub\\LoRaEnergySim\\Simulations\\propagation\\results\\100_100_7_True_True_propagation',
+    'C:\\GitHub\\LoRaEnergySim\\Simulations\\propagation\\results\\100_1000_7_True_True_propagation',
+    'C:\\GitHub\\LoRaEnergySim\\Simulations\\propagation\\results\\100_10000_7_True_True_propagation'
 ]
 
 cores = ['dodgerblue', 'orange', 'lightcoral']
@@ -51,25 +52,26 @@ legend_handles = [
 energia_total_por_algoritmo = {}
 
 for i, arquivo in enumerate(arquivos):
-    with open(arquivo, 'rb') as f:
-        dicionario = pickle.load(f)
+    # only the columns of the first replicate that are plotted are read
+    first = [('simulation', '==', 0)]
+    dados_gw = ResultsStore.read(arquivo, 'gateway', columns=['propagation', 'PacketsReceived', 'ULWeakPackets'],
+                                 filters=first).set_index('propagation')
+    dados_air = ResultsStore.read(arquivo, 'air_interface', columns=['propagation', 'NumberOfPacketsCollided'],
+                                  filters=first).set_index('propagation')
 
     recebidos, weak, collided = [], [], []
 
     for algoritmo in algoritmos:
-        dados_air = dicionario[algoritmo][0]['data_air_interface_raw']
-        dados_gw = dicionario[algoritmo][0]['data_gateway_raw']
-        dados_nos = dicionario[algoritmo][0]['data_nodes_raw']
-
-        recebidos.append(int(dados_gw['PacketsReceived']))
-        weak.append(int(dados_gw['ULWeakPackets']))
-        collided.append(int(dados_air['NumberOfPacketsCollided']))
-
-        if i == 2:
+        recebidos.append(int(dados_gw.loc[algoritmo, 'PacketsReceived']))
+        weak.append(int(dados_gw.loc[algoritmo, 'ULWeakPackets']))
+        collided.append(int(dados_air.loc[algoritmo, 'NumberOfPacketsCollided']))
+
+    if i == 2:
+        dados_nos = ResultsStore.read(arquivo, 'nodes', columns=['propagation', 'TotalEnergy'], filters=first)
+        energia = dados_nos.groupby('propagation')['TotalEnergy'].sum()
+        for algoritmo in algoritmos:
             energia_total_por_algoritmo.setdefault(algoritmo, [])
-            energia_total_por_algoritmo[algoritmo].append(
-                sum(dados_nos['TotalEnergy']) / 1000
-            )
+            energia_total_por_algoritmo[algoritmo].append(energia[algoritmo] / 1000)
 
     x = np.arange(len(algoritmos))
     width = 0.75
@@ -1,7 +1,8 @@
-import pickle
 import matplotlib.pyplot as plt
 import numpy as np
 
+from Framework.ResultsStore import ResultsStore
+
 # ============================================================
 # Global style configuration
 # ============================================================
@@ -28,9 +29,9 @@ algoritmos = [
 ]
 
 arquivos = [
-    'C:\\Github\\LoRaEnergySim\\Simulations\\propagation\\results\\10_10000_7_True_True_propagation.p',
-    'C:\\Github\\LoRaEnergySim\\Simulations\\propagation\\results\\100_10000_7_True_True_propagation.p',
-    'C:\\Github\\LoRaEnergySim\\Simulations\\propagation\\results\\200_10000_7_True_True_propagation.p'
+    'C:\\Github\\LoRaEnergySim\\Simulations\\propagation\\results\\10_10000_7_True_True_propagation',
+    'C:\\Github\\LoRaEnergySim\\Simulations\\propagation\\results\\100_10000_7_True_True_propagation',
+    'C:\\Github\\LoRaEnergySim\\Simulations\\propagation\\results\\200_10000_7_True_True_propagation'
 ]
 
 cores = ['dodgerblue', 'orange', 'lightcoral']
@@ -47,18 +48,19 @@ legend_handles = [
 fig11, axs = plt.subplots(len(arquivos), figsize=(12, 10), sharex=True, sharey=False)
 
 for i, arquivo in enumerate(arquivos):
-    with open(arquivo, 'rb') as f:
-        dicionario = pickle.load(f)
+    # only the columns of the first replicate that are plotted are read
+    first = [('simulation', '==', 0)]
+    dados_gw = ResultsStore.read(arquivo, 'gateway', columns=['propagation', 'PacketsReceived', 'ULWeakPackets'],
+                                 filters=first).set_index('propagation')
+    dados_air = ResultsStore.read(arquivo, 'air_interface', columns=['propagation', 'NumberOfPacketsCollided'],
+                                  filters=first).set_index('propagation')
 
     recebidos, weak, collided = [], [], []
 
     for algoritmo in algoritmos:
-        dados_air = dicionario[algoritmo][0]['data_air_interface_raw']
-        dados_gw = dicionario[algoritmo][0]['data_gateway_raw']
-
-        recebidos.append(int(dados_gw['PacketsReceived']))
-        weak.append(int(dados_gw['ULWeakPackets']))
-        collided.append(int(dados_air['NumberOfPacketsCollided']))
+        recebidos.append(int(dados_gw.loc[algoritmo, 'PacketsReceived']))
+        weak.append(int(dados_gw.loc[algoritmo, 'ULWeakPackets']))
+        collided.append(int(dados_air.loc[algoritmo, 'NumberOfPacketsCollided']))
 
     x = np.arange(len(algoritmos))
     width = 0.75
@@ -1,5 +1,6 @@
 import matplotlib.pyplot as plt
-import pickle
+
+from Framework.ResultsStore import ResultsStore
 
 
 # ============================================================
@@ -19,18 +20,18 @@ plt.rcParams.update({
 
 # Função para obter o tempo de simulação de um determinado algoritmo nos resultados
 def get_simulation_time(key, results):
-    return results[key][0]['simulation_time']
+    return results.loc[key, 'simulation_time']
 
 
-# Carregar os resultados de cada arquivo pickle
-file_1 = 'G:\\Meu Drive\\Mestrado\\DISSERTAÇÃO\\DADOS SIMULAÇÃO\\Ensaio Tempo de Processamento\\1_12_False_False_propagation.p'
-results_1 = pickle.load(open(file_1, "rb"))
+# Carregar os resultados de cada simulação
+file_1 = 'G:\\Meu Drive\\Mestrado\\DISSERTAÇÃO\\DADOS SIMULAÇÃO\\Ensaio Tempo de Processamento\\1_12_False_False_propagation'
+results_1 = ResultsStore.read(file_1, 'timing', filters=[('simulation', '==', 0)]).set_index('propagation')
 
-file_10 = 'G:\\Meu Drive\\Mestrado\\DISSERTAÇÃO\\DADOS SIMULAÇÃO\\Ensaio Tempo de Processamento\\10_12_False_False_propagation.p'
-results_10 = pickle.load(open(file_10, "rb"))
+file_10 = 'G:\\Meu Drive\\Mestrado\\DISSERTAÇÃO\\DADOS SIMULAÇÃO\\Ensaio Tempo de Processamento\\10_12_False_False_propagation'
+results_10 = ResultsStore.read(file_10, 'timing', filters=[('simulation', '==', 0)]).set_index('propagation')
 
-file_100 = 'G:\\Meu Drive\\Mestrado\\DISSERTAÇÃO\\DADOS SIMULAÇÃO\\Ensaio Tempo de Processamento\\100_12_False_False_propagation.p'
-results_100 = pickle.load(open(file_100, "rb"))
+file_100 = 'G:\\Meu Drive\\Mestrado\\DISSERTAÇÃO\\DADOS SIMULAÇÃO\\Ensaio Tempo de Processamento\\100_12_False_False_propagation'
+results_100 = ResultsStore.read(file_100, 'timing', filters=[('simulation', '==', 0)]).set_index('propagation')
 
 
 # Dados de RMSE para cada algoritmo
@@ -0,0 +1,58 @@
+import Framework.Node
+import Framework.ShardedSimulation
+from Framework.Node import Node
+from Framework.PacketLog import PacketLog
+from Framework.ShardedSimulation import ShardedSimulation
+from Framework.SNRModel import SNRModel
+from Simulations.benchmarks import scenario
+
+simulation_time_ms = 6 * 60 * 60 * 1000
+checkpoint_interval_ms = 3 * 60 * 60 * 1000
+Framework.ShardedSimulation.MAX_DELAY_START_PER_NODE_MS = Framework.Node.MAX_DELAY_START_PER_NODE_MS
+
+
+class Interrupted(Exception):
+    pass
+
+
+def build(directory, num_nodes=200):
+    sim_env, nodes, gateway, air_interface = scenario.build(num_nodes, adr=False, confirmed=False, seed=1)
+    packet_log = PacketLog(directory=directory, log_format='numpy', buffer_size=1000)
+    return nodes, gateway, ShardedSimulation(nodes, gateway, air_interface.prop_model, SNRModel(), processes=0,
+                                             packet_log=packet_log)
+
+
+def test_resumed_run_logs_the_packets_of_an_uninterrupted_run(tmp_path):
+    nodes, gateway, simulation = build(str(tmp_path / 'uninterrupted'))
+    simulation.run(simulation_time_ms)
+    simulation.packet_log.close()
+    uninterrupted = PacketLog.read(str(tmp_path / 'uninterrupted'))
+    uninterrupted_nodes = Node.get_simulation_data_frame(nodes)
+
+    # killed right after its first checkpoint, with packets logged after it that the resumed run logs again
+    checkpoint_file = str(tmp_path / 'checkpoint.pkl')
+    nodes, gateway, simulation = build(str(tmp_path / 'resumed'))
+    checkpoint = simulation.checkpoint
+
+    def checkpoint_and_stop(*args):
+        checkpoint(*args)
+        for idx in range(10):
+            simulation.packet_log.record(idx, 0, 7, 14, 0, None, None, False, False, None, 0)
+        simulation.packet_log.flush()
+        raise Interrupted
+
+    simulation.checkpoint = checkpoint_and_stop
+    try:
+        simulation.run(simulation_time_ms, checkpoint_file=checkpoint_file, checkpoint_interval=checkpoint_interval_ms)
+    except Interrupted:
+        pass
+    simulation.packet_log.close()
+
+    nodes, gateway, simulation = build(str(tmp_path / 'resumed'))
+    simulation.run(simulation_time_ms, checkpoint_file=checkpoint_file, checkpoint_interval=checkpoint_interval_ms)
+    simulation.packet_log.close()
+    resumed = PacketLog.read(str(tmp_path / 'resumed'))
+
+    assert len(uninterrupted) > 0
+    assert resumed.equals(uninterrupted)
+    assert Node.get_simulation_data_frame(nodes).equals(uninterrupted_nodes)
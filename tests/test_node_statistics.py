@@ -0,0 +1,28 @@
+import numpy as np
+import pandas as pd
+
+from Framework.Node import Node
+from Framework.NodeStatistics import NodeStatistics
+from Simulations.benchmarks import scenario
+
+simulation_time_ms = 6 * 60 * 60 * 1000
+
+
+def per_node_frames(nodes) -> pd.DataFrame:
+    # former Node.get_simulation_data_frame: a one-row frame per node, concatenated
+    return pd.concat([node.get_simulation_data().to_frame().T for node in nodes], ignore_index=True)
+
+
+def test_bulk_counters_are_bit_identical_to_the_per_node_frames():
+    sim_env, nodes, gateway, air_interface = scenario.build(200, adr=True, confirmed=True, seed=1)
+    sim_env.run(until=simulation_time_ms)
+    former = per_node_frames(nodes)
+    former_sum = former.sum(axis=0)
+
+    frame = Node.get_simulation_data_frame(nodes)
+    assert frame.equals(former)
+    total = NodeStatistics(nodes).sum()
+    assert list(total.index) == list(former_sum.index)
+    # bit-identical, not only close: every float is compared exactly
+    assert np.array_equal(total.to_numpy(dtype=np.float64), former_sum.to_numpy(dtype=np.float64))
+    assert former_sum['TotalEnergy'] > 0
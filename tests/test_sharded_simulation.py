@@ -0,0 +1,27 @@
+import pandas as pd
+
+import Framework.Node
+import Framework.ShardedSimulation
+from Framework.Node import Node
+from Framework.ShardedSimulation import ShardedSimulation
+from Framework.SNRModel import SNRModel
+from Simulations.benchmarks import multi_gateway
+
+num_gateways_per_side = 2
+Framework.ShardedSimulation.MAX_DELAY_START_PER_NODE_MS = Framework.Node.MAX_DELAY_START_PER_NODE_MS
+
+
+def run(processes) -> pd.Series:
+    sim_env, nodes, network_server, air_interface = multi_gateway.build(num_gateways_per_side, multi_gateway.max_range,
+                                                                        adr=False)
+    simulation = ShardedSimulation(nodes, network_server, air_interface.air_interfaces[0].prop_model, SNRModel(),
+                                   processes=processes, max_range=multi_gateway.max_range)
+    simulation.run(multi_gateway.simulation_time_ms)
+    return pd.concat([Node.get_simulation_data_frame(nodes).sum(), network_server.get_simulation_data(''),
+                      simulation.get_simulation_data('')])
+
+
+def test_parallel_run_is_identical_to_the_serial_run():
+    serial = run(0)
+    assert serial['NumberOfPacketsOnAir'] > 0
+    assert run(2).equals(serial)